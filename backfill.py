@@ -0,0 +1,178 @@
+# backfill.py
+# Историческая догрузка результатов за диапазон дат.
+#   python backfill.py 2024-01-01 2024-12-31 [--workers 4] [--replay]
+# Страницы качаются пачками в потоках (http_client.fetch_pages), разбираются
+# в пуле процессов (parse_pool) и по порядку уходят на запись: каждая дата
+# пишется в results одной пакетной вставкой вместе с контрольной точкой
+# в backfill_checkpoints, поэтому прерванный запуск продолжается с того же места.
+import argparse
+import os
+from datetime import date, datetime, timedelta
+
+from psycopg2.extras import execute_values
+
+import http_client
+import page_cache
+import parse_pool
+from database import get_db_connection
+from results_parser_orm import RESULTS_URL
+
+BACKFILL_WORKERS = int(os.getenv("SCORES24_BACKFILL_WORKERS", str(parse_pool.PARSE_WORKERS)))
+# Свои валидаторы и печати страниц в page_cache: backfill пишет results без
+# сверки с прогнозами, и его 304/печать не должны скрывать дату от парсеров
+# результатов (results_parser_orm, results_json_parser, live_poller)
+CACHE_NAMESPACE = "backfill"
+
+
+def date_range(start: date, end: date):
+    """Все даты от start до end включительно."""
+    day = start
+    while day <= end:
+        yield day
+        day += timedelta(days=1)
+
+
+def get_completed_dates(start: date, end: date):
+    """Даты диапазона, которые уже есть в backfill_checkpoints."""
+    conn = get_db_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute(
+            "SELECT match_date FROM backfill_checkpoints WHERE match_date BETWEEN %s AND %s",
+            (start, end),
+        )
+        return {row[0] for row in cur.fetchall()}
+    finally:
+        cur.close()
+        conn.close()
+
+
+def iter_pages(days):
+    """
+    Качает страницы дат пачками по FETCH_CONCURRENCY и отдаёт (day, page)
+    по порядку. Следующая пачка качается, только когда разбор забрал
+    предыдущую, так что в памяти не весь диапазон, а несколько страниц.
+    """
+    step = http_client.FETCH_CONCURRENCY
+    for i in range(0, len(days), step):
+        batch = days[i:i + step]
+        urls = [RESULTS_URL.format(date=day.strftime("%Y-%m-%d")) for day in batch]
+        pages = http_client.fetch_pages(urls, namespace=CACHE_NAMESPACE)
+        for day, url in zip(batch, urls):
+            # Запечатанные страницы тоже парсим: backfill не полагается на то,
+            # что результаты этой даты уже сохранены
+            if pages[url] is not None:
+                yield day, pages[url]
+
+
+def save_date(day: date, matches, checkpoint: bool):
+    """
+    Пишет результаты одной даты одной пакетной вставкой и (если checkpoint)
+    отмечает дату выполненной — всё в одной транзакции.
+    """
+    # Дубликаты ключа в одной пачке ломают ON CONFLICT DO UPDATE
+    rows = {}
+    for m in matches:
+        if m.match_time is None:
+            continue
+        key = (m.home_team, m.away_team, m.match_time)
+        rows[key] = key + (m.home_score, m.away_score, m.status)
+
+    conn = get_db_connection()
+    cur = conn.cursor()
+    try:
+        if rows:
+            execute_values(
+                cur,
+                """
+                INSERT INTO results (home_team, away_team, match_time, home_score, away_score, status)
+                VALUES %s
+                ON CONFLICT (home_team, away_team, match_time)
+                DO UPDATE SET
+                    home_score = EXCLUDED.home_score,
+                    away_score = EXCLUDED.away_score,
+                    status = EXCLUDED.status,
+                    updated_at = NOW()
+                """,
+                list(rows.values()),
+            )
+        if checkpoint:
+            cur.execute(
+                """
+                INSERT INTO backfill_checkpoints (match_date, results_count, completed_at)
+                VALUES (%s, %s, NOW())
+                ON CONFLICT (match_date)
+                DO UPDATE SET results_count = EXCLUDED.results_count, completed_at = NOW()
+                """,
+                (day, len(rows)),
+            )
+        conn.commit()
+        return len(rows)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+        conn.close()
+
+
+def backfill(start: date, end: date, workers: int = BACKFILL_WORKERS, replay: bool = False):
+    completed = get_completed_dates(start, end)
+    pending = [day for day in date_range(start, end) if day not in completed]
+    print(f"📅 Диапазон {start} — {end}: уже загружено {len(completed)}, осталось {len(pending)}")
+    if not pending:
+        return
+
+    if replay:
+        # Без флага не выключаем: SCORES24_REPLAY=1 тоже включает воспроизведение
+        http_client.set_replay(True)
+    today = date.today()
+    saved_dates = saved_results = 0
+    parse_input = (
+        ((day, page), page.text, day.strftime("%Y-%m-%d")) for day, page in iter_pages(pending)
+    )
+    for (day, page), matches, all_finished in parse_pool.parse_pages(parse_input, "html", workers):
+        if matches is None:
+            continue
+        # Фиксируем дату, если все матчи завершены или она заведомо в прошлом;
+        # иначе её подберёт следующий запуск
+        checkpoint = all_finished or day < today - timedelta(days=2)
+        try:
+            count = save_date(day, matches, checkpoint)
+        except Exception as e:
+            print(f"❌ {day}: ошибка записи в БД: {e}")
+            continue
+        # Валидаторы и печать (только для backfill) — после успешной записи,
+        # иначе потеряем результаты дня
+        page_cache.commit(page)
+        if all_finished and day < today and not page.sealed and not http_client.REPLAY:
+            page_cache.seal(page.url, page.text, CACHE_NAMESPACE)
+        saved_dates += 1
+        saved_results += count
+        mark = "✅" if checkpoint else "⏳"
+        print(f"{mark} {day}: сохранено {count} результатов"
+              f"{'' if all_finished else ' (есть незавершённые матчи)'}")
+
+    print(f"\n🎯 ИТОГ: дат {saved_dates}/{len(pending)}, результатов {saved_results}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Историческая догрузка результатов scores24")
+    parser.add_argument("start", help="первая дата, YYYY-MM-DD")
+    parser.add_argument("end", help="последняя дата, YYYY-MM-DD")
+    parser.add_argument("--workers", type=int, default=BACKFILL_WORKERS,
+                        help="размер пула процессов разбора")
+    parser.add_argument("--replay", action="store_true",
+                        help="брать страницы из архива, а не из сети")
+    args = parser.parse_args()
+
+    start = datetime.strptime(args.start, "%Y-%m-%d").date()
+    end = datetime.strptime(args.end, "%Y-%m-%d").date()
+    print("🗂️  ИСТОРИЧЕСКАЯ ДОГРУЗКА РЕЗУЛЬТАТОВ")
+    print("=" * 60)
+    backfill(start, end, max(1, args.workers), args.replay)
+
+
+if __name__ == "__main__":
+    http_client.enable_replay_from_argv()
+    main()
@@ -0,0 +1,35 @@
+# bench_html_backends.py
+# Сравнение бэкендов html_backend (bs4 и lxml) на сохранённых debug_*.html:
+# результат parse_results_page должен совпадать, печатается время разбора.
+#   python bench_html_backends.py [повторов]
+import glob
+import sys
+import time
+
+from results_parser_orm import parse_results_page
+
+
+def bench(html, backend, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        result = parse_results_page(html, "2025-08-24", backend=backend)
+    return (time.perf_counter() - start) / repeats, result
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    for path in sorted(glob.glob('debug_*.html')):
+        with open(path, encoding='utf-8') as f:
+            html = f.read()
+
+        soup_time, soup_result = bench(html, "bs4", repeats)
+        lxml_time, lxml_result = bench(html, "lxml", repeats)
+
+        same = '✅' if soup_result == lxml_result else '❌ РАЗНЫЕ'
+        print(f"{path}: матчей {len(soup_result[0])}, "
+              f"bs4 {soup_time * 1000:.1f} мс, lxml {lxml_time * 1000:.1f} мс, "
+              f"x{soup_time / lxml_time:.1f} {same}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+# bench_urql_extract.py
+# Сравнение: поиск URQL_DATA через BeautifulSoup + regex против urql.extract_payload
+# на сохранённых страницах debug_*.html.
+#   python bench_urql_extract.py [повторов]
+import glob
+import re
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+import urql
+
+URQL_RE = re.compile(r'window\.URQL_DATA\s*=\s*JSON\.parse\("(.+?)"\)')
+
+
+def extract_with_soup(html):
+    """Старый путь: DOM целиком, затем regex по тексту нужного script"""
+    soup = BeautifulSoup(html, 'html.parser')
+    for script in soup.find_all('script'):
+        if script.string and 'URQL_DATA' in script.string:
+            match = URQL_RE.search(script.string)
+            if match:
+                return match.group(1).encode('utf-8')
+    return None
+
+
+def bench(func, data, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        result = func(data)
+    return (time.perf_counter() - start) / repeats, result
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    for path in sorted(glob.glob('debug_*.html')):
+        with open(path, 'rb') as f:
+            raw = f.read()
+        html = raw.decode('utf-8')
+
+        soup_time, soup_payload = bench(extract_with_soup, html, repeats)
+        bytes_time, bytes_payload = bench(urql.extract_payload, raw, repeats)
+
+        same = '✅' if soup_payload == bytes_payload else '❌ РАЗНЫЕ'
+        print(f"{path} ({len(raw) // 1024} КБ): "
+              f"bs4 {soup_time * 1000:.1f} мс, bytes {bytes_time * 1000:.2f} мс, "
+              f"x{soup_time / bytes_time:.0f} {same}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,10 @@
 # correct_results_parser.py
 import requests
+import http_client
 from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
 from database import get_db_connection
+from records import make_result
 import time
 
 def parse_results_html(date_str):
@@ -13,7 +15,7 @@ def parse_results_html(date_str):
     print(f"🕸️  Парсим URL: {url}")
     
     try:
-        response = requests.get(url, headers={
+        response = http_client.get(url, headers={
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
         response.raise_for_status()
@@ -69,15 +71,7 @@ def parse_results_html(date_str):
             status_elem = container.find('div', class_='status')
             status = status_elem.get_text(strip=True) if status_elem else 'Завершен'
             
-            result = {
-                'home_team': home_team.strip(),
-                'away_team': away_team.strip(),
-                'home_score': home_score,
-                'away_score': away_score,
-                'score': score_text,
-                'status': status,
-                'source': 'html'
-            }
+            result = make_result(home_team, away_team, home_score, away_score, status)
             
             results.append(result)
             print(f"   ⚽ {home_team} {score_text} {away_team}")
@@ -90,19 +84,16 @@ def parse_results_html(date_str):
 
 def debug_page_structure(date_str):
     """
-    Функция для отладки - сохраняет всю структуру страницы
+    Функция для отладки - сохраняет все классы страницы
+    (сам HTML попадает в архив страниц через http_client)
     """
     url = f"https://scores24.live/ru/soccer/{date_str}"
-    response = requests.get(url, headers={
+    response = http_client.get(url, headers={
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
     })
     
     soup = BeautifulSoup(response.text, 'html.parser')
     
-    # Сохраняем полный HTML
-    with open(f"debug_full_{date_str}.html", "w", encoding="utf-8") as f:
-        f.write(soup.prettify())
-    
     # Сохраняем все классы для анализа
     all_classes = set()
     for element in soup.find_all(class_=True):
@@ -112,7 +103,7 @@ def debug_page_structure(date_str):
         for cls in sorted(all_classes):
             f.write(f"{cls}\n")
     
-    print(f"✅ Debug files saved: debug_full_{date_str}.html and debug_classes_{date_str}.txt")
+    print(f"✅ Debug file saved: debug_classes_{date_str}.txt (HTML в архиве страниц)")
 
 def get_matches_without_results():
     """Возвращает список матчей из predictions без результатов в results."""
@@ -187,15 +178,15 @@ def main():
         print(f"\n🔍 Ищем: {home_team} vs {away_team}")
         
         for result in results:
-            if (result['home_team'].lower() == home_team.lower() and 
-                result['away_team'].lower() == away_team.lower()):
+            if (result.home_team.lower() == home_team.lower() and 
+                result.away_team.lower() == away_team.lower()):
                 
-                print(f"   ✅ Найден результат: {result['home_score']}:{result['away_score']}")
+                print(f"   ✅ Найден результат: {result.home_score}:{result.away_score}")
                 
                 if save_result_to_db(
                     home_team, away_team, match_time,
-                    result['home_score'], result['away_score'],
-                    result['status']
+                    result.home_score, result.away_score,
+                    result.status
                 ):
                     saved_count += 1
                 break
@@ -205,4 +196,5 @@ def main():
     print(f"\n🎯 ИТОГ: сохранено {saved_count} результатов")
 
 if __name__ == '__main__':
+    http_client.enable_replay_from_argv()
     main()
@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 
-import requests
+import http_client
 from bs4 import BeautifulSoup
 import json
 import re
@@ -8,7 +8,8 @@ import re
 url = 'https://scores24.live/ru/trends/soccer?trendsMarketSlug=btts'
 headers = {'User-Agent': 'Mozilla/5.0'}
 
-response = requests.get(url, headers=headers)
+http_client.enable_replay_from_argv()
+response = http_client.get(url, headers=headers)
 soup = BeautifulSoup(response.text, 'html.parser')
 
 scripts = soup.find_all('script')
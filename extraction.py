@@ -0,0 +1,164 @@
+# extraction.py
+# Декларативная схема извлечения карточек матчей: селекторы лежат в
+# result_selectors.json (или в файле из SCORES24_SELECTORS), компилируются
+# один раз, а каждая карточка матча обходится за один проход — без
+# отдельного select на каждое поле. Когда styled-components сменит хэши
+# классов, правится JSON, а не код.
+#
+# Формат схемы:
+#   "match":  селектор корневого блока матча
+#   "fields": {имя: {"path": [селектор, ...], "many": bool, "attr": имя}}
+# path — цепочка вложенных блоков: на промежуточных шагах берётся первый
+# подходящий, на последнем — первый (или все, если many). Значение поля —
+# текст узла (или атрибут attr); для many — список, иначе строка или None.
+import json
+import os
+
+import html_backend
+
+SELECTORS_PATH = os.getenv(
+    "SCORES24_SELECTORS",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "result_selectors.json"),
+)
+
+
+def _compile_selector(selector):
+    tag, classes = html_backend.parse_selector(selector)
+    return tag, frozenset(classes)
+
+
+def _matches(step, tag, classes):
+    step_tag, step_classes = step
+    return (step_tag is None or step_tag == tag) and step_classes.issubset(classes)
+
+
+class _Field:
+    __slots__ = ("name", "steps", "many", "attr")
+
+    def __init__(self, name, config):
+        self.name = name
+        self.steps = [_compile_selector(s) for s in config["path"]]
+        self.many = bool(config.get("many"))
+        self.attr = config.get("attr")
+
+
+class ExtractionPlan:
+    """Скомпилированная схема: extract(html) -> список словарей по матчам"""
+
+    def __init__(self, spec):
+        self.match_selector = spec["match"]
+        self.match = _compile_selector(spec["match"])
+        self.fields = [_Field(name, config) for name, config in spec["fields"].items()]
+        # Узлы без единого "интересного" класса пропускаются без проверки полей
+        self.classes = frozenset(
+            cls for field in self.fields for _, classes in field.steps for cls in classes
+        )
+
+    def _value(self, parser, node, field):
+        if field.attr:
+            return parser.attr(node, field.attr)
+        return parser.text(node)
+
+    def _records(self, parser, events, release=None):
+        """
+        События ("start"/"end", узел) → словари карточек, по одной на каждый
+        закрывшийся блок матча. Значение поля снимается на "end" его узла,
+        когда текст узла уже разобран (это важно для потокового режима).
+        release — функция освобождения узлов, закрытых вне карточек и самих
+        карточек после выдачи (для потокового режима).
+        """
+        container = None
+        for event, node in events:
+            if container is None:
+                if event == "start":
+                    tag, classes = parser.tag_info(node)
+                    if _matches(self.match, tag, classes):
+                        container = node
+                        values = {f.name: [] if f.many else None for f in self.fields}
+                        # Для поля: (сколько шагов пути пройдено, открытый узел-якорь)
+                        progress = {f.name: (0, container) for f in self.fields}
+                        active = list(self.fields)
+                        # Ключи — id(); узлы держим в значениях, чтобы id не переиспользовался.
+                        # У bs4 Tag хэш считается по разметке, поэтому не кладём их в set
+                        anchors = {}
+                        captures = {}
+                elif release:
+                    release(node)
+                continue
+
+            if event == "end":
+                if node is container:
+                    yield values
+                    container = None
+                    if release:
+                        release(node)
+                    continue
+                captured = captures.pop(id(node), None)
+                if captured:
+                    for field in captured[1]:
+                        value = self._value(parser, node, field)
+                        if field.many:
+                            values[field.name].append(value)
+                        else:
+                            values[field.name] = value
+                if anchors.pop(id(node), None) is not None:
+                    # Закрылся промежуточный блок — дальше по этому полю не ищем
+                    active = [f for f in active if progress[f.name][1] is not node]
+                continue
+
+            if not active:
+                continue
+            tag, classes = parser.tag_info(node)
+            if self.classes.isdisjoint(classes):
+                continue
+            for field in list(active):
+                level, _ = progress[field.name]
+                if not _matches(field.steps[level], tag, classes):
+                    continue
+                if level + 1 < len(field.steps):
+                    progress[field.name] = (level + 1, node)
+                    anchors[id(node)] = node
+                    continue
+                captures.setdefault(id(node), (node, []))[1].append(field)
+                if not field.many:
+                    active.remove(field)
+
+    def extract(self, html, backend=None):
+        """Весь HTML сразу: ищем блоки матчей и обходим только их поддеревья"""
+        parser = html_backend.get_backend(backend)
+        root = parser.parse(html)
+        records = []
+        for container in parser.select(root, self.match_selector):
+            records.extend(self._records(parser, parser.walk(container)))
+        return records
+
+    def iter_stream(self, chunks, backend=None):
+        """
+        Потоковый режим: chunks — байты страницы по частям (например,
+        http_client.stream_page). Карточки выдаются по мере того, как
+        закрываются их блоки; разобранные узлы сразу освобождаются.
+        По умолчанию backend "sax": пик памяти не растёт с размером страницы.
+        "lxml" быстрее, но libxml2 держит в памяти весь принятый вход;
+        "bs4" собирает страницу целиком и разбирает как extract().
+        """
+        parser = html_backend.get_backend(backend or "sax")
+        if not hasattr(parser, "iter_events"):
+            yield from self.extract(b"".join(chunks), parser.name)
+            return
+        yield from self._records(parser, parser.iter_events(chunks), release=parser.release)
+
+
+def load_spec(path=None):
+    with open(path or SELECTORS_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+_plans = {}
+
+
+def get_plan(path=None):
+    """Скомпилированная схема (кэшируется по пути к файлу)"""
+    path = path or SELECTORS_PATH
+    if path not in _plans:
+        _plans[path] = ExtractionPlan(load_spec(path))
+    return _plans[path]
@@ -1,5 +1,5 @@
 # final_parser.py
-import requests
+import http_client
 from bs4 import BeautifulSoup
 import json
 import re
@@ -57,7 +57,7 @@ def parse_btts_predictions():
         }
         
         print(f"📡 Запрашиваем данные с: {url}")
-        response = requests.get(url, headers=headers, timeout=30)
+        response = http_client.get(url, headers=headers, timeout=30)
         response.raise_for_status()
         
         print(f"✅ Страница загружена (статус: {response.status_code})")
@@ -162,6 +162,8 @@ def parse_btts_predictions():
         return 0
 
 if __name__ == "__main__":
+    http_client.enable_replay_from_argv()
+
     # Инициализируем БД
     init_db()
     
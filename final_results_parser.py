@@ -1,4 +1,4 @@
-import requests
+import http_client
 from bs4 import BeautifulSoup
 
 def parse_results(date: str = "yesterday"):
@@ -7,7 +7,7 @@ def parse_results(date: str = "yesterday"):
     date может быть "yesterday" или "2025-08-23"
     """
     url = f"https://scores24.live/ru/soccer/{date}"
-    response = requests.get(url)
+    response = http_client.get(url)
     response.raise_for_status()
     soup = BeautifulSoup(response.text, "html.parser")
 
@@ -1,8 +1,10 @@
 # fixed_results_parser.py
 import requests
+import http_client
 from bs4 import BeautifulSoup
 from datetime import datetime
 from database import get_db_connection
+from records import make_result
 
 def parse_correct_results(date_str):
     """
@@ -12,7 +14,7 @@ def parse_correct_results(date_str):
     print(f"🕸️  Парсим URL: {url}")
     
     try:
-        response = requests.get(url, headers={
+        response = http_client.get(url, headers={
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
         response.raise_for_status()
@@ -59,14 +61,7 @@ def parse_correct_results(date_str):
             status_elem = container.find('div', class_='sc-1p31vt4-0')
             status = status_elem.get_text(strip=True) if status_elem else 'Неизвестно'
             
-            result = {
-                'home_team': home_team,
-                'away_team': away_team,
-                'home_score': home_score,
-                'away_score': away_score,
-                'score': f"{home_score}:{away_score}",
-                'status': status
-            }
+            result = make_result(home_team, away_team, home_score, away_score, status)
             
             results.append(result)
             print(f"   ⚽ {home_team} {home_score}:{away_score} {away_team} ({status})")
@@ -154,15 +149,15 @@ def main():
         found = False
         for result in results:
             # Сравниваем названия команд
-            if (result['home_team'].lower() == home_team.lower() and 
-                result['away_team'].lower() == away_team.lower()):
+            if (result.home_team.lower() == home_team.lower() and 
+                result.away_team.lower() == away_team.lower()):
                 
-                print(f"   ✅ Найден результат: {result['home_score']}:{result['away_score']}")
+                print(f"   ✅ Найден результат: {result.home_score}:{result.away_score}")
                 
                 if save_result_to_db(
                     home_team, away_team, match_time,
-                    result['home_score'], result['away_score'],
-                    result['status']
+                    result.home_score, result.away_score,
+                    result.status
                 ):
                     saved_count += 1
                     found = True
@@ -174,4 +169,5 @@ def main():
     print(f"\n🎯 ИТОГ: сохранено {saved_count} результатов")
 
 if __name__ == '__main__':
+    http_client.enable_replay_from_argv()
     main()
@@ -0,0 +1,131 @@
+# graphql_client.py
+# Прямые GraphQL-запросы к scores24 вместо парсинга HTML.
+# Страницы трендов — это отрендеренные результаты тех же запросов
+# (см. URQL-кэш в debug_urql_data.json), поэтому забираем сразу JSON.
+# Имена аргументов повторяют параметры URL страниц (trendsMarketSlug и т.д.).
+import os
+
+import requests
+
+import http_client
+
+GRAPHQL_URL = os.getenv("SCORES24_GRAPHQL_URL", "https://scores24.live/graphql")
+# Брать тренды через GraphQL вместо HTML-страницы
+ENABLED = os.getenv("SCORES24_USE_GRAPHQL") == "1"
+# Свой лимитер и предохранитель: сбои GraphQL не отключают HTML-страницы того же хоста
+GUARD = "graphql"
+
+
+class GraphQLError(requests.RequestException):
+    """Сервер вернул errors в ответе GraphQL."""
+
+
+TREND_LIST_QUERY = """
+query TrendList($sportSlug: String!, $trendsMarketSlug: String, $date: String,
+                $first: Int, $after: String, $langSlug: String) {
+  TrendList(sportSlug: $sportSlug, trendsMarketSlug: $trendsMarketSlug, date: $date,
+            first: $first, after: $after, langSlug: $langSlug) {
+    edges {
+      cursor
+      node {
+        groups { name minOdd maxOdd count }
+        match {
+          slug
+          matchDate
+          leagueSlug
+          uniqueTournamentName
+          teams { slug name }
+        }
+      }
+    }
+    pageInfo { hasNextPage endCursor }
+  }
+}
+"""
+
+TREND_FILTER_QUERY = """
+query TrendFilter($sportSlug: String, $trendsMarketSlug: String, $langSlug: String) {
+  TrendFilter(sportSlug: $sportSlug, trendsMarketSlug: $trendsMarketSlug, langSlug: $langSlug) {
+    leagues { slug sportSlug name shortName country { name slug iso } }
+    days
+    markets
+  }
+}
+"""
+
+TOP_PREDICTION_MATCHES_QUERY = """
+query TopPredictionMatches($sportSlug: String, $date: String, $langSlug: String) {
+  TopPredictionMatches(sportSlug: $sportSlug, date: $date, langSlug: $langSlug) {
+    slug
+    matchDate
+    sportSlug
+    teams { name }
+  }
+}
+"""
+
+
+def query(operation_name, document, variables=None, timeout=http_client.DEFAULT_TIMEOUT):
+    """
+    Выполняет GraphQL-запрос и возвращает поле data[operation_name].
+    Ошибки сети — requests.RequestException, ошибки GraphQL — GraphQLError.
+    """
+    payload = {
+        "operationName": operation_name,
+        "query": document,
+        "variables": {k: v for k, v in (variables or {}).items() if v is not None},
+    }
+    response = http_client.request(
+        "POST",
+        GRAPHQL_URL,
+        json=payload,
+        headers={"Accept": "application/json"},
+        timeout=timeout,
+        guard=GUARD,
+    )
+    response.raise_for_status()
+    body = response.json()
+    if body.get("errors"):
+        messages = "; ".join(e.get("message", str(e)) for e in body["errors"])
+        raise GraphQLError(f"{operation_name}: {messages}")
+    return (body.get("data") or {}).get(operation_name)
+
+
+def trend_list(market_slug="btts", sport="soccer", date=None, first=None, after=None, lang="ru"):
+    """TrendList: {'edges': [...], 'pageInfo': {...}} для рынка и вида спорта."""
+    return query("TrendList", TREND_LIST_QUERY, {
+        "sportSlug": sport,
+        "trendsMarketSlug": market_slug,
+        "date": date,
+        "first": first,
+        "after": after,
+        "langSlug": lang,
+    })
+
+
+def trend_filter(market_slug="btts", sport="soccer", lang="ru"):
+    """TrendFilter: доступные лиги, дни и рынки."""
+    return query("TrendFilter", TREND_FILTER_QUERY, {
+        "sportSlug": sport,
+        "trendsMarketSlug": market_slug,
+        "langSlug": lang,
+    })
+
+
+def top_prediction_matches(sport="soccer", date=None, lang="ru"):
+    """TopPredictionMatches: список матчей с топ-прогнозами."""
+    return query("TopPredictionMatches", TOP_PREDICTION_MATCHES_QUERY, {
+        "sportSlug": sport,
+        "date": date,
+        "langSlug": lang,
+    })
+
+
+if __name__ == "__main__":
+    # Проверка против заглушки:
+    #   python graphql_stub_server.py
+    #   SCORES24_GRAPHQL_URL=http://127.0.0.1:5002/graphql python graphql_client.py
+    trends = trend_list()
+    print(f"TrendList: {len(trends['edges'])} трендов, pageInfo={trends['pageInfo']}")
+    print(f"TopPredictionMatches: {len(top_prediction_matches())} матчей")
+    print(f"TrendFilter: {len(trend_filter()['leagues'])} лиг")
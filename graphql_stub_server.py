@@ -0,0 +1,97 @@
+# graphql_stub_server.py
+# Локальная заглушка GraphQL scores24: отдаёт записанный URQL-кэш
+# (debug_urql_data.json) по имени операции. Нужна для проверки graphql_client без сети.
+# TrendList листается по first/after, как на сайте: тренды записанной
+# страницы повторяются STUB_TREND_PAGES раз (со своими slug), курсор —
+# смещение в этом списке.
+import json
+import os
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FIXTURE_PATH = os.getenv("GRAPHQL_STUB_FIXTURE", "debug_urql_data.json")
+PORT = int(os.getenv("GRAPHQL_STUB_PORT", "5002"))
+# Сколько раз повторить тренды записанной страницы в заглушке TrendList
+STUB_TREND_PAGES = int(os.getenv("GRAPHQL_STUB_TREND_PAGES", "3"))
+
+
+def load_operations(path=FIXTURE_PATH):
+    """{имя операции: данные} из записанного URQL-кэша."""
+    with open(path, encoding="utf-8") as f:
+        cache = json.load(f)
+    operations = {}
+    trends = []
+    for entry in cache.values():
+        if not entry.get("data"):
+            continue
+        operations.update(json.loads(entry["data"]))
+    return operations
+
+
+def stub_trends(trend_list, pages=STUB_TREND_PAGES):
+    """Все тренды заглушки: edges записанной страницы pages раз, slug матчей уникальны"""
+    edges = []
+    for n in range(pages):
+        for edge in trend_list.get("edges") or []:
+            node = dict(edge["node"])
+            node["match"] = dict(node["match"], slug=f"{node['match'].get('slug')}-{n}")
+            edges.append(dict(edge, node=node))
+    return edges
+
+
+def trend_page(edges, first=None, after=None):
+    """Страница TrendList после курсора after (смещение "stub_N"), first трендов"""
+    start = int(after.rsplit("_", 1)[1]) if after else 0
+    end = start + (first or 10)
+    page_edges = edges[start:end]
+    return {
+        "edges": page_edges,
+        "pageInfo": {
+            "hasNextPage": end < len(edges),
+            "endCursor": f"stub_{start + len(page_edges)}" if page_edges else None,
+        },
+    }
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    operations = {}
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._reply(400, {"errors": [{"message": "invalid JSON body"}]})
+            return
+
+        name = request.get("operationName")
+        if name not in self.operations:
+            self._reply(200, {"errors": [{"message": f"unknown operation {name}"}]})
+            return
+        data = self.operations[name]
+        if name == "TrendList":
+            variables = request.get("variables") or {}
+            data = trend_page(self.trends, variables.get("first"), variables.get("after"))
+        self._reply(200, {"data": {name: data}})
+
+    def _reply(self, status, body):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        print(f"🧪 {self.address_string()} {format % args}")
+
+
+def main():
+    StubHandler.operations = load_operations()
+    StubHandler.trends = stub_trends(StubHandler.operations.get("TrendList") or {})
+    print(f"🧪 GraphQL-заглушка на http://127.0.0.1:{PORT}/graphql")
+    print(f"   Операции: {', '.join(sorted(StubHandler.operations))}")
+    ThreadingHTTPServer(("127.0.0.1", PORT), StubHandler).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+# html_backend.py
+# Бэкенды разбора HTML для парсеров результатов.
+# lxml (C) — быстрый по умолчанию; BeautifulSoup (html.parser) — запасной,
+# если lxml не установлен. Оба дают одинаковый результат на страницах scores24.
+# Выбор: SCORES24_HTML_BACKEND=lxml|bs4.
+# Для потокового разбора есть ещё sax (html.parser из stdlib): память
+# не зависит от размера страницы (libxml2 в push-режиме копит весь вход).
+import codecs
+import os
+import re
+from html.parser import HTMLParser
+
+from bs4 import BeautifulSoup
+
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:
+    lxml = None
+
+# Поддерживаем только простые селекторы вида tag.class[.class2]
+_SIMPLE_SELECTOR_RE = re.compile(r"^([a-zA-Z][\w-]*)?((?:\.[\w-]+)+)$")
+
+
+def parse_selector(selector):
+    """"div.a.b" -> ("div", ["a", "b"]); тег может отсутствовать (None)"""
+    match = _SIMPLE_SELECTOR_RE.match(selector)
+    if not match:
+        raise ValueError(f"Селектор не поддерживается: {selector}")
+    return match.group(1), match.group(2).split(".")[1:]
+
+
+class SoupBackend:
+    """BeautifulSoup + html.parser (чистый Python)"""
+    name = "bs4"
+
+    def parse(self, html):
+        return BeautifulSoup(html, "html.parser")
+
+    def select(self, node, selector):
+        return node.select(selector)
+
+    def select_one(self, node, selector):
+        return node.select_one(selector)
+
+    def text(self, node):
+        return node.get_text(strip=True)
+
+    def attr(self, node, name, default=None):
+        return node.get(name, default)
+
+    def walk(self, node):
+        """Обход в порядке документа: ("start", тег) ... ("end", тег)"""
+        stack = [(node, iter(node.find_all(recursive=False)))]
+        yield "start", node
+        while stack:
+            parent, children = stack[-1]
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+                yield "end", parent
+                continue
+            yield "start", child
+            stack.append((child, iter(child.find_all(recursive=False))))
+
+    def tag_info(self, node):
+        """(имя тега, список классов)"""
+        return node.name, node.get("class") or []
+
+
+class LxmlBackend:
+    """lxml.html + заранее скомпилированные XPath для селекторов"""
+    name = "lxml"
+
+    def __init__(self):
+        self._compiled = {}
+
+    def _xpath(self, selector):
+        xpath = self._compiled.get(selector)
+        if xpath is None:
+            tag, classes = parse_selector(selector)
+            conditions = "".join(
+                f"[contains(concat(' ', normalize-space(@class), ' '), ' {cls} ')]"
+                for cls in classes
+            )
+            xpath = etree.XPath(f".//{tag or '*'}{conditions}")
+            self._compiled[selector] = xpath
+        return xpath
+
+    def parse(self, html):
+        if isinstance(html, bytes):
+            return lxml.html.fromstring(html, parser=lxml.html.HTMLParser(encoding="utf-8"))
+        return lxml.html.fromstring(html)
+
+    def select(self, node, selector):
+        return self._xpath(selector)(node)
+
+    def select_one(self, node, selector):
+        found = self._xpath(selector)(node)
+        return found[0] if found else None
+
+    def text(self, node):
+        # Как get_text(strip=True): текстовые узлы без комментариев, каждый обрезан
+        return "".join(part.strip() for part in node.itertext())
+
+    def attr(self, node, name, default=None):
+        return node.get(name, default)
+
+    def walk(self, node):
+        """Обход в порядке документа: ("start", тег) ... ("end", тег)"""
+        for event, element in etree.iterwalk(node, events=("start", "end")):
+            if isinstance(element.tag, str):  # комментарии и PI пропускаем
+                yield event, element
+
+    def tag_info(self, node):
+        """(имя тега, список классов)"""
+        return node.tag, (node.get("class") or "").split()
+
+    def iter_events(self, chunks):
+        """
+        Потоковый разбор: события ("start"/"end", узел) по мере прихода
+        байтовых чанков, без ожидания конца страницы. Узлы, которые больше
+        не нужны, вызывающий освобождает через release().
+        """
+        parser = etree.HTMLPullParser(events=("start", "end"), encoding="utf-8")
+        for chunk in chunks:
+            parser.feed(chunk)
+            for event, element in parser.read_events():
+                if isinstance(element.tag, str):
+                    yield event, element
+        parser.close()
+        for event, element in parser.read_events():
+            if isinstance(element.tag, str):
+                yield event, element
+
+    def release(self, node):
+        """Освобождает закрытый узел и уже разобранных соседей перед ним"""
+        node.clear(keep_tail=False)
+        parent = node.getparent()
+        if parent is not None:
+            while node.getprevious() is not None:
+                del parent[0]
+
+
+# Теги без закрывающей пары
+_VOID_TAGS = frozenset((
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr",
+))
+
+
+class _SaxNode:
+    """Узел потокового разбора: тег, атрибуты и содержимое (строки и дети)"""
+    __slots__ = ("tag", "attrs", "parts", "parent")
+
+    def __init__(self, tag, attrs, parent):
+        self.tag = tag
+        self.attrs = attrs
+        self.parts = []
+        self.parent = parent
+
+
+class _EventCollector(HTMLParser):
+    """html.parser → события ("start"/"end", _SaxNode) в списке self.events"""
+
+    def __init__(self):
+        super().__init__()
+        self.events = []
+        self.stack = [_SaxNode(None, {}, None)]
+        # Текст между тегами приходит кусками (граница чанка режет его
+        # посередине) — копим и обрезаем целиком, иначе "25 авг" → "25авг"
+        self.text = []
+
+    def _flush_text(self):
+        data = "".join(self.text).strip()
+        self.text.clear()
+        if data:
+            self.stack[-1].parts.append(data)
+
+    def handle_starttag(self, tag, attrs):
+        self._flush_text()
+        parent = self.stack[-1]
+        node = _SaxNode(tag, dict(attrs), parent)
+        parent.parts.append(node)
+        self.events.append(("start", node))
+        if tag in _VOID_TAGS:
+            self.events.append(("end", node))
+        else:
+            self.stack.append(node)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in _VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        self._flush_text()
+        # Незакрытые внутри теги закрываем вместе с ним, лишний закрывающий — игнорируем
+        for i in range(len(self.stack) - 1, 0, -1):
+            if self.stack[i].tag == tag:
+                while len(self.stack) > i:
+                    self.events.append(("end", self.stack.pop()))
+                return
+
+    def handle_data(self, data):
+        self.text.append(data)
+
+    def close(self):
+        super().close()
+        self._flush_text()
+        while len(self.stack) > 1:
+            self.events.append(("end", self.stack.pop()))
+
+
+class SaxBackend:
+    """
+    Потоковый разбор через html.parser: только iter_events/release, дерево
+    целиком не строится. В памяти — незакрытые узлы и ещё не разобранный
+    хвост входа, поэтому пик не растёт с размером страницы.
+    """
+    name = "sax"
+
+    def iter_events(self, chunks):
+        """События ("start"/"end", узел) по мере прихода байтовых чанков"""
+        collector = _EventCollector()
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        for chunk in chunks:
+            collector.feed(decoder.decode(chunk))
+            yield from collector.events
+            collector.events.clear()
+        collector.feed(decoder.decode(b"", final=True))
+        collector.close()
+        yield from collector.events
+
+    def release(self, node):
+        """Отцепляет закрытый узел от родителя вместе с содержимым"""
+        node.parts = []
+        if node.parent is not None:
+            node.parent.parts.remove(node)
+            node.parent = None
+
+    def text(self, node):
+        # Как get_text(strip=True): обрезанные текстовые узлы поддерева подряд
+        return "".join(
+            part if isinstance(part, str) else self.text(part) for part in node.parts
+        )
+
+    def attr(self, node, name, default=None):
+        return node.attrs.get(name, default)
+
+    def tag_info(self, node):
+        """(имя тега, список классов)"""
+        return node.tag, (node.attrs.get("class") or "").split()
+
+
+_backends = {}
+
+
+def get_backend(name=None):
+    """
+    Бэкенд по имени (или из SCORES24_HTML_BACKEND); без lxml — bs4.
+    "sax" умеет только потоковый разбор (extraction.ExtractionPlan.iter_stream).
+    """
+    name = name or os.getenv("SCORES24_HTML_BACKEND", "lxml")
+    if name not in ("lxml", "sax") or (name == "lxml" and lxml is None):
+        name = "bs4"
+    if name not in _backends:
+        _backends[name] = {"lxml": LxmlBackend, "sax": SaxBackend, "bs4": SoupBackend}[name]()
+    return _backends[name]
@@ -0,0 +1,309 @@
+# http_client.py
+import os
+import sys
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import page_archive
+import page_cache
+import throttle
+import urql
+
+# brotli декодируется urllib3 только если установлен пакет brotli
+try:
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+DEFAULT_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/120.0.0.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "ru-RU,ru;q=0.9,en-US;q=0.5,en;q=0.3",
+    "Accept-Encoding": ACCEPT_ENCODING,
+    "Connection": "keep-alive",
+}
+
+# Сколько хостов держим в пуле и сколько соединений на один хост
+POOL_CONNECTIONS = int(os.getenv("SCORES24_POOL_CONNECTIONS", "4"))
+POOL_MAXSIZE = int(os.getenv("SCORES24_POOL_MAXSIZE", "16"))
+# Сколько страниц качаем параллельно
+FETCH_CONCURRENCY = int(os.getenv("SCORES24_FETCH_CONCURRENCY", "8"))
+
+# Общий лимит запросов на хост: запросов в секунду и допустимый всплеск
+RATE_LIMIT = float(os.getenv("SCORES24_RATE_LIMIT", "4"))
+RATE_BURST = int(os.getenv("SCORES24_RATE_BURST", "8"))
+# Повторы на 429/5xx и сетевых ошибках, с экспоненциальной задержкой
+MAX_RETRIES = int(os.getenv("SCORES24_MAX_RETRIES", "3"))
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# Предохранитель: сколько неудач подряд отключают хост и на сколько секунд
+BREAKER_THRESHOLD = int(os.getenv("SCORES24_BREAKER_THRESHOLD", "5"))
+BREAKER_COOLDOWN = float(os.getenv("SCORES24_BREAKER_COOLDOWN", "30"))
+# Жёсткие таймауты по умолчанию: (соединение, чтение) в секундах
+DEFAULT_TIMEOUT = (5, 20)
+
+# Складывать ли каждую скачанную страницу в архив (page_archive). По умолчанию
+# выключено: архив не чистится сам, включайте на время сбора страниц для --replay
+ARCHIVE_PAGES = os.getenv("SCORES24_ARCHIVE_PAGES", "0") == "1"
+# Режим воспроизведения: страницы берутся из архива, а не из сети
+REPLAY = os.getenv("SCORES24_REPLAY") == "1"
+# Воспроизводить состояние архива на момент (ISO-время), по умолчанию — последнее
+REPLAY_BEFORE = os.getenv("SCORES24_REPLAY_BEFORE")
+
+_session = None
+_session_lock = threading.Lock()
+_host_guards = {}
+_host_guards_lock = threading.Lock()
+
+
+def get_session():
+    """Возвращает общую requests.Session с keep-alive и пулом соединений по хостам."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=POOL_CONNECTIONS,
+                    pool_maxsize=POOL_MAXSIZE,
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers.update(DEFAULT_HEADERS)
+                _session = session
+    return _session
+
+
+def set_replay(enabled=True):
+    """Включает/выключает чтение страниц из архива вместо сети."""
+    global REPLAY
+    REPLAY = enabled
+
+
+def enable_replay_from_argv(argv=None):
+    """Включает воспроизведение, если скрипт запущен с флагом --replay."""
+    argv = sys.argv if argv is None else argv
+    if "--replay" in argv:
+        set_replay(True)
+        print("⏪ Режим --replay: страницы читаются из архива")
+    return REPLAY
+
+
+def _replay_response(url):
+    content = page_archive.load_latest(url, before=REPLAY_BEFORE)
+    if content is None:
+        raise requests.ConnectionError(f"Страницы нет в архиве: {url}")
+    response = requests.Response()
+    response.status_code = 200
+    response.url = url
+    response.encoding = "utf-8"
+    response._content = content
+    return response
+
+
+def _guards_for(url, guard=None):
+    """
+    Лимитер и предохранитель хоста (общие для всех потоков). guard — своё
+    имя для отдельной пары на том же хосте (например, GraphQL), чтобы его
+    ошибки не отключали HTML-страницы.
+    """
+    host = guard or urlsplit(url).netloc
+    with _host_guards_lock:
+        if host not in _host_guards:
+            _host_guards[host] = (
+                throttle.TokenBucket(RATE_LIMIT, RATE_BURST),
+                throttle.CircuitBreaker(BREAKER_THRESHOLD, BREAKER_COOLDOWN),
+            )
+        return host, _host_guards[host]
+
+
+def request(method, url, guard=None, **kwargs):
+    """
+    Запрос через общую сессию с лимитом скорости, повторами на 429/5xx
+    и сетевых ошибках и предохранителем на хост (или на guard, см. _guards_for).
+    Если таймаут не передан, используется DEFAULT_TIMEOUT. После исчерпания
+    повторов возвращает последний ответ (вызывающий сам делает raise_for_status).
+    """
+    kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+    host, (limiter, breaker) = _guards_for(url, guard)
+
+    for attempt in range(MAX_RETRIES + 1):
+        breaker.before_request(host)
+        limiter.acquire()
+        try:
+            response = get_session().request(method, url, **kwargs)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            breaker.on_failure()
+            if attempt == MAX_RETRIES:
+                raise
+            delay = throttle.backoff_delay(attempt)
+            print(f"⏳ {e.__class__.__name__} для {url}, повтор через {delay:.1f} с")
+            time.sleep(delay)
+            continue
+        except BaseException:
+            # Пробный запрос не должен остаться "в полёте" навсегда
+            breaker.release()
+            raise
+
+        if response.status_code not in RETRY_STATUSES:
+            breaker.on_success()
+            limiter.on_success()
+            return response
+
+        retry_after = throttle.parse_retry_after(response.headers.get("Retry-After"))
+        if response.status_code == 429:
+            # Хост жив, но просит притормозить: это забота лимитера,
+            # предохранитель только пропускает следующий пробный запрос
+            limiter.on_throttled(retry_after)
+            breaker.release()
+        else:
+            breaker.on_failure()
+        if attempt == MAX_RETRIES:
+            return response
+        response.close()
+        delay = max(retry_after or 0, throttle.backoff_delay(attempt))
+        print(f"⏳ Ответ {response.status_code} для {url}, повтор через {delay:.1f} с")
+        time.sleep(delay)
+
+
+def get(url, **kwargs):
+    """
+    GET через общую сессию (см. request). Аргументы те же, что у requests.get.
+    Успешные ответы складываются в архив; в режиме replay ответ берётся из архива.
+    """
+    if REPLAY:
+        return _replay_response(url)
+    response = request("GET", url, **kwargs)
+    if ARCHIVE_PAGES and response.status_code == 200:
+        page_archive.store(url, response.content)
+    return response
+
+
+# Скачанная страница; not_modified=True — страница не менялась и text взят
+# из кэша (ответ 304 или запечатанный день, sealed=True). validators —
+# ETag / Last-Modified свежего ответа: в кэш они попадают только через
+# page_cache.commit(page), когда вызывающий сохранил результаты страницы.
+# namespace — потребитель, чьи валидаторы и печати использовались (page_cache)
+Page = namedtuple("Page", ["url", "text", "not_modified", "sealed", "validators", "namespace"],
+                  defaults=[False, None, None])
+
+
+def fetch_page(url, timeout=DEFAULT_TIMEOUT, namespace=None):
+    """
+    GET с условной ревалидацией (ETag / Last-Modified) по дисковому кэшу
+    потребителя namespace. Запечатанные им страницы отдаются из хранилища
+    без запроса. Новые валидаторы не сохраняются здесь: их пишет
+    page_cache.commit(page) после записи в БД.
+    Возвращает Page; ошибки запроса пробрасывает как requests.RequestException.
+    """
+    if REPLAY:
+        # Кэш и печати не трогаем: воспроизводим ровно то, что лежит в архиве
+        return Page(url, _replay_response(url).text, False, namespace=namespace)
+
+    sealed_html = page_cache.load_sealed(url, namespace)
+    if sealed_html is not None:
+        return Page(url, sealed_html, True, True, namespace=namespace)
+
+    meta, cached_html = page_cache.load(url, namespace)
+    headers = page_cache.conditional_headers(meta) if cached_html is not None else {}
+
+    response = get(url, headers=headers, timeout=timeout)
+    if response.status_code == 304 and cached_html is not None:
+        return Page(url, cached_html, True, namespace=namespace)
+    response.raise_for_status()
+
+    return Page(url, response.text, False,
+                validators=page_cache.validators(response), namespace=namespace)
+
+
+def fetch_pages(urls, max_workers=None, timeout=DEFAULT_TIMEOUT, namespace=None):
+    """
+    Параллельно скачивает страницы ограниченным пулом потоков
+    (кэш и печати — потребителя namespace, см. fetch_page).
+    Возвращает {url: Page} в исходном порядке; при ошибке запроса Page = None.
+    """
+    urls = list(urls)
+    if not urls:
+        return {}
+    workers = max(1, min(max_workers or FETCH_CONCURRENCY, len(urls)))
+
+    def _fetch(url):
+        try:
+            return fetch_page(url, timeout=timeout, namespace=namespace)
+        except requests.RequestException as e:
+            print(f"❌ Ошибка запроса {url}: {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pages = list(pool.map(_fetch, urls))
+    return dict(zip(urls, pages))
+
+
+def fetch_urql_payload(url, headers=None, timeout=DEFAULT_TIMEOUT, chunk_size=16384):
+    """
+    Качает страницу потоком и закрывает соединение, как только пришёл конец
+    window.URQL_DATA=JSON.parse("..."). В памяти держим только сам payload,
+    а не всю страницу. Возвращает payload (bytes, ещё JS-экранированный)
+    или None, если скрипта на странице нет.
+    Частичные страницы в архив не попадают; в режиме replay payload
+    достаётся из архивной копии страницы.
+    """
+    if REPLAY:
+        return urql.extract_payload(_replay_response(url).content)
+
+    marker_len = len(urql.URQL_MARKER)
+    response = request("GET", url, headers=headers, timeout=timeout, stream=True)
+    try:
+        response.raise_for_status()
+        buf = bytearray()
+        found_marker = False
+        scan_from = 0
+        for chunk in response.iter_content(chunk_size):
+            buf += chunk
+            if not found_marker:
+                idx = buf.find(urql.URQL_MARKER)
+                if idx < 0:
+                    # Хвост оставляем: маркер мог разрезаться между чанками
+                    del buf[:-marker_len]
+                    continue
+                del buf[:idx + marker_len]
+                found_marker = True
+            end = urql.find_literal_end(buf, scan_from)
+            if end >= 0:
+                return bytes(buf[:end])
+            # '")' мог разрезаться между чанками — следующий поиск с последнего байта
+            scan_from = max(0, len(buf) - 1)
+        return None
+    finally:
+        response.close()
+
+
+def stream_page(url, headers=None, timeout=DEFAULT_TIMEOUT, chunk_size=16384):
+    """
+    Отдаёт тело страницы байтовыми чанками по мере загрузки — для потокового
+    разбора (extraction.ExtractionPlan.iter_stream). Страница целиком в памяти
+    не собирается, поэтому в архив не пишется; в режиме replay чанки режутся
+    из архивной копии. HTTP-ошибка поднимается до первого чанка.
+    """
+    if REPLAY:
+        content = _replay_response(url).content
+        for start in range(0, len(content), chunk_size):
+            yield content[start:start + chunk_size]
+        return
+
+    response = request("GET", url, headers=headers, timeout=timeout, stream=True)
+    try:
+        response.raise_for_status()
+        yield from response.iter_content(chunk_size)
+    finally:
+        response.close()
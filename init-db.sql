@@ -1,11 +1,32 @@
 -- init-db.sql
 -- Этот скрипт автоматически выполнится при первом запуске контейнера с БД
+
+-- Триграммы для нечёткого сравнения названий команд (reconcile.py)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Создаем справочник команд: одна строка на клуб
+CREATE TABLE IF NOT EXISTS teams (
+    id SERIAL PRIMARY KEY,
+    name VARCHAR(255) NOT NULL UNIQUE, -- Каноническое название
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Создаем таблицу написаний команд (тренды, страницы результатов, бот)
+CREATE TABLE IF NOT EXISTS team_aliases (
+    alias VARCHAR(255) PRIMARY KEY, -- Нормализованное написание (team_registry.alias_key)
+    team_id INTEGER NOT NULL REFERENCES teams(id) ON DELETE CASCADE,
+    source VARCHAR(50), -- Откуда пришло написание
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
 -- Создаем таблицу для хранения прогнозов
 
 CREATE TABLE IF NOT EXISTS predictions (
     id SERIAL PRIMARY KEY,
     home_team VARCHAR(255) NOT NULL,
     away_team VARCHAR(255) NOT NULL,
+    home_team_id INTEGER REFERENCES teams(id),
+    away_team_id INTEGER REFERENCES teams(id),
     match_time TIMESTAMP NOT NULL,
     prediction_type VARCHAR(50) NOT NULL DEFAULT 'btts',
     prediction_value VARCHAR(50) NOT NULL, -- Может быть 'Yes', 'No' или коэффициент
@@ -20,6 +41,8 @@ CREATE TABLE IF NOT EXISTS results (
     id SERIAL PRIMARY KEY,
     home_team VARCHAR(255) NOT NULL,
     away_team VARCHAR(255) NOT NULL,
+    home_team_id INTEGER REFERENCES teams(id),
+    away_team_id INTEGER REFERENCES teams(id),
     match_time TIMESTAMP NOT NULL,
     home_score INTEGER,
     away_score INTEGER,
@@ -37,6 +60,37 @@ CREATE TABLE IF NOT EXISTS analysis (
     analyzed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Создаем таблицу контрольных точек исторической догрузки (backfill.py)
+CREATE TABLE IF NOT EXISTS backfill_checkpoints (
+    match_date DATE PRIMARY KEY,
+    results_count INTEGER NOT NULL DEFAULT 0,
+    completed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Для баз, созданных до справочника команд (в уже работающей базе то же
+-- делает migrate.py: этот скрипт выполняется только при первом запуске)
+ALTER TABLE predictions ADD COLUMN IF NOT EXISTS home_team_id INTEGER REFERENCES teams(id);
+ALTER TABLE predictions ADD COLUMN IF NOT EXISTS away_team_id INTEGER REFERENCES teams(id);
+ALTER TABLE results ADD COLUMN IF NOT EXISTS home_team_id INTEGER REFERENCES teams(id);
+ALTER TABLE results ADD COLUMN IF NOT EXISTS away_team_id INTEGER REFERENCES teams(id);
+
+-- Создаем индексы для соединения прогнозов и результатов по id команд
+CREATE INDEX IF NOT EXISTS idx_predictions_team_ids ON predictions (home_team_id, away_team_id, match_time);
+CREATE INDEX IF NOT EXISTS idx_results_team_ids ON results (home_team_id, away_team_id, match_time);
+
+-- Создаем индексы для сверки пачки результатов с прогнозами в БД (reconcile.py):
+-- ключ названия как normalize_name (reconcile.TEAM_KEY_SQL) и триграммы слов
+-- названия для оператора % (reconcile.TEAM_WORDS_SQL) — выражения те же, что в запросе
+CREATE INDEX IF NOT EXISTS idx_predictions_name_keys ON predictions (
+    regexp_replace(lower(translate(home_team, 'Ёё', 'Ее')), '\W', '', 'g'),
+    regexp_replace(lower(translate(away_team, 'Ёё', 'Ее')), '\W', '', 'g'),
+    match_time
+);
+CREATE INDEX IF NOT EXISTS idx_predictions_home_words_trgm
+    ON predictions USING GIN (lower(translate(home_team, 'Ёё', 'Ее')) gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_predictions_away_words_trgm
+    ON predictions USING GIN (lower(translate(away_team, 'Ёё', 'Ее')) gin_trgm_ops);
+
 -- Создаем индекс для быстрого поиска прогнозов, которые еще не были проверены
 CREATE INDEX IF NOT EXISTS idx_predictions_for_analysis ON predictions (match_time) 
 WHERE match_time < NOW() - INTERVAL '3 hours'; -- Матчи, которые завершились более 3 часов назад
@@ -45,3 +99,6 @@ WHERE match_time < NOW() - INTERVAL '3 hours'; -- Матчи, которые з
 COMMENT ON TABLE predictions IS 'Таблица для хранения спарсенных прогнозов на матчи';
 COMMENT ON TABLE results IS 'Таблица для хранения реальных результатов матчей';
 COMMENT ON TABLE analysis IS 'Таблица для связи прогнозов и результатов, хранит точность прогноза';
+COMMENT ON TABLE teams IS 'Справочник команд с каноническими названиями';
+COMMENT ON TABLE team_aliases IS 'Написания названий команд из разных источников и их команда';
+COMMENT ON TABLE backfill_checkpoints IS 'Даты, уже загруженные исторической догрузкой результатов';
@@ -0,0 +1,157 @@
+# live_poller.py
+# Опрос результатов "по требованию": вместо слепого перескрапа N дней
+# спрашиваем у БД, по каким датам ещё есть прогнозы без результатов,
+# и качаем только эти даты. Чаще опрашиваем около начала и конца матчей,
+# в остальное время интервал растёт.
+import os
+import time
+from datetime import datetime, timedelta
+
+import http_client
+import page_cache
+from models import get_db_session
+from results_parser_orm import (
+    RESULTS_URL,
+    get_predictions_without_results,
+    parse_results_page,
+    save_matched_results,
+)
+from team_registry import get_registry
+
+# Частый и максимальный интервал опроса, секунды
+FAST_INTERVAL = int(os.getenv("POLLER_FAST_INTERVAL", "120"))
+SLOW_INTERVAL = int(os.getenv("POLLER_SLOW_INTERVAL", "1800"))
+# Окна "горячего" опроса относительно начала матча
+KICKOFF_WINDOW = (timedelta(minutes=-5), timedelta(minutes=15))
+FULL_TIME_WINDOW = (timedelta(minutes=100), timedelta(minutes=180))
+# Прогнозы старше этого не опрашиваем: результат уже не появится
+GIVE_UP_AFTER = timedelta(days=int(os.getenv("POLLER_GIVE_UP_DAYS", "7")))
+# Матчи дальше этого в будущем на расписание опроса не влияют: интервал
+# не длиннее SLOW_INTERVAL, а горячее окно открывается за 5 минут до начала
+LOOKAHEAD = timedelta(seconds=SLOW_INTERVAL) - KICKOFF_WINDOW[0]
+# Свои валидаторы и печати страниц в page_cache
+CACHE_NAMESPACE = "live_poller"
+
+
+def _in_window(now, kickoff, window):
+    return kickoff + window[0] <= now <= kickoff + window[1]
+
+
+def next_interval(kickoffs, now, previous):
+    """
+    Сколько ждать до следующего опроса. Если сейчас чей-то матч начинается
+    или должен закончиться — FAST_INTERVAL. Иначе интервал удваивается
+    (до SLOW_INTERVAL), но не дольше, чем до ближайшего такого окна.
+    """
+    if any(_in_window(now, k, KICKOFF_WINDOW) or _in_window(now, k, FULL_TIME_WINDOW)
+           for k in kickoffs):
+        return FAST_INTERVAL
+
+    interval = min(SLOW_INTERVAL, max(FAST_INTERVAL, previous * 2))
+    upcoming = [
+        k + window[0]
+        for k in kickoffs
+        for window in (KICKOFF_WINDOW, FULL_TIME_WINDOW)
+        if k + window[0] > now
+    ]
+    if upcoming:
+        until_window = (min(upcoming) - now).total_seconds()
+        interval = min(interval, max(FAST_INTERVAL, int(until_window)))
+    return interval
+
+
+def pending_predictions(session, now):
+    """Прогнозы без результата в активном окне опроса (фильтр — в SQL)"""
+    return get_predictions_without_results(session, now - GIVE_UP_AFTER, now + LOOKAHEAD)
+
+
+def poll_once(parsed_urls):
+    """
+    Один цикл: незакрытые прогнозы → их даты → скачать, сопоставить, сохранить.
+    parsed_urls — страницы, уже разобранные этим процессом: если такая страница
+    не изменилась (304), повторно её не парсим. Возвращает время начала
+    всех незакрытых прогнозов (для расчёта следующего опроса).
+    """
+    now = datetime.now()
+    session = get_db_session()
+    try:
+        pending = pending_predictions(session, now)
+        started = [p for p in pending if p.match_time <= now]
+        kickoffs = [p.match_time for p in pending]
+        print(f"\n🕵️  {now:%H:%M:%S} без результата: {len(pending)}, уже начались: {len(started)}")
+        if not started:
+            return kickoffs
+
+        dates = sorted({p.match_time.strftime("%Y-%m-%d") for p in started})
+        urls = [RESULTS_URL.format(date=date) for date in dates]
+        pages = http_client.fetch_pages(urls, namespace=CACHE_NAMESPACE)
+
+        today = now.strftime("%Y-%m-%d")
+        all_results = []
+        parsed_pages = []
+        to_seal = []
+        for date, url in zip(dates, urls):
+            page = pages[url]
+            if page is None:
+                continue
+            if page.not_modified and url in parsed_urls:
+                print(f"♻️  {date}: страница не изменилась")
+                continue
+            results, all_finished = parse_results_page(page.text, date)
+            all_results.extend(results)
+            parsed_pages.append(page)
+            if all_finished and date < today and not page.sealed:
+                to_seal.append(page)
+
+        inserted = updated = analyzed = 0
+        if all_results:
+            registry = get_registry()
+            inserted, updated, analyzed = save_matched_results(
+                session, started, all_results, registry
+            )
+            session.commit()
+            # Новые написания команд — чтобы следующий цикл нашёл их по id
+            registry.flush()
+        # Страница считается разобранной (и её валидаторы сохраняются)
+        # только после коммита её результатов
+        for page in parsed_pages:
+            parsed_urls.add(page.url)
+            page_cache.commit(page)
+        if not all_results:
+            return kickoffs
+        for page in to_seal:
+            page_cache.seal(page.url, page.text, CACHE_NAMESPACE)
+        print(f"🎯 Вставлено {inserted}, обновлено {updated}, проанализировано {analyzed}")
+
+        settled = inserted + updated
+        if settled:
+            # Закрытые прогнозы больше не влияют на расписание опроса
+            kickoffs = [p.match_time for p in pending_predictions(session, now)]
+        return kickoffs
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+def main():
+    print("📡 LIVE-ОПРОС РЕЗУЛЬТАТОВ")
+    print("=" * 50)
+
+    parsed_urls = set()
+    interval = FAST_INTERVAL
+    while True:
+        try:
+            kickoffs = poll_once(parsed_urls)
+        except Exception as e:
+            print(f"❌ Ошибка цикла опроса: {e}")
+            kickoffs = []
+        interval = next_interval(kickoffs, datetime.now(), interval)
+        print(f"💤 Следующий опрос через {interval} с")
+        time.sleep(interval)
+
+
+if __name__ == "__main__":
+    http_client.enable_replay_from_argv()
+    main()
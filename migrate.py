@@ -0,0 +1,104 @@
+# migrate.py
+# Схема справочника команд для уже работающих баз. init-db.sql выполняется
+# только при первом запуске контейнера с БД, поэтому в старой базе таблицы
+# teams/team_aliases и колонки *_team_id сами не появятся, а реестр команд
+# (team_registry) и модели (models.py) без них падают.
+# Все операторы идемпотентны (IF NOT EXISTS). Схема проверяется один раз
+# на процесс (ensure_schema — из get_registry и get_db_session) или вручную:
+#   python migrate.py
+import threading
+
+from database import get_db_connection
+
+# Произвольный ключ advisory-блокировки: параллельные процессы не гоняют DDL одновременно
+MIGRATION_LOCK_KEY = 240823
+
+# Что должно быть в схеме: таблицы и колонки справочника команд
+REQUIRED_TABLES = ("teams", "team_aliases")
+REQUIRED_COLUMNS = (
+    ("predictions", "home_team_id"),
+    ("predictions", "away_team_id"),
+    ("results", "home_team_id"),
+    ("results", "away_team_id"),
+)
+
+# То же, что в init-db.sql для справочника команд
+TEAM_REGISTRY_SQL = """
+    CREATE TABLE IF NOT EXISTS teams (
+        id SERIAL PRIMARY KEY,
+        name VARCHAR(255) NOT NULL UNIQUE,
+        created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE TABLE IF NOT EXISTS team_aliases (
+        alias VARCHAR(255) PRIMARY KEY,
+        team_id INTEGER NOT NULL REFERENCES teams(id) ON DELETE CASCADE,
+        source VARCHAR(50),
+        created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+    );
+    ALTER TABLE predictions ADD COLUMN IF NOT EXISTS home_team_id INTEGER REFERENCES teams(id);
+    ALTER TABLE predictions ADD COLUMN IF NOT EXISTS away_team_id INTEGER REFERENCES teams(id);
+    ALTER TABLE results ADD COLUMN IF NOT EXISTS home_team_id INTEGER REFERENCES teams(id);
+    ALTER TABLE results ADD COLUMN IF NOT EXISTS away_team_id INTEGER REFERENCES teams(id);
+    CREATE INDEX IF NOT EXISTS idx_predictions_team_ids ON predictions (home_team_id, away_team_id, match_time);
+    CREATE INDEX IF NOT EXISTS idx_results_team_ids ON results (home_team_id, away_team_id, match_time);
+"""
+
+_checked = False
+_checked_lock = threading.Lock()
+
+
+def _schema_is_current(cur):
+    cur.execute(
+        "SELECT count(*) FROM information_schema.tables "
+        "WHERE table_schema = current_schema() AND table_name IN %s",
+        (REQUIRED_TABLES,),
+    )
+    tables = cur.fetchone()[0]
+    cur.execute(
+        "SELECT count(*) FROM information_schema.columns "
+        "WHERE table_schema = current_schema() AND (table_name, column_name) IN %s",
+        (REQUIRED_COLUMNS,),
+    )
+    columns = cur.fetchone()[0]
+    return tables == len(REQUIRED_TABLES) and columns == len(REQUIRED_COLUMNS)
+
+
+def migrate(conn=None):
+    """
+    Доводит схему до справочника команд, если чего-то не хватает.
+    Возвращает True, если DDL выполнялся. Уже актуальную схему не трогает:
+    ALTER TABLE берёт эксклюзивную блокировку даже с IF NOT EXISTS.
+    """
+    own = conn is None
+    conn = conn or get_db_connection()
+    cur = conn.cursor()
+    try:
+        if _schema_is_current(cur):
+            conn.rollback()
+            return False
+        cur.execute("SELECT pg_advisory_xact_lock(%s)", (MIGRATION_LOCK_KEY,))
+        cur.execute(TEAM_REGISTRY_SQL)
+        conn.commit()
+        print("🛠️  Схема обновлена: справочник команд и колонки *_team_id")
+        return True
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+        if own:
+            conn.close()
+
+
+def ensure_schema():
+    """migrate() один раз на процесс"""
+    global _checked
+    with _checked_lock:
+        if not _checked:
+            migrate()
+            _checked = True
+
+
+if __name__ == "__main__":
+    if not migrate():
+        print("✅ Схема уже актуальна")
@@ -1,18 +1,37 @@
 # models.py
 from sqlalchemy import (
-    Column, Integer, String, DateTime, Boolean, create_engine, UniqueConstraint
+    Column, Integer, String, Date, DateTime, Boolean, ForeignKey, create_engine, UniqueConstraint
 )
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from datetime import datetime
 
+import migrate
+
 Base = declarative_base()
 
+class Team(Base):
+    """Команда с каноническим названием (team_registry)"""
+    __tablename__ = 'teams'
+    id = Column(Integer, primary_key=True)
+    name = Column(String(255), nullable=False, unique=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+class TeamAlias(Base):
+    """Нормализованное написание названия команды из какого-либо источника"""
+    __tablename__ = 'team_aliases'
+    alias = Column(String(255), primary_key=True)
+    team_id = Column(Integer, ForeignKey('teams.id', ondelete='CASCADE'), nullable=False)
+    source = Column(String(50))
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
 class Result(Base):
     __tablename__ = 'results'
     id = Column(Integer, primary_key=True)
     home_team = Column(String(255), nullable=False)
     away_team = Column(String(255), nullable=False)
+    home_team_id = Column(Integer, ForeignKey('teams.id'))
+    away_team_id = Column(Integer, ForeignKey('teams.id'))
     match_time = Column(DateTime, nullable=False)
     home_score = Column(Integer)
     away_score = Column(Integer)
@@ -28,6 +47,8 @@ class Prediction(Base):
     id = Column(Integer, primary_key=True)
     home_team = Column(String(255), nullable=False)
     away_team = Column(String(255), nullable=False)
+    home_team_id = Column(Integer, ForeignKey('teams.id'))
+    away_team_id = Column(Integer, ForeignKey('teams.id'))
     match_time = Column(DateTime, nullable=False)
     prediction_type = Column(String(50), nullable=False)
     prediction_value = Column(String(50), nullable=False)
@@ -41,8 +62,17 @@ class Analysis(Base):
     is_correct = Column(Boolean, nullable=False)
     analyzed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
+class BackfillCheckpoint(Base):
+    """Даты, уже полностью загруженные исторической догрузкой (backfill.py)"""
+    __tablename__ = 'backfill_checkpoints'
+    match_date = Column(Date, primary_key=True)
+    results_count = Column(Integer, nullable=False, default=0)
+    completed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
 # Функция для создания сессии
 def get_db_session():
+    # Колонки *_team_id в моделях есть и в базах, созданных до реестра команд
+    migrate.ensure_schema()
     engine = create_engine('postgresql://football_user:<password>@localhost:5432/football_db')
     Session = sessionmaker(bind=engine)
     return Session()
@@ -0,0 +1,120 @@
+# page_archive.py
+import gzip
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+
+# Архив сырых страниц: objects/<sha[:2]>/<sha>.gz + индекс index.jsonl (url, время, sha)
+ARCHIVE_DIR = os.getenv("SCORES24_ARCHIVE_DIR", "archive")
+
+_index_lock = threading.Lock()
+# Индекс по url в памяти: index.jsonl дочитывается с места, где остановились,
+# а не перечитывается целиком на каждую воспроизводимую страницу
+_url_index = {}
+_indexed_path = None
+_indexed_bytes = 0
+
+
+def _object_path(sha):
+    return os.path.join(ARCHIVE_DIR, "objects", sha[:2], sha + ".gz")
+
+
+def _index_path():
+    return os.path.join(ARCHIVE_DIR, "index.jsonl")
+
+
+def store(url, content: bytes):
+    """
+    Кладёт тело страницы в архив (один раз на содержимое) и дописывает
+    строку в индекс. Возвращает sha256 содержимого.
+    """
+    sha = hashlib.sha256(content).hexdigest()
+    path = _object_path(sha)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp_path, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+    entry = {
+        "url": url,
+        "sha256": sha,
+        "fetched_at": datetime.now().isoformat(),
+        "size": len(content),
+    }
+    line = json.dumps(entry, ensure_ascii=False) + "\n"
+    with _index_lock:
+        with open(_index_path(), "a", encoding="utf-8") as f:
+            f.write(line)
+    return sha
+
+
+def load(sha):
+    """Возвращает распакованное тело по sha256 или None."""
+    try:
+        with gzip.open(_object_path(sha), "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def iter_index(url=None):
+    """Перебирает записи индекса (по возрастанию времени), опционально для одного url."""
+    try:
+        f = open(_index_path(), encoding="utf-8")
+    except OSError:
+        return
+    with f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if url is None or entry["url"] == url:
+                yield entry
+
+
+def _entries_for(url):
+    """Записи индекса для url (по возрастанию времени) из индекса в памяти."""
+    global _indexed_path, _indexed_bytes
+    path = _index_path()
+    with _index_lock:
+        try:
+            f = open(path, "rb")
+        except OSError:
+            return []
+        with f:
+            size = os.fstat(f.fileno()).st_size
+            if path != _indexed_path or size < _indexed_bytes:
+                # Другой архив или индекс пересоздан — строим заново
+                _url_index.clear()
+                _indexed_path, _indexed_bytes = path, 0
+            f.seek(_indexed_bytes)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # строка ещё дописывается
+                _indexed_bytes += len(line)
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                _url_index.setdefault(entry["url"], []).append(entry)
+        return list(_url_index.get(url, ()))
+
+
+def load_latest(url, before=None):
+    """
+    Последняя архивная версия страницы (bytes) или None.
+    before — ISO-время, чтобы воспроизвести состояние на момент в прошлом.
+    """
+    latest = None
+    for entry in _entries_for(url):
+        if before is not None and entry["fetched_at"] > before:
+            continue
+        latest = entry
+    if latest is None:
+        return None
+    return load(latest["sha256"])
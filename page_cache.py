@@ -0,0 +1,115 @@
+# page_cache.py
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+
+# Каталог дискового кэша страниц (валидаторы + тело ответа)
+CACHE_DIR = os.getenv("SCORES24_CACHE_DIR", os.path.join(".cache", "pages"))
+# Постоянное хранилище "запечатанных" страниц: все матчи дня завершены
+SEALED_DIR = os.getenv("SCORES24_SEALED_DIR", os.path.join(".cache", "sealed"))
+
+# Валидаторы и печати хранятся отдельно для каждого потребителя (namespace):
+# 304 или печать значат "этот потребитель уже сохранил результаты страницы".
+# Общий на всех ключ по url отдал бы одному скрипту страницу, которую
+# сохранил другой, и свои прогнозы по ней первый уже не сверил бы.
+
+
+def _key(url, namespace=None):
+    if namespace:
+        url = f"{namespace}:{url}"
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+
+def _paths(url, namespace=None):
+    base = os.path.join(CACHE_DIR, _key(url, namespace))
+    return base + ".json", base + ".html"
+
+
+def _write_atomic(path, data, encoding="utf-8"):
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding=encoding) as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def load(url, namespace=None):
+    """Возвращает (meta, html) из кэша потребителя или (None, None), если записи нет."""
+    meta_path, body_path = _paths(url, namespace)
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        with open(body_path, encoding="utf-8") as f:
+            html = f.read()
+    except (OSError, ValueError):
+        return None, None
+    return meta, html
+
+
+def conditional_headers(meta):
+    """Заголовки If-None-Match / If-Modified-Since для ревалидации записи."""
+    headers = {}
+    if not meta:
+        return headers
+    if meta.get("etag"):
+        headers["If-None-Match"] = meta["etag"]
+    if meta.get("last_modified"):
+        headers["If-Modified-Since"] = meta["last_modified"]
+    return headers
+
+
+def validators(response):
+    """ETag / Last-Modified ответа или None, если их нет (такие ответы не кэшируем)."""
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if not etag and not last_modified:
+        return None
+    return {"etag": etag, "last_modified": last_modified}
+
+
+def store(url, html, page_validators, namespace=None):
+    """Сохраняет тело страницы и её валидаторы. Без валидаторов не кэшируем."""
+    if not page_validators:
+        return False
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    meta_path, body_path = _paths(url, namespace)
+    meta = {
+        "url": url,
+        "namespace": namespace,
+        "etag": page_validators.get("etag"),
+        "last_modified": page_validators.get("last_modified"),
+        "stored_at": datetime.now().isoformat(),
+    }
+    # Сначала тело, потом мета: мета без тела не появится
+    _write_atomic(body_path, html)
+    _write_atomic(meta_path, json.dumps(meta, ensure_ascii=False))
+    return True
+
+
+def commit(page):
+    """
+    Запоминает валидаторы скачанной страницы (http_client.Page). Вызывается
+    только после того, как результаты страницы записаны в БД: иначе
+    следующий запуск получит 304 и эту дату больше не разберёт.
+    Валидаторы попадают в namespace, с которым страница была скачана.
+    """
+    if page is None or page.not_modified:
+        return False
+    return store(page.url, page.text, page.validators, page.namespace)
+
+
+def seal(url, html, namespace=None):
+    """Навсегда сохраняет страницу: дальше она отдаётся из хранилища без сети."""
+    os.makedirs(SEALED_DIR, exist_ok=True)
+    _write_atomic(os.path.join(SEALED_DIR, _key(url, namespace) + ".html"), html)
+
+
+def load_sealed(url, namespace=None):
+    """Возвращает html страницы, запечатанной этим потребителем, или None."""
+    try:
+        with open(os.path.join(SEALED_DIR, _key(url, namespace) + ".html"), encoding="utf-8") as f:
+            return f.read()
+    except OSError:
+        return None
@@ -0,0 +1,79 @@
+# parse_pool.py
+# Разбор страниц результатов в пуле процессов. Парсинг упирается в CPU и
+# GIL, поэтому в одном процессе занято одно ядро, пока остальные простаивают.
+# Сюда уходят сырые страницы, обратно приходят компактные ScrapedResult
+# (их строки интернируются заново уже в родителе), причём в исходном
+# порядке и с ограничением числа страниц "в полёте": пока потребитель
+# (запись в БД) не забрал результат, новые страницы из входного
+# итератора не читаются.
+# Пул нужен только backfill (диапазоны в сотни дат). Pipeline разбирает
+# свои несколько страниц в текущем процессе: там извлекатели делят один
+# разбор страницы (PageContext), а дат меньше PARSE_INLINE_PAGES.
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
+
+import results_parser_orm
+from records import reintern_results
+
+PARSE_WORKERS = int(os.getenv("SCORES24_PARSE_WORKERS", str(os.cpu_count() or 2)))
+# Сколько страниц на один процесс может ждать разбора или выдачи
+PARSE_PREFETCH = int(os.getenv("SCORES24_PARSE_PREFETCH", "2"))
+# До скольких страниц разбираем в текущем процессе: запуск пула и передача
+# страниц в процессы дороже разбора пары дат
+PARSE_INLINE_PAGES = int(os.getenv("SCORES24_PARSE_INLINE_PAGES", "4"))
+
+
+def _parse_html(content, date_str):
+    return results_parser_orm.parse_results_page(content, date_str)
+
+
+PARSERS = {"html": _parse_html}
+
+
+def _parse_safe(parser, content, date_str):
+    try:
+        return PARSERS[parser](content, date_str)
+    except Exception as e:
+        print(f"❌ {date_str}: ошибка разбора: {e}")
+        return None, False
+
+
+def _collect(key, future):
+    # Строки из дочернего процесса приходят копиями — интернируем их здесь
+    records, all_finished = future.result()
+    if records is not None:
+        records = reintern_results(records)
+    return key, records, all_finished
+
+
+def parse_pages(pages, parser="html", workers=None, prefetch=None):
+    """
+    pages — итерируемое (key, content, date_str), content — str или bytes.
+    Отдаёт (key, records, all_finished) в том же порядке; records=None,
+    если страницу не удалось разобрать. parser — ключ PARSERS ("html").
+    workers=1 или не больше PARSE_INLINE_PAGES страниц — разбор в текущем
+    процессе, без пула; процессов не больше, чем страниц.
+    """
+    workers = workers or PARSE_WORKERS
+    pages = iter(pages)
+    # Смотрим наперёд, сколько страниц, не вычитывая весь (ленивый) вход
+    head = list(islice(pages, max(PARSE_INLINE_PAGES, workers) + 1))
+    if len(head) <= max(PARSE_INLINE_PAGES, workers):
+        workers = min(workers, len(head))  # вход кончился — страниц len(head)
+    if workers <= 1 or len(head) <= PARSE_INLINE_PAGES:
+        for key, content, date_str in chain(head, pages):
+            yield (key,) + _parse_safe(parser, content, date_str)
+        return
+    pages = chain(head, pages)
+
+    limit = workers * (prefetch or PARSE_PREFETCH)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = deque()
+        for key, content, date_str in pages:
+            in_flight.append((key, pool.submit(_parse_safe, parser, content, date_str)))
+            if len(in_flight) >= limit:
+                yield _collect(*in_flight.popleft())
+        while in_flight:
+            yield _collect(*in_flight.popleft())
@@ -0,0 +1,285 @@
+# pipeline.py
+# Одна загрузка страницы — много извлекателей. Страницы с датой и страница
+# трендов качаются один раз (http_client.fetch_pages), URQL-кэш страницы
+# индексируется один раз и каждая нужная операция декодируется один раз
+# (PageContext), а затем страница раздаётся всем зарегистрированным
+# извлекателям своего вида. Каждый извлекатель отдаёт типизированные
+# записи (records.py) в свои приёмники.
+#
+# Виды страниц: "results" — /ru/soccer/{date}, "trends" — тренды BTTS.
+# Запускаются только извлекатели, на которые кто-то подписан.
+# Через Pipeline обновляют результаты results_json_parser (final_scores)
+# и results_parser_orm (html_scores).
+#   python pipeline.py [дней назад] [--save] [--replay]
+import json
+import sys
+from datetime import date, datetime, timedelta
+
+import http_client
+import page_cache
+import trend_crawler
+import urql
+from records import make_league, make_odds
+from results_json_parser import RESULTS_URL, results_from_leagues
+from scores_parser import edges_to_matches
+
+TRENDS_URL = "https://scores24.live/ru/trends/soccer?trendsMarketSlug=btts"
+
+_UNSET = object()
+
+
+class PageContext:
+    """Скачанная страница и общие для всех извлекателей разборы (ленивые, по разу)"""
+
+    def __init__(self, url, kind, text, day=None, page=None):
+        self.url = url
+        self.kind = kind
+        self.text = text
+        self.day = day
+        self.page = page  # http_client.Page (валидаторы для page_cache.commit)
+        self.fetched_at = datetime.now()
+        # Все матчи страницы с датой завершены (заполняет html_scores)
+        self.all_finished = False
+        # Какой-то извлекатель упал: валидаторы страницы не сохраняем
+        self.failed = False
+        self._payload = _UNSET
+        self._index = None
+        self._operations = {}
+        self._trend_edges = None
+
+    def payload(self):
+        """Сырой JSON.parse("...") из URQL_DATA или None"""
+        if self._payload is _UNSET:
+            self._payload = urql.extract_payload(self.text)
+        return self._payload
+
+    def operation(self, name):
+        """Данные операции URQL-кэша (TrendList, leaguesList, ...) или None"""
+        if name not in self._operations:
+            if self._index is None:
+                payload = self.payload()
+                self._index = (urql.index_operations(payload) if payload is not None
+                               else urql.OperationIndex())
+            raw = self._index.find(name)
+            self._operations[name] = json.loads(raw)[name] if raw else None
+        return self._operations[name]
+
+    def trend_edges(self):
+        """
+        Все edges TrendList: первая страница из кэша страницы, остальные
+        дочитываются по курсору pageInfo (trend_crawler), один раз на страницу.
+        """
+        if self._trend_edges is None:
+            self._trend_edges = trend_crawler.continue_trends(self.operation("TrendList") or {})
+        return self._trend_edges
+
+
+# Реестр: вид страницы -> {имя извлекателя: функция(ctx) -> записи}
+EXTRACTORS = {"results": {}, "trends": {}}
+
+
+def extractor(kind, name):
+    """Декоратор регистрации извлекателя для страниц вида kind"""
+    def register(func):
+        EXTRACTORS[kind][name] = func
+        return func
+    return register
+
+
+@extractor("results", "final_scores")
+def extract_final_scores(ctx):
+    leagues_list = ctx.operation("leaguesList") or {}
+    return results_from_leagues(leagues_list.get("leagues") or [])
+
+
+@extractor("results", "html_scores")
+def extract_html_scores(ctx):
+    """Завершённые матчи из HTML-карточек; заодно отмечает, завершён ли весь день"""
+    # results_parser_orm сам обновляется через Pipeline — импорт здесь, без цикла
+    from results_parser_orm import parse_results_page
+    day = ctx.day.strftime("%Y-%m-%d") if ctx.day is not None else None
+    matches, ctx.all_finished = parse_results_page(ctx.text, day)
+    return matches
+
+
+@extractor("results", "leagues")
+def extract_leagues(ctx):
+    leagues_list = ctx.operation("leaguesList") or {}
+    leagues = []
+    for item in leagues_list.get("leagues") or []:
+        league = item.get("league") or {}
+        leagues.append(make_league(
+            league.get("name", ""),
+            league.get("slug", ""),
+            (league.get("country") or {}).get("name"),
+            len(item.get("matches") or []),
+        ))
+    return leagues
+
+
+@extractor("trends", "btts_trends")
+def extract_btts_trends(ctx):
+    return edges_to_matches(ctx.trend_edges(), ctx.fetched_at)
+
+
+@extractor("trends", "odds")
+def extract_odds(ctx):
+    odds = []
+    for edge in ctx.trend_edges():
+        node = edge["node"]
+        match = node["match"]
+        for group in node.get("groups") or []:
+            odds.append(make_odds(
+                match["teams"][0]["name"],
+                match["teams"][1]["name"],
+                match["matchDate"],
+                group["name"],
+                float(group["minOdd"]),
+                float(group["maxOdd"]),
+                [b["slug"] for b in group.get("bookmakers") or []],
+                ctx.fetched_at,
+            ))
+    return odds
+
+
+class CollectSink:
+    """Приёмник, который просто копит записи в список"""
+
+    def __init__(self):
+        self.records = []
+
+    def __call__(self, records, ctx):
+        self.records.extend(records)
+
+
+class Pipeline:
+    """
+    Страницы качаются один раз и раздаются всем подписанным извлекателям.
+    namespace — имя потребителя: валидаторы и печати страниц у каждого свои
+    (page_cache), чтобы 304 означал "этот потребитель страницу уже сохранил".
+    """
+
+    def __init__(self, namespace):
+        self.namespace = namespace
+        # имя извлекателя -> приёмники sink(records, ctx)
+        self.sinks = {}
+        # Разобранные страницы последнего run (PageContext)
+        self.contexts = []
+
+    def add_sink(self, name, sink):
+        if not any(name in by_name for by_name in EXTRACTORS.values()):
+            raise ValueError(f"Неизвестный извлекатель: {name}")
+        self.sinks.setdefault(name, []).append(sink)
+        return sink
+
+    def wants(self, kind):
+        return any(name in self.sinks for name in EXTRACTORS[kind])
+
+    def run(self, targets, skip_unchanged=True):
+        """
+        targets — список (url, вид, дата или None). Каждый url качается
+        один раз, даже если нужен нескольким извлекателям. Страницы без
+        изменений (304) и запечатанные пропускаются, если skip_unchanged.
+        Валидаторы страниц не сохраняются: после записи результатов в БД
+        вызывающий делает commit_pages().
+        Возвращает {имя извлекателя: число записей}.
+        """
+        targets = [t for t in targets if self.wants(t[1])]
+        pages = http_client.fetch_pages(list(dict.fromkeys(url for url, _, _ in targets)),
+                                        namespace=self.namespace)
+        counts = {}
+        self.contexts = []
+
+        for url, kind, day in targets:
+            page = pages.get(url)
+            if page is None:
+                continue
+            if skip_unchanged and page.sealed:
+                print(f"🔒 {url}: дата запечатана, результаты уже сохранены")
+                continue
+            if skip_unchanged and page.not_modified:
+                print(f"♻️  {url}: страница не изменилась (304), пропускаем")
+                continue
+            ctx = PageContext(url, kind, page.text, day, page)
+            self.contexts.append(ctx)
+            for name, func in EXTRACTORS[kind].items():
+                sinks = self.sinks.get(name)
+                if not sinks:
+                    continue
+                try:
+                    records = func(ctx)
+                except Exception as e:
+                    print(f"❌ {name}: ошибка извлечения {url}: {e}")
+                    ctx.failed = True
+                    continue
+                for sink in sinks:
+                    sink(records, ctx)
+                counts[name] = counts.get(name, 0) + len(records)
+        return counts
+
+    def commit_pages(self, contexts=None):
+        """
+        Запоминает валидаторы страниц последнего run (или только contexts),
+        разобранных без ошибок. Вызывать после того, как их записи сохранены,
+        иначе следующий запуск получит 304 и результаты страницы потеряются.
+        """
+        for ctx in self.contexts if contexts is None else contexts:
+            if not ctx.failed:
+                page_cache.commit(ctx.page)
+
+    def seal(self, ctx):
+        """Запечатывает страницу для этого потребителя (page_cache.seal)"""
+        page_cache.seal(ctx.url, ctx.text, self.namespace)
+
+
+def refresh_targets(days, trends=True):
+    """Цели для совместного обновления: страницы дат + (опционально) тренды"""
+    targets = [(RESULTS_URL.format(date=d.strftime("%Y-%m-%d")), "results", d) for d in days]
+    if trends:
+        targets.append((TRENDS_URL, "trends", None))
+    return targets
+
+
+def save_past_scores(records, ctx):
+    """
+    Приёмник --save: итоговые счета прошедших дней в results (backfill.save_date).
+    Сегодняшний день не пишем — его матчи ещё идут, а сохранённый
+    результат больше не перечитывается.
+    """
+    if ctx.day is None or ctx.day >= date.today():
+        return
+    from backfill import save_date
+    save_date(ctx.day, records, False)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    args = [a for a in argv if not a.startswith("--")]
+    days_back = int(args[0]) if args else 2
+
+    print("🔀 ОБЩЕЕ ОБНОВЛЕНИЕ ПРОГНОЗОВ И РЕЗУЛЬТАТОВ")
+    print("=" * 50)
+
+    pipeline = Pipeline("pipeline")
+    sinks = {name: pipeline.add_sink(name, CollectSink())
+             for by_name in EXTRACTORS.values() for name in by_name}
+    save = "--save" in argv
+    if save:
+        pipeline.add_sink("final_scores", save_past_scores)
+
+    days = [date.today() - timedelta(days=i) for i in range(days_back + 1)]
+    pipeline.run(refresh_targets(days))
+    if save:
+        # Только сохранённые страницы: сегодняшний день и тренды save_past_scores
+        # не пишет, их 304 при следующем запуске потерял бы данные
+        pipeline.commit_pages([ctx for ctx in pipeline.contexts
+                               if ctx.day is not None and ctx.day < date.today()])
+
+    print("\n🎯 ИТОГ:")
+    for name, sink in sinks.items():
+        print(f"   {name}: {len(sink.records)} записей")
+
+
+if __name__ == "__main__":
+    http_client.enable_replay_from_argv()
+    main()
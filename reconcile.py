@@ -0,0 +1,264 @@
+# reconcile.py
+# Сверка пачки результатов с прогнозами на стороне БД. Вместо того чтобы
+# тянуть прогнозы без результатов в Python и писать каждое совпадение
+# отдельным запросом (N обращений к БД), пачка целиком:
+#   1. создаёт временную таблицу scraped_results (ON COMMIT DROP);
+#   2. загружается в неё одним COPY;
+#   3. одним запросом соединяется с predictions и пишет results и analysis.
+# Всё — одна транзакция, ~3 обращения к БД на пачку, сопоставление делает
+# Postgres по индексам (ключи названий с временем, GIN-триграммы названий).
+# Правила те же, что в result_matcher: жёсткое окно ±TIME_WINDOW_HOURS,
+# уверенность = гармоническое среднее сходства хозяев и гостей, уменьшенное
+# на разнице во времени начала, порог MIN_CONFIDENCE, из равных — матч,
+# загруженный раньше. Названия сравниваются так же, как в result_matcher:
+# точное совпадение — по ключу normalize_name (TEAM_KEY_SQL: без регистра,
+# ё, пробелов и знаков), сходство — similarity() из pg_trgm по словам
+# названия без регистра и ё (TEAM_WORDS_SQL, те же триграммы, что
+# result_matcher.trigrams). Оба выражения проиндексированы в init-db.sql.
+# Без pg_trgm (RECONCILE_TRGM) совпадать должны ключи названий или id
+# команд из реестра. Уверенные пары запрос возвращает, и они, как в
+# обычном пути, пополняют реестр команд (registry.link + flush).
+import csv
+import io
+import os
+import sys
+
+from database import get_db_connection
+from result_matcher import MIN_CONFIDENCE, TIME_WEIGHT, TIME_WINDOW_HOURS
+
+# Включить сверку в БД вместо сопоставления в Python (или флаг --reconcile)
+RECONCILE = os.getenv("SCORES24_RECONCILE") == "1"
+# Нечёткое сравнение названий через pg_trgm (если расширение установлено)
+RECONCILE_TRGM = os.getenv("SCORES24_RECONCILE_TRGM", "1") == "1"
+
+COLUMNS = ("batch_order", "home_team", "away_team", "home_team_id", "away_team_id",
+           "match_time", "home_score", "away_score", "status", "source")
+
+CREATE_SQL = """
+    CREATE TEMP TABLE scraped_results (
+        batch_order INTEGER NOT NULL,
+        home_team TEXT NOT NULL,
+        away_team TEXT NOT NULL,
+        home_team_id INTEGER,
+        away_team_id INTEGER,
+        match_time TIMESTAMP,
+        home_score INTEGER,
+        away_score INTEGER,
+        status TEXT,
+        source TEXT
+    ) ON COMMIT DROP;
+    SELECT set_config('pg_trgm.similarity_threshold', %(side_min)s, true),
+           EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm');
+"""
+
+COPY_SQL = "COPY scraped_results ({}) FROM STDIN WITH (FORMAT csv)".format(", ".join(COLUMNS))
+
+# Ключ названия как result_matcher.normalize_name: без регистра, ё, пробелов и знаков.
+# Индексы idx_predictions_name_keys / *_words_trgm в init-db.sql построены
+# ровно по этим выражениям — менять вместе
+TEAM_KEY_SQL = r"regexp_replace(lower(translate({}, 'Ёё', 'Ее')), '\W', '', 'g')"
+# Слова названия без регистра и ё: pg_trgm режет их на триграммы "  слово "
+# так же, как result_matcher.trigrams
+TEAM_WORDS_SQL = "lower(translate({}, 'Ёё', 'Ее'))"
+
+
+# Кандидат: прогноз без результата × строка пачки в окне времени.
+# {join} — условие на команды, {name_score} — сходство названий 0..1
+_CANDIDATES_SQL = """
+    SELECT p.id AS prediction_id, p.home_team, p.away_team, p.match_time,
+           p.prediction_value, s.batch_order,
+           s.home_team AS scraped_home, s.away_team AS scraped_away,
+           s.home_score, s.away_score, s.status, s.source,
+           COALESCE(p.home_team_id, s.home_team_id) AS home_team_id,
+           COALESCE(p.away_team_id, s.away_team_id) AS away_team_id,
+           {name_score} * CASE
+               WHEN s.match_time IS NULL THEN 1.0
+               ELSE 1 - %(time_weight)s * abs(extract(epoch FROM s.match_time - p.match_time))
+                        / 3600 / %(window_hours)s
+           END AS confidence
+    FROM scraped_results s
+    JOIN predictions p
+      ON {join}
+     AND (s.match_time IS NULL
+          OR p.match_time > s.match_time - %(window_hours)s * INTERVAL '1 hour'
+             AND p.match_time < s.match_time + %(window_hours)s * INTERVAL '1 hour')
+    WHERE NOT EXISTS (
+        SELECT 1 FROM results r
+        WHERE r.home_team = p.home_team
+          AND r.away_team = p.away_team
+          AND r.match_time = p.match_time
+    )
+"""
+
+_BY_IDS = _CANDIDATES_SQL.format(
+    join="p.home_team_id = s.home_team_id AND p.away_team_id = s.away_team_id",
+    name_score="1.0",
+)
+
+_BY_EXACT_NAMES = _CANDIDATES_SQL.format(
+    join=(f"{TEAM_KEY_SQL.format('p.home_team')} = {TEAM_KEY_SQL.format('s.home_team')} "
+          f"AND {TEAM_KEY_SQL.format('p.away_team')} = {TEAM_KEY_SQL.format('s.away_team')}"),
+    name_score="1.0",
+)
+
+
+def _similarity(side):
+    return (f"similarity({TEAM_WORDS_SQL.format(f'p.{side}_team')}, "
+            f"{TEAM_WORDS_SQL.format(f's.{side}_team')})")
+
+
+# % — similarity() не ниже pg_trgm.similarity_threshold (side_min), по GIN-индексу
+_BY_SIMILAR_NAMES = _CANDIDATES_SQL.format(
+    join=(f"{TEAM_WORDS_SQL.format('p.home_team')} %% {TEAM_WORDS_SQL.format('s.home_team')} "
+          f"AND {TEAM_WORDS_SQL.format('p.away_team')} %% {TEAM_WORDS_SQL.format('s.away_team')}"),
+    name_score=(
+        f"(CASE WHEN {TEAM_KEY_SQL.format('p.home_team')} = {TEAM_KEY_SQL.format('s.home_team')} "
+        f"AND {TEAM_KEY_SQL.format('p.away_team')} = {TEAM_KEY_SQL.format('s.away_team')} THEN 1.0 "
+        f"ELSE 2 * {_similarity('home')} * {_similarity('away')} "
+        f"/ ({_similarity('home')} + {_similarity('away')}) END)"
+    ),
+)
+
+RECONCILE_SQL = """
+    ANALYZE scraped_results;
+    WITH candidates AS (
+        {by_ids}
+        UNION ALL
+        {by_names}
+    ),
+    matched AS (
+        SELECT * FROM (
+            SELECT DISTINCT ON (prediction_id) *
+            FROM candidates
+            ORDER BY prediction_id, confidence DESC, batch_order
+        ) best
+        WHERE confidence >= %(min_confidence)s
+    ),
+    upserted AS (
+        -- Несколько прогнозов (разные типы) на один матч — одна строка results
+        INSERT INTO results (home_team, away_team, home_team_id, away_team_id, match_time,
+                             home_score, away_score, status, updated_at)
+        SELECT DISTINCT ON (home_team, away_team, match_time)
+               home_team, away_team, home_team_id, away_team_id, match_time,
+               home_score, away_score, status, NOW()
+        FROM matched
+        ORDER BY home_team, away_team, match_time, confidence DESC
+        ON CONFLICT (home_team, away_team, match_time)
+        DO UPDATE SET
+            home_score = EXCLUDED.home_score,
+            away_score = EXCLUDED.away_score,
+            status = EXCLUDED.status,
+            home_team_id = COALESCE(EXCLUDED.home_team_id, results.home_team_id),
+            away_team_id = COALESCE(EXCLUDED.away_team_id, results.away_team_id),
+            updated_at = NOW()
+        RETURNING id, home_team, away_team, match_time, (xmax = 0) AS inserted
+    ),
+    analyzed AS (
+        INSERT INTO analysis (prediction_id, result_id, is_correct)
+        SELECT m.prediction_id, u.id,
+               (lower(m.prediction_value) IN ('yes', 'да', 'true'))
+               = (COALESCE(m.home_score, 0) > 0 AND COALESCE(m.away_score, 0) > 0)
+        FROM matched m
+        JOIN upserted u USING (home_team, away_team, match_time)
+        RETURNING prediction_id, is_correct
+    )
+    SELECT m.home_team, m.away_team, m.scraped_home, m.scraped_away,
+           m.home_score, m.away_score, m.source, m.confidence, a.is_correct,
+           (SELECT count(*) FILTER (WHERE inserted) FROM upserted),
+           (SELECT count(*) FILTER (WHERE NOT inserted) FROM upserted)
+    FROM analyzed a
+    JOIN matched m USING (prediction_id)
+    ORDER BY m.match_time, m.home_team
+"""
+
+
+def enabled(argv=None):
+    """Сверка в БД включена: SCORES24_RECONCILE=1 или флаг --reconcile"""
+    argv = sys.argv if argv is None else argv
+    return RECONCILE or "--reconcile" in argv
+
+
+def _copy_payload(results, registry=None):
+    """ScrapedResult → CSV для COPY (пустое поле — NULL)"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    for batch_order, result in enumerate(results):
+        if not result.home_team or not result.away_team:
+            continue
+        home_team_id, away_team_id = (
+            registry.resolve_pair(result.home_team, result.away_team)
+            if registry is not None else (None, None)
+        )
+        writer.writerow((
+            batch_order, result.home_team, result.away_team, home_team_id, away_team_id,
+            result.match_time, result.home_score, result.away_score, result.status,
+            result.source,
+        ))
+    buffer.seek(0)
+    return buffer
+
+
+def reconcile_results(results, registry=None, trgm=None, min_confidence=None, conn=None):
+    """
+    Сверяет пачку ScrapedResult с прогнозами без результатов прямо в БД:
+    пишет results и analysis одной транзакцией.
+    registry — реестр команд: известные ему команды сопоставляются по id,
+    уверенные пары пополняют его (link + flush после коммита).
+    trgm — сравнивать названия через pg_trgm (по умолчанию RECONCILE_TRGM;
+    если расширения нет — только точные названия).
+    Возвращает (вставлено результатов, обновлено результатов, проанализировано прогнозов).
+    """
+    if not results:
+        return 0, 0, 0
+    threshold = MIN_CONFIDENCE if min_confidence is None else min_confidence
+    # Гармоническое среднее ≥ threshold требует от каждой команды
+    # сходства не ниже threshold / (2 − threshold) (как в MatchIndex)
+    params = {
+        "side_min": str(threshold / (2 - threshold)),
+        "min_confidence": threshold,
+        "time_weight": TIME_WEIGHT,
+        "window_hours": TIME_WINDOW_HOURS,
+    }
+    trgm = RECONCILE_TRGM if trgm is None else trgm
+
+    own = conn is None
+    conn = conn or get_db_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute(CREATE_SQL, params)
+        _, has_trgm = cur.fetchone()
+        if trgm and not has_trgm:
+            print("⚠️  pg_trgm не установлен, сверяем только точные названия")
+        cur.copy_expert(COPY_SQL, _copy_payload(results, registry))
+        # Точный ключ — всегда (как by_pair в MatchIndex), сходство — если есть pg_trgm
+        by_names = _BY_EXACT_NAMES
+        if trgm and has_trgm:
+            by_names += "\n        UNION ALL\n" + _BY_SIMILAR_NAMES
+        cur.execute(RECONCILE_SQL.format(by_ids=_BY_IDS, by_names=by_names), params)
+        rows = cur.fetchall()
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+        if own:
+            conn.close()
+
+    correct = 0
+    for home_team, away_team, scraped_home, scraped_away, home_score, away_score, \
+            source, confidence, is_correct, _, _ in rows:
+        correct += bool(is_correct)
+        print(f"🎯 {home_team} vs {away_team} ← {scraped_home} vs {scraped_away} "
+              f"{home_score}:{away_score} (уверенность {confidence:.2f}, "
+              f"прогноз {'верный' if is_correct else 'неверный'})")
+        if registry is not None:
+            registry.link(home_team, away_team, scraped_home, scraped_away, confidence, source)
+    # Новые команды и написания — в реестр (и id команд строкам этого запуска)
+    if registry is not None:
+        registry.flush()
+
+    inserted, updated = (rows[0][-2], rows[0][-1]) if rows else (0, 0)
+    print(f"🗄️ Сверка в БД: {len(results)} результатов пачки, вставлено {inserted}, "
+          f"обновлено {updated}, проанализировано прогнозов {len(rows)} (верных {correct})")
+    return inserted, updated, len(rows)
@@ -0,0 +1,130 @@
+# records.py
+# Общие типы записей парсеров вместо словарей с разными ключами.
+# NamedTuple не заводит __dict__ на каждый объект, а названия команд,
+# лиг и статусов интернируются: в больших backfill'ах сотни тысяч записей
+# ссылаются на несколько тысяч одинаковых строк.
+import sys
+from datetime import datetime
+from typing import NamedTuple, Optional
+
+
+def intern_name(value):
+    """Обрезанная интернированная строка (None и пустые — как есть)"""
+    if not value:
+        return value
+    return sys.intern(value.strip())
+
+
+class ScrapedResult(NamedTuple):
+    """Итоговый счёт матча, распарсенный со страницы результатов"""
+    home_team: str
+    away_team: str
+    home_score: Optional[int]  # None — счёт не распознан (старые HTML-парсеры)
+    away_score: Optional[int]
+    status: str
+    match_time: Optional[datetime] = None
+    league: Optional[str] = None
+    source: str = "html"
+
+    @property
+    def score(self):
+        return f"{self.home_score}:{self.away_score}"
+
+    @property
+    def both_to_score(self):
+        return bool(self.home_score) and bool(self.away_score)
+
+
+class ScrapedPrediction(NamedTuple):
+    """Прогноз из TrendList; fetched_at — одно время на всю пачку"""
+    home_team: str
+    away_team: str
+    match_time: str
+    league: str
+    odd: float
+    fetched_at: datetime
+
+    def to_api(self):
+        """Словарь в формате ответа /matches/btts"""
+        return {
+            "teams": f"{self.home_team} vs {self.away_team}",
+            "time": self.match_time,
+            "league": self.league,
+            "probability": f"{self.odd:.2f}",
+            "timestamp": self.fetched_at.isoformat(),
+        }
+
+
+class ScrapedLeague(NamedTuple):
+    """Лига со страницы с датой (leaguesList)"""
+    name: str
+    slug: str
+    country: Optional[str]
+    matches_count: int
+
+
+class ScrapedOdds(NamedTuple):
+    """Коэффициенты рынка тренда (minOdd/maxOdd по букмекерам)"""
+    home_team: str
+    away_team: str
+    match_time: str
+    market: str
+    min_odd: float
+    max_odd: float
+    bookmakers: tuple
+    fetched_at: datetime
+
+
+def make_result(home_team, away_team, home_score, away_score, status,
+                match_time=None, league=None, source="html"):
+    """ScrapedResult с интернированными строками"""
+    return ScrapedResult(
+        intern_name(home_team),
+        intern_name(away_team),
+        home_score,
+        away_score,
+        intern_name(status),
+        match_time,
+        intern_name(league),
+        source,
+    )
+
+
+def reintern_results(results):
+    """
+    Заново интернирует строки ScrapedResult, пришедших из другого процесса
+    (parse_pool): pickle создаёт каждую строку заново, и интернирование,
+    сделанное в процессе разбора, в родителе теряется.
+    """
+    return [make_result(*result) for result in results]
+
+
+def make_prediction(home_team, away_team, match_time, league, odd, fetched_at):
+    """ScrapedPrediction с интернированными строками"""
+    return ScrapedPrediction(
+        intern_name(home_team),
+        intern_name(away_team),
+        match_time,
+        intern_name(league),
+        odd,
+        fetched_at,
+    )
+
+
+def make_league(name, slug, country, matches_count):
+    """ScrapedLeague с интернированными строками"""
+    return ScrapedLeague(intern_name(name), intern_name(slug), intern_name(country), matches_count)
+
+
+def make_odds(home_team, away_team, match_time, market, min_odd, max_odd, bookmakers, fetched_at):
+    """ScrapedOdds с интернированными строками"""
+    return ScrapedOdds(
+        intern_name(home_team),
+        intern_name(away_team),
+        match_time,
+        intern_name(market),
+        min_odd,
+        max_odd,
+        tuple(intern_name(b) for b in bookmakers),
+        fetched_at,
+    )
@@ -0,0 +1,268 @@
+# result_matcher.py
+# Сопоставление прогнозов с результатами без перебора "каждый с каждым".
+# Названия команд разбираются на триграммы один раз при построении индекса
+# (как в pg_trgm: слова отдельно, с отступами "  слово "), дальше:
+#   - точное совпадение пары (хозяева, гости) — поиск в словаре;
+#   - иначе кандидаты берутся из обратного индекса триграмм, причём только
+#     по самым редким триграммам запроса (префиксный фильтр): матч, у которого
+#     нет ни одной из них, заведомо не наберёт порог сходства. Частые триграммы
+#     ("  с", "ий ") с огромными списками так не перебираются.
+# Сходство команды — доля общих триграмм (общие / все различные, как
+# similarity() в pg_trgm). Уверенность = гармоническое среднее сходства
+# хозяев и гостей (одна точная команда не вытягивает чужую вторую),
+# уменьшенное на разнице во времени начала, если время известно с обеих сторон.
+# Подстрочное правило ("Реал" in "Реал Сосьедад") больше не используется:
+# короткое название совпадает с длинным лишь частично, и выигрывает
+# матч, у которого совпали обе команды и время.
+# Время начала — ещё и жёсткий фильтр: прогноз ищется только в
+# ±TIME_WINDOW_HOURS от своего времени, так что та же пара команд в другой
+# день не подходит. Обратные индексы триграмм заведены и по корзинам времени
+# начала (BUCKET_HOURS часов): списки кандидатов берутся только из корзин
+# окна, и в многодневных пачках (backfill за месяц) их столько же, сколько
+# в одном дне. Матчи без времени (с любой стороны) под фильтр не попадают.
+import math
+import os
+import re
+from datetime import datetime
+from operator import attrgetter
+
+# Ниже этой уверенности матч не считается найденным
+MIN_CONFIDENCE = float(os.getenv("SCORES24_MATCH_MIN_CONFIDENCE", "0.5"))
+# Окно поиска по времени начала (часы): дальше — не кандидат,
+# внутри вклад времени в уверенность падает от 1 до 0 к краю окна
+TIME_WINDOW_HOURS = float(os.getenv("SCORES24_MATCH_TIME_WINDOW_HOURS", "12"))
+# Доля уверенности, которая зависит от времени начала
+TIME_WEIGHT = 0.25
+# Ширина корзины времени начала в индексе (часы)
+BUCKET_HOURS = 6
+
+
+def normalize_name(name: str) -> str:
+    return re.sub(r"[^\w]", "", name.lower().replace("ё", "е").strip())
+
+
+def trigrams(name):
+    """Триграммы названия как в pg_trgm: по словам, с отступами "  слово " """
+    grams = set()
+    for word in re.findall(r"\w+", (name or "").lower().replace("ё", "е")):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def _naive(value):
+    """datetime без часового пояса (для сравнения наивного и aware) или None"""
+    if not isinstance(value, datetime):
+        return None
+    return value.replace(tzinfo=None) if value.tzinfo is not None else value
+
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _hour(value):
+    """Номер часа от эпохи (корзина времени начала) или None"""
+    value = _naive(value)
+    if value is None:
+        return None
+    return int((value - _EPOCH).total_seconds() // 3600)
+
+
+def time_score(a, b):
+    """1 — одно время, 0 — разница TIME_WINDOW_HOURS и больше (вне окна); None — время неизвестно"""
+    a, b = _naive(a), _naive(b)
+    if a is None or b is None:
+        return None
+    hours = abs((a - b).total_seconds()) / 3600
+    return max(0.0, 1.0 - hours / TIME_WINDOW_HOURS)
+
+
+def similarity(a, b):
+    """Сходство множеств триграмм (0..1)"""
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared) if shared else 0.0
+
+
+def name_similarity(a, b):
+    """Сходство двух названий: 1 — совпадают после normalize_name, иначе по триграммам"""
+    if normalize_name(a or "") == normalize_name(b or ""):
+        return 1.0
+    return similarity(trigrams(a), trigrams(b))
+
+
+def name_score(home_similarity, away_similarity):
+    """Гармоническое среднее: обе команды должны быть похожи"""
+    total = home_similarity + away_similarity
+    return 2 * home_similarity * away_similarity / total if total else 0.0
+
+
+def confidence(name_score, kickoff_score):
+    if kickoff_score is None:
+        return name_score
+    return name_score * (1 - TIME_WEIGHT + TIME_WEIGHT * kickoff_score)
+
+
+class MatchIndex:
+    """
+    Индекс матчей пачки по названиям команд. teams(item) → (хозяева, гости),
+    kickoff(item) → время начала или None; по умолчанию — атрибуты
+    home_team/away_team/match_time (ScrapedResult, Prediction).
+    Найденное можно убрать из индекса (remove), чтобы один матч
+    не сопоставился дважды. registry — реестр команд (team_registry):
+    если обе команды в нём известны, пара ищется по id команд.
+    """
+
+    def __init__(self, items=(), teams=attrgetter("home_team", "away_team"),
+                 kickoff=attrgetter("match_time"), registry=None):
+        self.teams = teams
+        self.kickoff = kickoff
+        self.registry = registry
+        self.by_ids = {}
+        self.items = []
+        self.kickoffs = []
+        self.hours = []
+        self.home_sets = []
+        self.away_sets = []
+        self.removed = set()
+        self.positions = {}  # id(item) -> номер; item живёт в self.items
+        self.by_pair = {}
+        # Обратные индексы: триграмма -> номера матчей (отдельно хозяева и гости)
+        self.home_grams = {}
+        self.away_grams = {}
+        # То же по корзинам времени: (корзина или None, триграмма) -> номера матчей
+        self.home_bucket_grams = {}
+        self.away_bucket_grams = {}
+        for item in items:
+            self.add(item)
+
+    def __len__(self):
+        return len(self.items) - len(self.removed)
+
+    def add(self, item):
+        i = len(self.items)
+        home, away = self.teams(item)
+        home_grams, away_grams = trigrams(home), trigrams(away)
+        self.items.append(item)
+        kickoff = self.kickoff(item)
+        self.kickoffs.append(kickoff)
+        hour = _hour(kickoff)
+        self.hours.append(hour)
+        bucket = None if hour is None else hour // BUCKET_HOURS
+        self.home_sets.append(frozenset(home_grams))
+        self.away_sets.append(frozenset(away_grams))
+        self.positions[id(item)] = i
+        self.by_pair.setdefault((normalize_name(home or ""), normalize_name(away or "")), []).append(i)
+        if self.registry is not None:
+            ids = self.registry.resolve_pair(home, away)
+            if None not in ids:
+                self.by_ids.setdefault(ids, []).append(i)
+        for gram in home_grams:
+            self.home_grams.setdefault(gram, []).append(i)
+            self.home_bucket_grams.setdefault((bucket, gram), []).append(i)
+        for gram in away_grams:
+            self.away_grams.setdefault(gram, []).append(i)
+            self.away_bucket_grams.setdefault((bucket, gram), []).append(i)
+
+    def remove(self, item):
+        """Убирает найденный матч из дальнейших поисков"""
+        i = self.positions.get(id(item))
+        if i is not None:
+            self.removed.add(i)
+
+    def remaining(self):
+        """Ещё не найденные (не убранные) матчи в порядке добавления"""
+        return [item for i, item in enumerate(self.items) if i not in self.removed]
+
+    def _prefix(self, index, bucket_index, grams, buckets, min_similarity):
+        """
+        Списки матчей по самым редким триграммам grams, которых достаточно,
+        чтобы не потерять матч со сходством не ниже min_similarity: при
+        сходстве s общих триграмм не меньше ceil(s·|grams|), значит среди
+        |grams| − ceil(s·|grams|) + 1 самых редких хоть одна общая.
+        buckets — корзины окна времени (None — все матчи).
+        """
+        if buckets is None:
+            per_gram = [[index.get(gram, ())] for gram in grams]
+        else:
+            per_gram = [[bucket_index.get((bucket, gram), ()) for bucket in buckets]
+                        for gram in grams]
+        per_gram.sort(key=lambda lists: sum(map(len, lists)))
+        size = len(per_gram) - math.ceil(min_similarity * len(per_gram)) + 1
+        return [posting for lists in per_gram[:max(size, 1)] for posting in lists]
+
+    def match(self, home_team, away_team, kickoff=None, min_confidence=None):
+        """
+        Лучший матч для пары команд: (матч, уверенность 0..1) или (None, 0.0),
+        если никто не набрал min_confidence (по умолчанию MIN_CONFIDENCE).
+        Если kickoff известен, ищется только в окне времени вокруг него.
+        При равной уверенности берётся добавленный раньше.
+        """
+        threshold = MIN_CONFIDENCE if min_confidence is None else min_confidence
+        best, best_score = None, 0.0
+        hour = _hour(kickoff)
+
+        # Точное совпадение пары (по id команд или по названиям):
+        # сходство названий 1, решает только время
+        exact = list(self.by_pair.get((normalize_name(home_team or ""), normalize_name(away_team or "")), ()))
+        if self.registry is not None:
+            ids = self.registry.resolve_pair(home_team, away_team)
+            if None not in ids:
+                exact.extend(self.by_ids.get(ids, ()))
+        for i in sorted(set(exact)):
+            if i in self.removed:
+                continue
+            kickoff_score = time_score(kickoff, self.kickoffs[i])
+            if kickoff_score == 0.0:
+                continue  # вне окна времени: та же пара в другой день
+            score = confidence(1.0, kickoff_score)
+            if score > best_score:
+                best, best_score = i, score
+        if best_score == 1.0:
+            return self.items[best], best_score
+
+        home_grams, away_grams = trigrams(home_team), trigrams(away_team)
+        if home_grams and away_grams and threshold > 0:
+            # Гармоническое среднее ≥ threshold даже при второй команде = 1
+            # требует от каждой команды сходства не ниже threshold / (2 − threshold)
+            side_min = threshold / (2 - threshold)
+            # Корзины окна времени и матчи без времени; без kickoff — все матчи
+            span = math.ceil(TIME_WINDOW_HOURS)
+            buckets = None
+            if hour is not None:
+                buckets = list(range((hour - span) // BUCKET_HOURS,
+                                     (hour + span) // BUCKET_HOURS + 1)) + [None]
+            # Кандидатов берём по той команде, чьи списки короче
+            home_prefix = self._prefix(self.home_grams, self.home_bucket_grams,
+                                       home_grams, buckets, side_min)
+            away_prefix = self._prefix(self.away_grams, self.away_bucket_grams,
+                                       away_grams, buckets, side_min)
+            postings = min(home_prefix, away_prefix, key=lambda lists: sum(map(len, lists)))
+            candidates = set()
+            for posting in postings:
+                candidates.update(posting)
+
+            for i in sorted(candidates - self.removed):
+                # Сначала дешёвая проверка корзины времени, потом сходство
+                if hour is not None and self.hours[i] is not None and abs(self.hours[i] - hour) > span:
+                    continue
+                home_similarity = similarity(home_grams, self.home_sets[i])
+                if home_similarity < side_min:
+                    continue
+                away_similarity = similarity(away_grams, self.away_sets[i])
+                if away_similarity < side_min:
+                    continue
+                # Корзины — по целым часам, точная граница окна — здесь
+                kickoff_score = time_score(kickoff, self.kickoffs[i])
+                if kickoff_score == 0.0:
+                    continue
+                score = confidence(name_score(home_similarity, away_similarity), kickoff_score)
+                if score > best_score:
+                    best, best_score = i, score
+
+        if best is None or best_score < threshold:
+            return None, 0.0
+        return self.items[best], best_score
+
+    def find(self, home_team, away_team, kickoff=None):
+        """То же, что match, но только матч (или None)"""
+        return self.match(home_team, away_team, kickoff)[0]
@@ -1,21 +1,29 @@
 # results_json_parser.py
 import requests
-from bs4 import BeautifulSoup
-import json
-import re
-from datetime import datetime, timedelta
+import http_client
+import reconcile
+import urql
+from records import make_result
+from result_matcher import MatchIndex
+from team_registry import get_registry
+from datetime import date, datetime, timedelta
 from database import get_db_connection
 
+RESULTS_URL = "https://scores24.live/ru/soccer/{date}"
+# Свои валидаторы страниц в page_cache
+CACHE_NAMESPACE = "results_json_parser"
+
+
 def parse_results_from_json(date_str):
     """
     Парсит результаты матчей за конкретную дату используя JSON из script тегов
     (аналогично парсингу прогнозов)
     """
-    url = f"https://scores24.live/ru/soccer/{date_str}"
+    url = RESULTS_URL.format(date=date_str)
     print(f"🕸️  Парсим URL: {url}")
     
     try:
-        response = requests.get(url, headers={
+        response = http_client.get(url, headers={
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
         response.raise_for_status()
@@ -23,79 +31,80 @@ def parse_results_from_json(date_str):
         print(f"❌ Ошибка при запросе: {e}")
         return []
     
-    soup = BeautifulSoup(response.text, 'html.parser')
+    return parse_results_html(response.text)
+
+def parse_results_html(html):
+    """Достаёт результаты матчей из уже скачанной страницы с датой"""
     results = []
     
-    # Ищем script теги с данными (как при парсинге прогнозов)
-    script_tags = soup.find_all('script')
+    # Режем URQL_DATA прямо из байтов страницы, без построения DOM
+    payload = urql.extract_payload(html)
+    if payload is None:
+        print("❌ window.URQL_DATA не найден")
+        return results
+    print("✅ Нашли window.URQL_DATA в результатах")
     
-    for script in script_tags:
-        if 'window.URQL_DATA' in script.text:
-            print("✅ Нашли window.URQL_DATA в результатах")
-            
-            # Извлекаем JSON данные
-            json_data = re.search(r'window\.URQL_DATA\s*=\s*({.*?});', script.text, re.DOTALL)
-            
-            if json_data:
+    # Матчи страницы с датой лежат в leaguesList.leagues[].matches[];
+    # остальные записи кэша (PageMeta, UserStatus, ...) не парсим
+    try:
+        data = urql.decode_operations(payload, ('leaguesList',))
+        leagues = data['leaguesList']['leagues'] if 'leaguesList' in data else []
+    except (ValueError, KeyError, TypeError) as e:
+        print(f"❌ Ошибка парсинга JSON: {e}")
+        return results
+    print(f"📊 Загружено {len(leagues)} лиг из URQL_DATA")
+    return results_from_leagues(leagues)
+
+def results_from_leagues(leagues):
+    """leaguesList.leagues[] → список ScrapedResult (завершённые матчи с итоговым счётом)"""
+    results = []
+    
+    for league_item in leagues:
+        league_name = (league_item.get('league') or {}).get('name', '')
+        for match_data in league_item.get('matches', []):
+            try:
+                # Берём только завершённые матчи: живой счёт ещё изменится,
+                # а матч с результатом в БД больше не перечитывается
+                if not match_data.get('isFinished'):
+                    continue
+                
+                # Проверяем, что есть результат ("-:-" у несыгранных — пропускаем молча)
+                score = match_data.get('resultScore')
+                if not score or ':' not in score:
+                    continue
                 try:
-                    data = json.loads(json_data.group(1))
-                    print(f"📊 Загружено {len(data)} записей из URQL_DATA")
-                    
-                    # Ищем матчи с результатами
-                    for key, value in data.items():
-                        if 'match' in key.lower() or 'event' in key.lower():
-                            try:
-                                match_data = value.get('data', {})
-                                
-                                # Проверяем, что есть результат
-                                if (match_data.get('homeScore') is not None and 
-                                    match_data.get('awayScore') is not None):
-                                    
-                                    # Получаем основные данные матча
-                                    home_team = match_data.get('homeTeam', {}).get('name', '')
-                                    away_team = match_data.get('awayTeam', {}).get('name', '')
-                                    home_score = match_data.get('homeScore')
-                                    away_score = match_data.get('awayScore')
-                                    
-                                    # Получаем статус матча
-                                    status_type = match_data.get('status', {}).get('type', '')
-                                    status_name = match_data.get('status', {}).get('name', '')
-                                    
-                                    # Получаем время матча
-                                    start_date = match_data.get('startDate', '')
-                                    if start_date:
-                                        try:
-                                            match_time = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
-                                        except:
-                                            match_time = None
-                                    else:
-                                        match_time = None
-                                    
-                                    result = {
-                                        'home_team': home_team,
-                                        'away_team': away_team,
-                                        'home_score': home_score,
-                                        'away_score': away_score,
-                                        'status': status_name or status_type,
-                                        'match_time': match_time,
-                                        'league': match_data.get('tournament', {}).get('name', ''),
-                                        'source': 'json'
-                                    }
-                                    
-                                    results.append(result)
-                                    print(f"   ⚽ {home_team} {home_score}:{away_score} {away_team} ({status_name})")
-                                    
-                            except Exception as e:
-                                print(f"❌ Ошибка обработки матча: {e}")
-                                continue
-                    
-                except json.JSONDecodeError as e:
-                    print(f"❌ Ошибка парсинга JSON: {e}")
+                    home_score, away_score = (int(x) for x in score.split(':', 1))
+                except ValueError:
                     continue
-                except Exception as e:
-                    print(f"❌ Общая ошибка: {e}")
+                
+                # Получаем основные данные матча
+                teams = match_data.get('teams') or []
+                if len(teams) < 2:
                     continue
-    
+                home_team = teams[0].get('name', '')
+                away_team = teams[1].get('name', '')
+                
+                status_name = 'Завершен'
+                
+                # Получаем время матча
+                start_date = match_data.get('matchDate', '')
+                try:
+                    match_time = datetime.fromisoformat(start_date) if start_date else None
+                except ValueError:
+                    match_time = None
+                
+                result = make_result(
+                    home_team, away_team, home_score, away_score, status_name,
+                    match_time=match_time, league=league_name, source='json'
+                )
+                
+                results.append(result)
+                print(f"   ⚽ {home_team} {home_score}:{away_score} {away_team} ({status_name})")
+                
+            except Exception as e:
+                print(f"❌ Ошибка обработки матча: {e}")
+                continue
+
     print(f"📊 Найдено матчей с результатами: {len(results)}")
     return results
 
@@ -123,22 +132,27 @@ def get_matches_without_results():
     conn.close()
     return matches
 
-def save_result_to_db(home_team, away_team, match_time, home_score, away_score, status):
-    """Сохраняет результат матча в базу данных."""
+def save_result_to_db(home_team, away_team, match_time, home_score, away_score, status,
+                      home_team_id=None, away_team_id=None):
+    """Сохраняет результат матча в базу данных (с id команд, если известны)."""
     conn = get_db_connection()
     cur = conn.cursor()
     
     try:
         cur.execute("""
-            INSERT INTO results (home_team, away_team, match_time, home_score, away_score, status, updated_at)
-            VALUES (%s, %s, %s, %s, %s, %s, NOW())
+            INSERT INTO results (home_team, away_team, home_team_id, away_team_id, match_time,
+                                 home_score, away_score, status, updated_at)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, NOW())
             ON CONFLICT (home_team, away_team, match_time) 
             DO UPDATE SET 
                 home_score = EXCLUDED.home_score,
                 away_score = EXCLUDED.away_score,
                 status = EXCLUDED.status,
+                home_team_id = COALESCE(EXCLUDED.home_team_id, results.home_team_id),
+                away_team_id = COALESCE(EXCLUDED.away_team_id, results.away_team_id),
                 updated_at = NOW()
-        """, (home_team, away_team, match_time, home_score, away_score, status))
+        """, (home_team, away_team, home_team_id, away_team_id, match_time,
+              home_score, away_score, status))
         
         conn.commit()
         print(f"✅ Результат сохранен: {home_team} {home_score}:{away_score} {away_team}")
@@ -157,21 +171,32 @@ def main():
     print("🧠 ПАРСЕР РЕЗУЛЬТАТОВ (JSON логика)")
     print("=" * 60)
     
-    # 1. Парсим результаты за несколько последних дней
-    dates_to_parse = [
-        (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d"),
-        (datetime.now() - timedelta(days=2)).strftime("%Y-%m-%d"),
-        (datetime.now() - timedelta(days=3)).strftime("%Y-%m-%d")
-    ]
-    
-    all_results = []
-    for date_str in dates_to_parse:
-        print(f"\n📅 Парсим дату: {date_str}")
-        results = parse_results_from_json(date_str)
-        all_results.extend(results)
+    # 1. Результаты за несколько последних дней — через общий Pipeline:
+    # страницы качаются параллельно один раз, не изменившиеся (304) пропускаются
+    # (импорт здесь: pipeline сам берёт у этого модуля results_from_leagues)
+    from pipeline import CollectSink, Pipeline, refresh_targets
+    days = [date.today() - timedelta(days=i) for i in range(1, 4)]
+    pipeline = Pipeline(CACHE_NAMESPACE)
+    scores = pipeline.add_sink("final_scores", CollectSink())
+    pipeline.run(refresh_targets(days, trends=False))
+    all_results = scores.records
     
     print(f"\n📊 Всего найдено результатов: {len(all_results)}")
     
+    if not pipeline.contexts:
+        print("🔚 Ни одна страница не изменилась, БД не трогаем")
+        return
+    
+    # Сверка в БД: пачка уходит во временную таблицу, сопоставление
+    # и запись results/analysis — одним запросом
+    if reconcile.enabled():
+        print("\n🗄️ Сверяем пачку с прогнозами в БД...")
+        inserted, updated, analyzed = reconcile.reconcile_results(all_results, get_registry())
+        pipeline.commit_pages()
+        print(f"\n🎯 ИТОГ: сохранено {inserted + updated} результатов, проанализировано {analyzed} прогнозов")
+        print("🔚 Парсинг завершен.")
+        return
+    
     # 2. Получаем матчи из БД без результатов
     print("\n📦 Загружаем матчи из базы данных...")
     matches = get_matches_without_results()
@@ -179,38 +204,53 @@ def main():
     
     if not matches:
         print("🔚 Нет матчей для обработки")
+        pipeline.commit_pages()
         return
     
     # 3. Сопоставляем и сохраняем результаты
     print("\n🔍 Сопоставляем матчи...")
     saved_count = 0
+    failed_count = 0
+    # Триграммы названий результатов считаем один раз; точное совпадение —
+    # поиск в словаре, известные реестру команды — по id
+    registry = get_registry()
+    results_index = MatchIndex(all_results, registry=registry)
     
     for match in matches:
         match_id, home_team, away_team, match_time = match
         print(f"\n🔍 Ищем: {home_team} vs {away_team}")
         
         found = False
-        for result in all_results:
-            # Ищем по совпадению названий команд
-            if (result['home_team'].lower() == home_team.lower() and 
-                result['away_team'].lower() == away_team.lower()):
-                
-                print(f"   ✅ Найден результат: {result['home_score']}:{result['away_score']}")
-                
-                if save_result_to_db(
-                    home_team, away_team, match_time,
-                    result['home_score'], result['away_score'],
-                    result['status']
-                ):
-                    saved_count += 1
-                    found = True
-                break
+        # Ищем по сходству названий команд и времени начала
+        result, confidence = results_index.match(home_team, away_team, match_time)
+        if result is not None:
+            print(f"   ✅ Найден результат: {result.home_team} vs {result.away_team} "
+                  f"{result.home_score}:{result.away_score} (уверенность {confidence:.2f})")
+            home_team_id, away_team_id = registry.link(
+                home_team, away_team, result.home_team, result.away_team, confidence, result.source
+            )
+            
+            if save_result_to_db(
+                home_team, away_team, match_time,
+                result.home_score, result.away_score,
+                result.status, home_team_id, away_team_id
+            ):
+                saved_count += 1
+                found = True
+            else:
+                failed_count += 1
         
         if not found:
             print(f"   ❌ Результат не найден в JSON данных")
     
+    registry.flush()
+    if failed_count:
+        print(f"⚠️  {failed_count} результатов не сохранено, страницы перечитаем при следующем запуске")
+    else:
+        pipeline.commit_pages()
     print(f"\n🎯 ИТОГ: обработано {len(matches)} матчей, сохранено {saved_count} результатов")
     print("🔚 Парсинг завершен.")
 
 if __name__ == '__main__':
+    http_client.enable_replay_from_argv()
     main()
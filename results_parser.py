@@ -1,8 +1,10 @@
 # results_parser.py
 import requests
+import http_client
 from bs4 import BeautifulSoup
 from datetime import datetime
 from database import get_db_connection
+from records import make_result
 import time
 import re
 
@@ -62,7 +64,7 @@ def parse_results_for_date(date_str):
     print(f"🕸️  Парсим URL: {url}")
     
     try:
-        response = requests.get(url, headers={
+        response = http_client.get(url, headers={
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
         response.raise_for_status()
@@ -109,14 +111,7 @@ def parse_results_for_date(date_str):
                 except ValueError:
                     pass
             
-            results.append({
-                'home_team': home_team,
-                'away_team': away_team,
-                'score': score_text,
-                'home_score': home_score,
-                'away_score': away_score,
-                'status': status
-            })
+            results.append(make_result(home_team, away_team, home_score, away_score, status))
             
         except Exception as e:
             print(f"❌ Ошибка при парсинге контейнера: {e}")
@@ -135,30 +130,30 @@ def find_and_save_results(matches, all_parsed_results):
         # Ищем результат для этого матча
         for result in all_parsed_results:
             # Простое сравнение названий команд
-            if (result['home_team'] == home_team and result['away_team'] == away_team):
+            if (result.home_team == home_team and result.away_team == away_team):
                 
                 # Сохраняем результат в БД
                 save_result_to_db(
                     home_team, 
                     away_team, 
                     match_time,
-                    result['home_score'],
-                    result['away_score'],
-                    result['status']
+                    result.home_score,
+                    result.away_score,
+                    result.status
                 )
                 saved_count += 1
                 break
         
         # Также попробуем найти по частичному совпадению названий
         for result in all_parsed_results:
-            if (home_team in result['home_team'] and away_team in result['away_team']):
+            if (home_team in result.home_team and away_team in result.away_team):
                 save_result_to_db(
                     home_team, 
                     away_team, 
                     match_time,
-                    result['home_score'],
-                    result['away_score'],
-                    result['status']
+                    result.home_score,
+                    result.away_score,
+                    result.status
                 )
                 saved_count += 1
                 break
@@ -200,4 +195,5 @@ def main():
     print("🔚 Парсинг завершен.")
 
 if __name__ == '__main__':
+    http_client.enable_replay_from_argv()
     main()
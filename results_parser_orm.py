@@ -1,11 +1,21 @@
 # results_parser_orm.py
 import requests
-from bs4 import BeautifulSoup
-from datetime import datetime, timedelta
-import re
+import http_client
+import extraction
+import reconcile
+from records import ScrapedResult, make_result
+from result_matcher import MatchIndex
+from team_registry import get_registry
+from datetime import date, datetime, timedelta
 from models import get_db_session, Prediction, Result, Analysis
+from pipeline import CollectSink, Pipeline, refresh_targets
 
 FINISHED_KEYWORDS = ("закончен", "заверш", "finished", "completed")
+# Перенесённые/отменённые матчи на этой дате уже не доиграют — день можно закрывать
+CLOSED_KEYWORDS = ("перенес", "отмен", "postponed", "cancel")
+RESULTS_URL = "https://scores24.live/ru/soccer/{date}"
+# Свои валидаторы и печати страниц в page_cache
+CACHE_NAMESPACE = "results_parser_orm"
 
 
 def parse_results(date: str = "yesterday"):
@@ -13,11 +23,11 @@ def parse_results(date: str = "yesterday"):
     if date == "yesterday":
         date = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
 
-    url = f"https://scores24.live/ru/soccer/{date}"
+    url = RESULTS_URL.format(date=date)
     print(f"🕸️ Парсим URL: {url}")
 
     try:
-        response = requests.get(
+        response = http_client.get(
             url,
             headers={
                 "User-Agent": (
@@ -33,46 +43,64 @@ def parse_results(date: str = "yesterday"):
         print(f"❌ Ошибка запроса: {e}")
         return []
 
-    soup = BeautifulSoup(response.text, "html.parser")
+    return parse_results_html(response.text)
+
+
+def parse_results_html(html: str):
+    """Достаём завершённые матчи из уже скачанной страницы с датой"""
+    matches, _ = parse_results_page(html)
+    return matches
+
+
+def parse_kickoff(kickoff: str, date: str):
+    """Время начала матча: дата страницы + время HH:MM из карточки (или None)."""
+    if not kickoff or not date:
+        return None
+    try:
+        return datetime.strptime(f"{date} {kickoff}", "%Y-%m-%d %H:%M")
+    except ValueError:
+        return None
+
+
+def parse_results_page(html: str, date: str = None, backend: str = None):
+    """
+    Достаём завершённые матчи со страницы с датой.
+    Возвращает (matches, all_finished): all_finished=True, если на странице
+    есть матчи и все они завершены (или перенесены/отменены) — такие
+    результаты уже не изменятся. Если передана date (YYYY-MM-DD),
+    у матчей заполняется match_time. backend — "lxml" или "bs4" (см. html_backend).
+    Поля карточек извлекаются за один проход по схеме из extraction.
+    """
     matches = []
+    total = unfinished = 0
 
-    for match in soup.select("div.sc-17qxh4e-0"):
+    for record in extraction.get_plan().extract(html, backend):
         try:
-            team_nodes = match.select("div.sc-17qxh4e-10")
-            if len(team_nodes) < 2:
+            if len(record["teams"]) < 2:
                 continue
-            home_team = team_nodes[0].get_text(strip=True)
-            away_team = team_nodes[1].get_text(strip=True)
+            home_team, away_team = record["teams"][:2]
+            total += 1
 
-            status_elem = match.select_one("div.sc-1p31vt4-0")
-            status = status_elem.get_text(strip=True) if status_elem else "Завершен"
+            status = record["status"] if record["status"] is not None else "Завершен"
 
             if not any(k in status.lower() for k in FINISHED_KEYWORDS):
+                if not any(k in status.lower() for k in CLOSED_KEYWORDS):
+                    unfinished += 1
                 continue
 
-            scores_container = match.select_one("div.sc-4g7sie-0")
-            if not scores_container:
-                continue
-            final_score_block = scores_container.select_one("div.sc-pvs6fr-0")
-            if not final_score_block:
-                continue
-            score_cells = final_score_block.select("div.sc-pvs6fr-1")
-            if len(score_cells) < 2:
+            if len(record["score"]) < 2:
                 continue
 
             try:
-                home_goals = int(score_cells[0].get_text(strip=True))
-                away_goals = int(score_cells[1].get_text(strip=True))
+                home_goals = int(record["score"][0])
+                away_goals = int(record["score"][1])
             except ValueError:
                 continue
 
-            matches.append({
-                "home_team": home_team,
-                "away_team": away_team,
-                "home_score": home_goals,
-                "away_score": away_goals,
-                "status": status,
-            })
+            matches.append(make_result(
+                home_team, away_team, home_goals, away_goals, status,
+                match_time=parse_kickoff(record["kickoff"], date),
+            ))
             print(f"⚽ {home_team} {home_goals}:{away_goals} {away_team} ({status})")
 
         except Exception as e:
@@ -80,31 +108,13 @@ def parse_results(date: str = "yesterday"):
             continue
 
     print(f"📊 Найдено завершённых матчей: {len(matches)}")
-    return matches
-
-
-def normalize_name(name: str) -> str:
-    return re.sub(r"[^\w]", "", name.lower().replace("ё", "е").strip())
+    return matches, total > 0 and unfinished == 0
 
 
-def find_matching_result(prediction: Prediction, results: list):
-    """Находим результат матча для данного прогноза"""
-    pred_home_norm = normalize_name(prediction.home_team)
-    pred_away_norm = normalize_name(prediction.away_team)
-
-    for result in results:
-        res_home_norm = normalize_name(result["home_team"])
-        res_away_norm = normalize_name(result["away_team"])
-        if (pred_home_norm in res_home_norm or res_home_norm in pred_home_norm) and \
-           (pred_away_norm in res_away_norm or res_away_norm in pred_away_norm):
-            return result
-    return None
-
-
-def analyze_prediction_accuracy(prediction: Prediction, result: dict, session):
+def analyze_prediction_accuracy(prediction: Prediction, result: ScrapedResult, session):
     """Сравниваем прогноз BTTS с реальным результатом и сохраняем анализ"""
     predicted_btts = prediction.prediction_value.lower() in ["yes", "да", "true"]
-    actual_btts = result["home_score"] > 0 and result["away_score"] > 0
+    actual_btts = result.both_to_score
     is_correct = predicted_btts == actual_btts
 
     analysis = Analysis(
@@ -115,37 +125,55 @@ def analyze_prediction_accuracy(prediction: Prediction, result: dict, session):
     return is_correct
 
 
-def main():
-    print("🎯 PARSER & ANALYSIS BTTS")
-    print("=" * 50)
-
-    session = get_db_session()
-
-    # Парсим последние 3 дня
-    all_results = []
-    for i in range(3):
-        date = (datetime.now() - timedelta(days=i)).strftime("%Y-%m-%d")
-        print(f"\n📅 Парсим дату: {date}")
-        results = parse_results(date)
-        all_results.extend(results)
-
-    # Берем все прогнозы без результатов в results
-    predictions_without_results = session.query(Prediction).filter(
+def get_predictions_without_results(session, since=None, until=None):
+    """
+    Прогнозы, для которых ещё нет строки в results. since/until — окно
+    по времени начала (since < match_time <= until), отбирается в запросе.
+    """
+    query = session.query(Prediction).filter(
         ~session.query(Result).filter(
             Result.home_team == Prediction.home_team,
             Result.away_team == Prediction.away_team,
             Result.match_time == Prediction.match_time
         ).exists()
-    ).all()
-
-    print(f"\n🗄️ Прогнозов без результатов: {len(predictions_without_results)}")
-
+    )
+    if since is not None:
+        query = query.filter(Prediction.match_time > since)
+    if until is not None:
+        query = query.filter(Prediction.match_time <= until)
+    return query.all()
+
+
+def save_matched_results(session, predictions, all_results, registry=None):
+    """
+    Сопоставляем прогнозы с распарсенными результатами, сохраняем результат
+    и анализ в сессию (без коммита). Возвращает (inserted, updated, analyzed).
+    registry — реестр команд: известные пары находятся по id, уверенные
+    сопоставления пополняют его, а прогноз и результат получают id команд.
+    """
     inserted = updated = analyzed = 0
+    # Триграммы названий результатов считаем один раз, поиск — по индексу
+    results_index = MatchIndex(all_results, registry=registry)
 
-    for pred in predictions_without_results:
+    for pred in predictions:
         print(f"\n🔍 Ищем результат для: {pred.home_team} vs {pred.away_team} @ {pred.match_time}")
-        match_result = find_matching_result(pred, all_results)
+        match_result, confidence = results_index.match(
+            pred.home_team, pred.away_team, pred.match_time
+        )
         if match_result:
+            print(f"🎯 Совпадение: {match_result.home_team} vs {match_result.away_team} "
+                  f"(уверенность {confidence:.2f})")
+            home_team_id = away_team_id = None
+            if registry is not None:
+                home_team_id, away_team_id = registry.link(
+                    pred.home_team, pred.away_team,
+                    match_result.home_team, match_result.away_team,
+                    confidence, match_result.source,
+                )
+                # None — команда новая, id проставит registry.flush
+                home_team_id = home_team_id or pred.home_team_id
+                away_team_id = away_team_id or pred.away_team_id
+                pred.home_team_id, pred.away_team_id = home_team_id, away_team_id
             # Сохраняем или обновляем результат
             existing = session.query(Result).filter_by(
                 home_team=pred.home_team,
@@ -153,23 +181,27 @@ def main():
                 match_time=pred.match_time
             ).first()
             if existing:
-                existing.home_score = match_result["home_score"]
-                existing.away_score = match_result["away_score"]
-                existing.status = match_result["status"]
+                existing.home_score = match_result.home_score
+                existing.away_score = match_result.away_score
+                existing.status = match_result.status
+                existing.home_team_id = home_team_id or existing.home_team_id
+                existing.away_team_id = away_team_id or existing.away_team_id
                 updated += 1
-                print(f"♻️ Обновлено: {pred.home_team} {match_result['home_score']}:{match_result['away_score']} {pred.away_team}")
+                print(f"♻️ Обновлено: {pred.home_team} {match_result.home_score}:{match_result.away_score} {pred.away_team}")
             else:
                 new_result = Result(
                     home_team=pred.home_team,
                     away_team=pred.away_team,
+                    home_team_id=home_team_id,
+                    away_team_id=away_team_id,
                     match_time=pred.match_time,
-                    home_score=match_result["home_score"],
-                    away_score=match_result["away_score"],
-                    status=match_result["status"]
+                    home_score=match_result.home_score,
+                    away_score=match_result.away_score,
+                    status=match_result.status
                 )
                 session.add(new_result)
                 inserted += 1
-                print(f"✅ Вставлено: {pred.home_team} {match_result['home_score']}:{match_result['away_score']} {pred.away_team}")
+                print(f"✅ Вставлено: {pred.home_team} {match_result.home_score}:{match_result.away_score} {pred.away_team}")
 
             # Анализ прогноза
             if analyze_prediction_accuracy(pred, match_result, session):
@@ -180,8 +212,58 @@ def main():
         else:
             print("❌ Результат не найден в парсинге")
 
-    session.commit()
-    session.close()
+    return inserted, updated, analyzed
+
+
+def main():
+    print("🎯 PARSER & ANALYSIS BTTS")
+    print("=" * 50)
+
+    # Последние 3 дня через общий Pipeline: каждая страница качается один раз,
+    # запечатанные и не изменившиеся (304) пропускаются
+    today = date.today()
+    days = [today - timedelta(days=i) for i in range(3)]
+    pipeline = Pipeline(CACHE_NAMESPACE)
+    scores = pipeline.add_sink("html_scores", CollectSink())
+    pipeline.run(refresh_targets(days, trends=False))
+    all_results = scores.records
+
+    if not pipeline.contexts:
+        print("\n🔚 Ни одна страница не изменилась, БД не трогаем")
+        return
+
+    # Прошедший день, где все матчи завершены, больше не перекачиваем
+    dates_to_seal = [ctx for ctx in pipeline.contexts
+                     if ctx.all_finished and not ctx.failed and ctx.day < today]
+
+    registry = get_registry()
+
+    if reconcile.enabled():
+        # Сверка в БД: временная таблица + один запрос, без выборки прогнозов
+        inserted, updated, analyzed = reconcile.reconcile_results(all_results, registry)
+    else:
+        session = get_db_session()
+
+        # Берем все прогнозы без результатов в results
+        predictions_without_results = get_predictions_without_results(session)
+
+        print(f"\n🗄️ Прогнозов без результатов: {len(predictions_without_results)}")
+
+        inserted, updated, analyzed = save_matched_results(
+            session, predictions_without_results, all_results, registry
+        )
+
+        session.commit()
+        session.close()
+        # Новые написания команд — чтобы следующий запуск нашёл их по id
+        registry.flush()
+
+    # Валидаторы и печати — только после успешного коммита, иначе следующий
+    # запуск получит 304 (или печать) и потеряет результаты дня
+    pipeline.commit_pages()
+    for ctx in dates_to_seal:
+        pipeline.seal(ctx)
+        print(f"🔒 Дата {ctx.day} запечатана: все матчи завершены")
 
     print("\n🎯 ИТОГ:")
     print(f"   Вставлено результатов: {inserted}")
@@ -190,4 +272,5 @@ def main():
 
 
 if __name__ == "__main__":
+    http_client.enable_replay_from_argv()
     main()
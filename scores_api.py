@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
 
-from flask import Flask, jsonify
-from scores_parser import parse_scores24
+from flask import Flask, jsonify, request
+from scores_parser import parse_scores24, parse_scores24_columns
+import trend_columns
 import os
 
 app = Flask(__name__)
@@ -12,8 +13,36 @@ def index():
 
 @app.route('/matches/btts')
 def get_btts_matches():
-    """Возвращает матчи с прогнозом 'Обе забьют'"""
-    matches = parse_scores24()
+    """
+    Возвращает матчи с прогнозом 'Обе забьют'.
+    Необязательные параметры: max_odd, min_odd — границы коэффициента,
+    sort=odds — сначала минимальные коэффициенты, limit — сколько отдать.
+    """
+    max_odd = request.args.get('max_odd', type=float)
+    min_odd = request.args.get('min_odd', type=float)
+    limit = request.args.get('limit', type=int)
+    by_odds = request.args.get('sort') == 'odds'
+
+    if trend_columns.np is not None:
+        # Фильтр и сортировка векторно по колонкам, строки — только для ответа
+        # max_odd заодно останавливает обход страниц трендов
+        columns = parse_scores24_columns(max_odd=max_odd)
+        if columns is None:
+            matches = []
+        else:
+            columns = columns.select(min_odd=min_odd, max_odd=max_odd)
+            columns = columns.by_odds(limit) if by_odds else columns.take(slice(limit))
+            matches = columns.to_api()
+    else:
+        matches = [
+            match for match in parse_scores24(max_odd=max_odd)
+            if (max_odd is None or match.odd <= max_odd)
+            and (min_odd is None or match.odd >= min_odd)
+        ]
+        if by_odds:
+            matches.sort(key=lambda match: (match.odd, match.match_time))
+        matches = [match.to_api() for match in matches[:limit]]
+
     return jsonify({
         "source": "scores24.live",
         "trend": "Обе забьют (BTTS)",
@@ -1,71 +1,94 @@
 #!/usr/bin/env python3
 
-import requests
-from bs4 import BeautifulSoup
-import json
-import re
+import graphql_client
+import http_client
+import trend_crawler
+import urql
+from records import make_prediction
+from trend_columns import columns_from_edges
 from datetime import datetime
 
-def parse_scores24():
-    """Парсит данные с scores24.live о матчах 'Обе забьют' из JSON"""
+def parse_scores24(max_odd=None, horizon_hours=None):
+    """
+    Парсит данные с scores24.live о матчах 'Обе забьют' из JSON.
+    max_odd и horizon_hours — условия остановки обхода страниц (trend_crawler).
+    """
+    try:
+        return edges_to_matches(fetch_edges(max_odd, horizon_hours))
+        
+    except Exception as e:
+        print(f"Ошибка при парсинге: {e}")
+        return []
+
+def parse_scores24_columns(max_odd=None, horizon_hours=None):
+    """
+    То же, что parse_scores24, но в колоночном виде (trend_columns.TrendColumns)
+    для векторных фильтров и сортировки. Нужен numpy; при ошибке — None.
+    """
+    try:
+        return columns_from_edges(fetch_edges(max_odd, horizon_hours))
+    
+    except Exception as e:
+        print(f"Ошибка при парсинге: {e}")
+        return None
+
+def fetch_edges(max_odd=None, horizon_hours=None):
+    """
+    Все TrendList.edges по всем страницам pageInfo. Из GraphQL, если он
+    включён, иначе первая страница — со страницы трендов; остальные
+    дочитываются по курсору, только если это разрешает trend_crawler.TREND_CRAWL
+    (нужен GraphQL; в режиме --replay — только первая страница). Если взята
+    только первая страница, а на сервере есть ещё, печатается предупреждение.
+    """
+    if graphql_client.ENABLED:
+        # Берём TrendList напрямую из GraphQL, без HTML-страницы
+        return trend_crawler.crawl_trends(max_odd=max_odd, horizon_hours=horizon_hours)
+    
+    first_page = fetch_trend_page()
+    if first_page is None:
+        return []
+    return trend_crawler.continue_trends(first_page, max_odd=max_odd, horizon_hours=horizon_hours)
+
+def fetch_trend_page():
+    """Достаёт первую страницу TrendList ({'edges', 'pageInfo'}) из URQL_DATA страницы трендов"""
     url = "https://scores24.live/ru/trends/soccer?trendsMarketSlug=btts"
     headers = {
         'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
     }
     
-    try:
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.text, 'html.parser')
-        matches = []
+    # Качаем страницу потоком до конца скрипта URQL_DATA, остальное не нужно
+    payload = http_client.fetch_urql_payload(url, headers=headers, timeout=10)
+    if payload is None:
+        return None
+    
+    # Из всего URQL-кэша парсим только TrendList
+    trend_data = urql.decode_operations(payload, ('TrendList',))
+    return trend_data.get('TrendList')
+
+def edges_to_matches(edges, fetched_at=None):
+    """
+    Превращает TrendList.edges в список ScrapedPrediction для API.
+    Время получения одно на всю пачку.
+    """
+    fetched_at = fetched_at or datetime.now()
+    matches = []
+    for edge in edges:
+        node = edge['node']
+        match_data = node['match']
         
-        # Ищем JSON данные
-        scripts = soup.find_all('script')
-        for script in scripts:
-            if script.string and 'URQL_DATA' in script.string:
-                json_match = re.search(r'window\.URQL_DATA\s*=\s*JSON\.parse\("(.+?)"\)', script.string)
-                if json_match:
-                    json_str = json_match.group(1)
-                    json_str = json_str.encode().decode('unicode_escape')
-                    data = json.loads(json_str)
-                    
-                    # Ищем ключ с TrendList
-                    for key, value in data.items():
-                        if 'TrendList' in str(value):
-                            trend_data = json.loads(value['data'])
-                            edges = trend_data['TrendList']['edges']
-                            
-                            for edge in edges:
-                                node = edge['node']
-                                match_data = node['match']
-                                
-                                # Формируем информацию о матче
-                                team1 = match_data['teams'][0]['name']
-                                team2 = match_data['teams'][1]['name']
-                                match_time = match_data['matchDate']
-                                league = match_data['uniqueTournamentName']
-                                odd = node['groups'][0]['minOdd']
-                                
-                                matches.append({
-                                    'teams': f"{team1} vs {team2}",
-                                    'time': match_time,
-                                    'league': league,
-                                    'probability': f"{odd:.2f}",
-                                    'timestamp': datetime.now().isoformat()
-                                })
-                                
-                            break
-                    break
-                
-        return matches
+        # Формируем информацию о матче
+        team1 = match_data['teams'][0]['name']
+        team2 = match_data['teams'][1]['name']
+        match_time = match_data['matchDate']
+        league = match_data['uniqueTournamentName']
+        odd = node['groups'][0]['minOdd']
         
-    except Exception as e:
-        print(f"Ошибка при парсинге: {e}")
-        return []
+        matches.append(make_prediction(team1, team2, match_time, league, odd, fetched_at))
+    return matches
 
 if __name__ == '__main__':
+    http_client.enable_replay_from_argv()
     data = parse_scores24()
     print(f"Найдено матчей: {len(data)}")
     for match in data[:3]:
-        print(match)
+        print(match.to_api())
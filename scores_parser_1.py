@@ -1,10 +1,11 @@
 #!/usr/bin/env python3
-import requests
+import http_client
 from bs4 import BeautifulSoup
 import json
 import re
 from datetime import datetime
 from database import get_db_connection
+from records import make_prediction
 import psycopg2
 
 def upsert_prediction_to_db(home_team, away_team, match_time, league, odd):
@@ -64,9 +65,10 @@ def parse_scores24(save_to_db=True):
     }
     
     matches = []
+    fetched_at = datetime.now()
 
     try:
-        response = requests.get(url, headers=headers, timeout=10)
+        response = http_client.get(url, headers=headers, timeout=10)
         response.raise_for_status()
         
         soup = BeautifulSoup(response.text, 'html.parser')
@@ -97,17 +99,9 @@ def parse_scores24(save_to_db=True):
                             league = match_data['uniqueTournamentName']
                             odd = float(node['groups'][0]['minOdd'])
                             
-                            matches.append({
-                                'home_team': team1,
-                                'away_team': team2,
-                                'match_time': match_time,
-                                'league': league,
-                                'odd': odd,
-                                'prediction_type': 'btts',
-                                'prediction_value': 'yes',
-                                'source': 'scores24.live',
-                                'timestamp': datetime.now().isoformat()
-                            })
+                            matches.append(make_prediction(
+                                team1, team2, match_data['matchDate'], league, odd, fetched_at
+                            ))
 
                             if save_to_db:
                                 upsert_prediction_to_db(team1, team2, match_time, league, odd)
@@ -123,7 +117,8 @@ def parse_scores24(save_to_db=True):
 
 
 if __name__ == '__main__':
+    http_client.enable_replay_from_argv()
     data = parse_scores24()
     print(f"\n📊 Найдено прогнозов: {len(data)}")
     for match in data[:5]:
-        print(f"{match['home_team']} vs {match['away_team']} @ {match['match_time']} | odd={match['odd']}")
+        print(f"{match.home_team} vs {match.away_team} @ {match.match_time} | odd={match.odd}")
@@ -1,5 +1,5 @@
 # scores_parser_correct.py
-import requests
+import http_client
 from bs4 import BeautifulSoup
 import json
 import re
@@ -24,7 +24,7 @@ def parse_btts_predictions():
         
         # Делаем запрос к сайту
         print(f"Запрашиваем URL: {url}")
-        response = requests.get(url, headers=headers, timeout=30)
+        response = http_client.get(url, headers=headers, timeout=30)
         response.raise_for_status()  # Проверяем успешность запроса
         
         print(f"✓ Страница загружена успешно (статус: {response.status_code})")
@@ -174,6 +174,8 @@ def parse_btts_predictions():
         return 0
 
 if __name__ == "__main__":
+    http_client.enable_replay_from_argv()
+
     # Инициализируем БД
     init_db()
     
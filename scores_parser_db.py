@@ -1,5 +1,5 @@
 # scores_parser_db.py
-import requests
+import http_client
 from bs4 import BeautifulSoup
 import json
 import re
@@ -18,7 +18,7 @@ def parse_and_save_predictions():
         }
         
         # Делаем запрос к сайту
-        response = requests.get(url, headers=headers, timeout=30)
+        response = http_client.get(url, headers=headers, timeout=30)
         response.raise_for_status()
         
         # Парсим HTML
@@ -84,6 +84,8 @@ def parse_and_save_predictions():
         return 0
 
 if __name__ == "__main__":
+    http_client.enable_replay_from_argv()
+
     # Инициализируем БД
     init_db()
     
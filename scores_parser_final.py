@@ -1,8 +1,6 @@
 # scores_parser_final.py
-import requests
-from bs4 import BeautifulSoup
-import json
-import re
+import http_client
+import urql
 from datetime import datetime
 from models import get_db_session, Prediction, init_db
 
@@ -20,56 +18,19 @@ def parse_btts_predictions():
             'Connection': 'keep-alive'
         }
         
-        # Делаем запрос к сайту
+        # Качаем страницу потоком и обрываем загрузку сразу после URQL_DATA
         print(f"Запрашиваем URL: {url}")
-        response = requests.get(url, headers=headers, timeout=30)
-        response.raise_for_status()
-        
-        print(f"✓ Страница загружена успешно (статус: {response.status_code})")
-        
-        # Парсим HTML
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Ищем script тег с URQL_DATA
         print("Ищем window.URQL_DATA...")
-        script_tags = soup.find_all('script')
+        payload = http_client.fetch_urql_payload(url, headers=headers, timeout=30)
         
-        target_script = None
-        for i, script in enumerate(script_tags):
-            if script.string and 'window.URQL_DATA' in script.string:
-                target_script = script
-                print(f"✓ Найден целевой script тег с URQL_DATA")
-                break
-        
-        if not target_script:
+        if payload is None:
             print("✗ Не найден script тег с window.URQL_DATA")
             return 0
+        print(f"✓ Найден целевой script тег с URQL_DATA")
         
-        # Извлекаем и парсим JSON данные
+        # Из всего URQL-кэша парсим только запись с TrendFilter
         print("Парсим JSON данные из URQL_DATA...")
-        script_content = target_script.string.strip()
-        
-        # Извлекаем JSON строку
-        json_str = script_content.split('window.URQL_DATA=JSON.parse("', 1)[1]
-        json_str = json_str.rsplit('");', 1)[0]
-        
-        # Декодируем экранированные символы
-        json_str = json_str.encode('utf-8').decode('unicode_escape')
-        
-        # Парсим JSON
-        urql_data = json.loads(json_str)
-        
-        # Анализируем структуру данных
-        print("Анализируем структуру URQL_DATA...")
-        
-        # Ищем ключи в данных
-        first_key = list(urql_data.keys())[0]
-        print(f"Первый ключ в URQL_DATA: {first_key}")
-        
-        # Получаем данные по первому ключу
-        trend_data = urql_data[first_key]
-        if 'data' in trend_data:
-            trend_data = json.loads(trend_data['data'])
+        trend_data = urql.decode_operations(payload, ('TrendFilter',))
         
         print(f"Ключи в trend_data: {list(trend_data.keys())}")
         
@@ -163,6 +124,8 @@ def parse_btts_predictions():
         return 0
 
 if __name__ == "__main__":
+    http_client.enable_replay_from_argv()
+
     # Инициализируем БД
     init_db()
     
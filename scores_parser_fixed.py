@@ -1,5 +1,5 @@
 # scores_parser_fixed.py
-import requests
+import http_client
 from bs4 import BeautifulSoup
 import json
 import re
@@ -22,7 +22,7 @@ def parse_btts_predictions():
         
         # Делаем запрос к сайту
         print(f"Запрашиваем URL: {url}")
-        response = requests.get(url, headers=headers, timeout=30)
+        response = http_client.get(url, headers=headers, timeout=30)
         response.raise_for_status()
         
         print(f"✓ Страница загружена успешно (статус: {response.status_code})")
@@ -75,11 +75,6 @@ def parse_btts_predictions():
         except:
             print("⚠ Не удалось декодировать unicode escape, используем как есть")
         
-        # Сохраняем сырые данные для отладки
-        with open('debug_urql_data.json', 'w', encoding='utf-8') as f:
-            f.write(json_str)
-        print("✓ Сырые JSON данные сохранены в debug_urql_data.json")
-        
         # Пробуем распарсить JSON
         try:
             urql_data = json.loads(json_str)
@@ -209,6 +204,8 @@ def parse_btts_predictions():
         return 0
 
 if __name__ == "__main__":
+    http_client.enable_replay_from_argv()
+
     # Инициализируем БД
     init_db()
     
@@ -1,5 +1,5 @@
 # scores_parser_working.py
-import requests
+import http_client
 from bs4 import BeautifulSoup
 import json
 import re
@@ -22,7 +22,7 @@ def parse_btts_predictions():
         
         # Делаем запрос к сайту
         print(f"Запрашиваем URL: {url}")
-        response = requests.get(url, headers=headers, timeout=30)
+        response = http_client.get(url, headers=headers, timeout=30)
         response.raise_for_status()
         
         print(f"✓ Страница загружена успешно (статус: {response.status_code})")
@@ -172,6 +172,8 @@ def parse_btts_predictions():
         return 0
 
 if __name__ == "__main__":
+    http_client.enable_replay_from_argv()
+
     # Инициализируем БД
     init_db()
     
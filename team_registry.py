@@ -0,0 +1,206 @@
+# team_registry.py
+# Реестр команд: каноническая команда (teams) и все её написания
+# (team_aliases) — из JSON трендов, HTML результатов, бота. Таблица
+# алиасов загружается при старте в словарь "нормализованное название →
+# id команды", и дальше название разрешается одним поиском в словаре.
+# Уверенные сопоставления прогноз ↔ результат записываются обратно
+# (confirm + flush), так что следующий запуск находит эту пару уже по id,
+# без нечёткого сравнения.
+# Новые команды, как и новые алиасы, копятся в памяти (с временным
+# отрицательным id) и создаются в flush одной транзакцией на одном
+# соединении — после того как вызывающий сохранил свои результаты.
+# Там же строкам predictions/results этого запуска проставляются id команд.
+import os
+
+from psycopg2.extras import execute_values
+
+import migrate
+from database import get_db_connection
+from result_matcher import name_similarity, normalize_name
+
+# С какой уверенности сопоставление считается подтверждённым и пишется в алиасы
+ALIAS_MIN_CONFIDENCE = float(os.getenv("SCORES24_ALIAS_MIN_CONFIDENCE", "0.8"))
+
+
+def alias_key(name):
+    """Ключ алиаса: нормализованное название (без регистра, ё, пробелов и знаков)"""
+    return normalize_name(name or "")
+
+
+class TeamRegistry:
+    """Алиасы команд в памяти; новые команды и алиасы копятся до flush"""
+
+    def __init__(self):
+        self.aliases = {}    # alias_key -> team_id (< 0 — команда ещё не создана)
+        self.names = {}      # team_id -> каноническое название
+        self.new_teams = {}  # временный id (< 0) -> название новой команды
+        self.pending = []    # (alias, team_id, source, название) ещё не записанные в БД
+
+    def load(self, conn=None):
+        """Читает teams и team_aliases целиком"""
+        own = conn is None
+        conn = conn or get_db_connection()
+        cur = conn.cursor()
+        try:
+            cur.execute("SELECT id, name FROM teams")
+            self.names = dict(cur.fetchall())
+            cur.execute("SELECT alias, team_id FROM team_aliases")
+            self.aliases = dict(cur.fetchall())
+        finally:
+            cur.close()
+            if own:
+                conn.close()
+        print(f"👥 Реестр команд: {len(self.names)} команд, {len(self.aliases)} написаний")
+        return self
+
+    def _lookup(self, name):
+        """id команды, в том числе ещё не созданной (временный, < 0)"""
+        return self.aliases.get(alias_key(name))
+
+    def resolve(self, name):
+        """id команды (уже записанной в БД) по любому известному написанию или None"""
+        team_id = self._lookup(name)
+        return team_id if team_id is not None and team_id > 0 else None
+
+    def resolve_pair(self, home_team, away_team):
+        return self.resolve(home_team), self.resolve(away_team)
+
+    def _add_alias(self, name, team_id, source):
+        key = alias_key(name)
+        if key and key not in self.aliases:
+            self.aliases[key] = team_id
+            self.pending.append((key, team_id, source, name.strip()))
+
+    def ensure(self, name, source=None):
+        """
+        id команды; неизвестное название заводится новой командой — пока
+        в памяти, с временным id (< 0), в БД она попадёт при flush
+        """
+        team_id = self._lookup(name)
+        if team_id is not None or not alias_key(name):
+            return team_id
+        team_id = -(len(self.new_teams) + 1)
+        self.new_teams[team_id] = name.strip()
+        self.names[team_id] = name.strip()
+        self._add_alias(name, team_id, source)
+        return team_id
+
+    def confirm(self, known_name, other_name, source=None):
+        """
+        Два написания одной команды (подтверждённое сопоставление).
+        Команда берётся по любому уже известному написанию, иначе заводится
+        по known_name. Возвращает id команды (временный, если она новая).
+        Если написания уже числятся за разными командами, ничего не меняем —
+        это решается вручную.
+        """
+        known_id, other_id = self._lookup(known_name), self._lookup(other_name)
+        if known_id is not None and other_id is not None:
+            if known_id != other_id:
+                print(f"⚠️  Разные команды у '{known_name}' ({known_id}) и '{other_name}' ({other_id})")
+            return known_id
+        team_id = known_id if known_id is not None else other_id
+        if team_id is None:
+            team_id = self.ensure(known_name, source)
+        self._add_alias(known_name, team_id, source)
+        self._add_alias(other_name, team_id, source)
+        return team_id
+
+    def link(self, home_team, away_team, other_home, other_away, confidence, source=None):
+        """
+        Сопоставленный матч: (home_team, away_team) и (other_home, other_away).
+        Уверенное сопоставление (≥ ALIAS_MIN_CONFIDENCE) записывает написания
+        в реестр, но только той команды, чьё название само похоже на второе
+        не меньше порога: точная вторая команда вытягивает пару "Бавария" /
+        "Бавария II" до 0.84, а алиас записывается навсегда.
+        Иначе команды только ищутся среди известных.
+        Возвращает (id хозяев, id гостей); None — команда не известна или
+        ещё не создана (id проставит flush).
+        """
+        if confidence >= ALIAS_MIN_CONFIDENCE:
+            for name, other_name in ((home_team, other_home), (away_team, other_away)):
+                if name_similarity(name, other_name) >= ALIAS_MIN_CONFIDENCE:
+                    self.confirm(name, other_name, source)
+        return self.resolve_pair(home_team, away_team)
+
+    def flush(self, conn=None):
+        """
+        Создаёт накопленные новые команды, пишет алиасы и проставляет id
+        команд строкам predictions/results с этими названиями, где id ещё
+        нет. Всё одной транзакцией на одном соединении.
+        """
+        if not self.pending and not self.new_teams:
+            return 0
+        own = conn is None
+        conn = conn or get_db_connection()
+        cur = conn.cursor()
+        try:
+            created = {}
+            if self.new_teams:
+                rows = execute_values(
+                    cur,
+                    """
+                    INSERT INTO teams (name) VALUES %s
+                    ON CONFLICT (name) DO UPDATE SET name = EXCLUDED.name
+                    RETURNING id, name
+                    """,
+                    [(name,) for name in self.new_teams.values()],
+                    fetch=True,
+                )
+                by_name = dict((name, team_id) for team_id, name in rows)
+                created = {tmp: by_name[name] for tmp, name in self.new_teams.items()}
+            pending = [(key, created.get(team_id, team_id), source, name)
+                       for key, team_id, source, name in self.pending]
+            execute_values(
+                cur,
+                """
+                INSERT INTO team_aliases (alias, team_id, source)
+                VALUES %s
+                ON CONFLICT (alias) DO NOTHING
+                """,
+                [(key, team_id, source) for key, team_id, source, _ in pending],
+            )
+            named = list({(name, team_id) for _, team_id, _, name in pending})
+            for table in ("predictions", "results"):
+                for side in ("home", "away"):
+                    execute_values(
+                        cur,
+                        f"""
+                        UPDATE {table} t SET {side}_team_id = v.team_id
+                        FROM (VALUES %s) AS v(name, team_id)
+                        WHERE t.{side}_team = v.name AND t.{side}_team_id IS NULL
+                        """,
+                        named,
+                    )
+            if own:
+                conn.commit()
+        except Exception:
+            if own:
+                conn.rollback()
+            raise
+        finally:
+            cur.close()
+            if own:
+                conn.close()
+
+        # Временные id новых команд → настоящие
+        for tmp, team_id in created.items():
+            self.names[team_id] = self.names.pop(tmp)
+        for key, team_id in self.aliases.items():
+            if team_id in created:
+                self.aliases[key] = created[team_id]
+        written, self.pending, self.new_teams = len(self.pending), [], {}
+        print(f"👥 Новых команд: {len(created)}, записано новых написаний: {written}")
+        return written
+
+
+_registry = None
+
+
+def get_registry():
+    """Общий реестр процесса, загружается из БД при первом обращении"""
+    global _registry
+    if _registry is None:
+        # Старые базы без teams/team_aliases (init-db.sql был до реестра)
+        migrate.ensure_schema()
+        _registry = TeamRegistry().load()
+    return _registry
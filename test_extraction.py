@@ -0,0 +1,42 @@
+# test_extraction.py
+# Бэкенды разбора карточек (html_backend: bs4, lxml, потоковые lxml и sax)
+# должны давать одни и те же записи на сохранённых страницах результатов.
+import glob
+
+import pytest
+
+import extraction
+import html_backend
+
+PAGES = sorted(glob.glob("debug_2025-08-*.html"))
+
+
+def _read(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def _chunks(html, size=4096):
+    data = html.encode("utf-8")
+    return (data[i:i + size] for i in range(0, len(data), size))
+
+
+@pytest.mark.parametrize("path", PAGES)
+def test_backends_extract_the_same_records(path):
+    html = _read(path)
+    plan = extraction.get_plan()
+    expected = plan.extract(html, "bs4")
+    assert expected
+    if html_backend.lxml is not None:
+        assert plan.extract(html, "lxml") == expected
+        assert list(plan.iter_stream(_chunks(html), "lxml")) == expected
+    assert list(plan.iter_stream(_chunks(html), "sax")) == expected
+
+
+@pytest.mark.parametrize("path", PAGES)
+def test_stream_does_not_depend_on_chunk_boundaries(path):
+    html = _read(path)
+    plan = extraction.get_plan()
+    whole = list(plan.iter_stream(_chunks(html, len(html.encode("utf-8"))), "sax"))
+    # Мелкие куски режут теги и многобайтовые символы посередине
+    assert list(plan.iter_stream(_chunks(html, 7), "sax")) == whole
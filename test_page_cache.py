@@ -0,0 +1,108 @@
+# test_page_cache.py
+# Валидаторы и печати страниц у каждого потребителя свои: 304 или печать,
+# полученные одним скриптом, не должны скрывать страницу от другого.
+from datetime import date, timedelta
+
+import pytest
+
+import backfill
+import http_client
+import live_poller
+import page_cache
+import pipeline
+import results_json_parser
+import results_parser_orm
+
+URL = "https://cache.test/ru/soccer/2025-08-24"
+ETAG = '"v1"'
+
+
+class FakeResponse:
+    def __init__(self, status_code, text="", headers=None):
+        self.status_code = status_code
+        self.text = text
+        self.content = text.encode("utf-8")
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeServer:
+    """Страница с ETag: на совпадающий If-None-Match отвечает 304"""
+
+    def __init__(self):
+        self.requests = []
+
+    def get(self, url, headers=None, **kwargs):
+        self.requests.append(url)
+        if (headers or {}).get("If-None-Match") == ETAG:
+            return FakeResponse(304)
+        return FakeResponse(200, f"<html>{url}</html>", {"ETag": ETAG})
+
+
+@pytest.fixture
+def server(monkeypatch, tmp_path):
+    monkeypatch.setattr(page_cache, "CACHE_DIR", str(tmp_path / "pages"))
+    monkeypatch.setattr(page_cache, "SEALED_DIR", str(tmp_path / "sealed"))
+    monkeypatch.setattr(http_client, "REPLAY", False)
+    server = FakeServer()
+    monkeypatch.setattr(http_client, "get", server.get)
+    return server
+
+
+def test_commit_is_per_consumer(server):
+    page = http_client.fetch_page(URL, namespace="orm")
+    assert not page.not_modified
+    page_cache.commit(page)
+
+    # Тот же потребитель: страница не менялась
+    assert http_client.fetch_page(URL, namespace="orm").not_modified
+    # Другой потребитель свои прогнозы по ней ещё не сверял
+    other = http_client.fetch_page(URL, namespace="json")
+    assert not other.not_modified
+    assert other.text == page.text
+
+
+def test_uncommitted_page_is_fetched_again(server):
+    http_client.fetch_page(URL, namespace="orm")
+    assert not http_client.fetch_page(URL, namespace="orm").not_modified
+
+
+def test_seal_is_per_consumer(server):
+    page = http_client.fetch_page(URL, namespace="orm")
+    page_cache.seal(page.url, page.text, "orm")
+
+    assert http_client.fetch_page(URL, namespace="orm").sealed
+    assert not http_client.fetch_page(URL, namespace="backfill").sealed
+    assert len(server.requests) == 2
+
+
+def test_pipeline_save_commits_only_saved_days(server, monkeypatch):
+    saved = []
+    monkeypatch.setattr(backfill, "save_date", lambda day, records, checkpoint: saved.append(day))
+    monkeypatch.setattr(pipeline, "EXTRACTORS", {
+        "results": {"final_scores": lambda ctx: []}, "trends": {},
+    })
+    today = date.today()
+    days = [today, today - timedelta(days=1)]
+    pipeline.main(["1", "--save"])
+    assert saved == [days[1]]
+
+    # Сегодняшняя страница не сохранялась — её валидаторы не записаны
+    again = http_client.fetch_pages(
+        [url for url, _, _ in pipeline.refresh_targets(days, trends=False)],
+        namespace="pipeline",
+    )
+    assert [page.not_modified for page in again.values()] == [False, True]
+
+
+def test_backfill_does_not_hide_pages_from_results_parsers(server):
+    page = http_client.fetch_pages([URL], namespace=backfill.CACHE_NAMESPACE)[URL]
+    page_cache.commit(page)
+    page_cache.seal(page.url, page.text, backfill.CACHE_NAMESPACE)
+
+    for namespace in (results_parser_orm.CACHE_NAMESPACE, results_json_parser.CACHE_NAMESPACE,
+                      live_poller.CACHE_NAMESPACE):
+        page = http_client.fetch_page(URL, namespace=namespace)
+        assert not page.not_modified and not page.sealed
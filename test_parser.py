@@ -1,5 +1,7 @@
 # test_parser.py
 import requests
+import http_client
+import page_archive
 from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
 import time
@@ -13,7 +15,7 @@ def parse_results_for_date(date_str):
     print(f"🕸️  Парсим URL: {url}")
     
     try:
-        response = requests.get(url, headers={
+        response = http_client.get(url, headers={
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
         response.raise_for_status()
@@ -24,10 +26,8 @@ def parse_results_for_date(date_str):
     soup = BeautifulSoup(response.text, 'html.parser')
     results = []
     
-    # Сохраняем HTML для отладки
-    with open(f"debug_{date_str}.html", "w", encoding="utf-8") as f:
-        f.write(soup.prettify())
-    print(f"✅ HTML сохранен в debug_{date_str}.html")
+    # Сырой HTML уже лежит в архиве страниц (page_archive)
+    print(f"✅ HTML сохранен в архиве {page_archive.ARCHIVE_DIR}/")
     
     # Пробуем разные селекторы для поиска матчей
     selectors = [
@@ -76,7 +76,7 @@ def main():
     print(f"\n📊 Найдено результатов: {len(results)}")
     
     print("\n🔍 Дополнительная информация:")
-    print("1. Откройте файл debug_*.html в браузере для изучения структуры")
+    print("1. Достаньте страницу из архива (page_archive.load_latest) для изучения структуры")
     print("2. Посмотрите на классы элементов с матчами")
     print("3. Определите правильные CSS-селекторы для парсинга")
     
@@ -85,7 +85,8 @@ def main():
     print(f"\n📅 Дополнительно: сегодняшняя дата {today}")
     parse_results_for_date(today)
     
-    print("\n🔚 Тест завершен. Изучите debug-файлы для определения правильных селекторов.")
+    print("\n🔚 Тест завершен. Изучите архив страниц для определения правильных селекторов.")
 
 if __name__ == '__main__':
+    http_client.enable_replay_from_argv()
     main()
@@ -0,0 +1,111 @@
+# test_pipeline.py
+# Pipeline: страница качается один раз на все извлекатели, запечатанные
+# и не изменившиеся (304) пропускаются, а валидаторы сохраняются только
+# по команде вызывающего (commit_pages) и только для разобранных без ошибок.
+import pytest
+
+import http_client
+import page_cache
+import pipeline
+from http_client import Page
+
+URL_A = "https://pipeline.test/a"
+URL_B = "https://pipeline.test/b"
+
+
+@pytest.fixture
+def fetched(monkeypatch):
+    """Подменяет fetch_pages: отдаёт заданные Page и пишет, что и с каким namespace качали"""
+    state = {"pages": {}, "calls": [], "committed": []}
+
+    def fetch_pages(urls, namespace=None, **kwargs):
+        state["calls"].append((list(urls), namespace))
+        return {url: state["pages"].get(url) for url in urls}
+
+    monkeypatch.setattr(http_client, "fetch_pages", fetch_pages)
+    monkeypatch.setattr(page_cache, "commit", lambda page: state["committed"].append(page.url))
+    monkeypatch.setattr(pipeline, "EXTRACTORS", {"results": {}, "trends": {}})
+    return state
+
+
+def _extractor(name, func):
+    pipeline.EXTRACTORS["results"][name] = func
+
+
+def test_each_url_is_fetched_once_for_all_extractors(fetched):
+    fetched["pages"] = {URL_A: Page(URL_A, "a", False)}
+    _extractor("one", lambda ctx: [ctx.text])
+    _extractor("two", lambda ctx: [ctx.text * 2])
+    p = pipeline.Pipeline("test")
+    one = p.add_sink("one", pipeline.CollectSink())
+    two = p.add_sink("two", pipeline.CollectSink())
+    counts = p.run([(URL_A, "results", None)])
+    assert fetched["calls"] == [([URL_A], "test")]
+    assert (one.records, two.records) == (["a"], ["aa"])
+    assert counts == {"one": 1, "two": 1}
+
+
+def test_repeated_url_is_fetched_once(fetched):
+    fetched["pages"] = {URL_A: Page(URL_A, "a", False)}
+    _extractor("one", lambda ctx: [ctx.text])
+    p = pipeline.Pipeline("test")
+    p.add_sink("one", pipeline.CollectSink())
+    p.run([(URL_A, "results", None), (URL_A, "results", None)])
+    assert fetched["calls"] == [([URL_A], "test")]
+
+
+def test_unsubscribed_kinds_are_not_fetched(fetched):
+    _extractor("one", lambda ctx: [])
+    p = pipeline.Pipeline("test")
+    p.add_sink("one", pipeline.CollectSink())
+    p.run([(URL_A, "trends", None)])
+    assert fetched["calls"] == [([], "test")]
+
+
+def test_sealed_and_unchanged_pages_are_skipped(fetched):
+    fetched["pages"] = {
+        URL_A: Page(URL_A, "a", True, True),
+        URL_B: Page(URL_B, "b", True),
+    }
+    _extractor("one", lambda ctx: [ctx.text])
+    p = pipeline.Pipeline("test")
+    sink = p.add_sink("one", pipeline.CollectSink())
+    p.run([(URL_A, "results", None), (URL_B, "results", None)])
+    assert sink.records == [] and p.contexts == []
+
+    p.run([(URL_A, "results", None), (URL_B, "results", None)], skip_unchanged=False)
+    assert sink.records == ["a", "b"]
+
+
+def test_run_does_not_commit_and_failed_pages_are_never_committed(fetched):
+    fetched["pages"] = {URL_A: Page(URL_A, "a", False), URL_B: Page(URL_B, "b", False)}
+
+    def extract(ctx):
+        if ctx.url == URL_B:
+            raise ValueError("broken page")
+        return [ctx.text]
+
+    _extractor("one", extract)
+    p = pipeline.Pipeline("test")
+    p.add_sink("one", pipeline.CollectSink())
+    p.run([(URL_A, "results", None), (URL_B, "results", None)])
+    assert fetched["committed"] == []
+    assert [ctx.failed for ctx in p.contexts] == [False, True]
+
+    p.commit_pages()
+    assert fetched["committed"] == [URL_A]
+
+
+def test_commit_pages_can_be_limited_to_saved_contexts(fetched):
+    fetched["pages"] = {URL_A: Page(URL_A, "a", False), URL_B: Page(URL_B, "b", False)}
+    _extractor("one", lambda ctx: [])
+    p = pipeline.Pipeline("test")
+    p.add_sink("one", pipeline.CollectSink())
+    p.run([(URL_A, "results", None), (URL_B, "results", None)])
+    p.commit_pages([ctx for ctx in p.contexts if ctx.url == URL_B])
+    assert fetched["committed"] == [URL_B]
+
+
+def test_unknown_extractor_is_rejected(fetched):
+    with pytest.raises(ValueError):
+        pipeline.Pipeline("test").add_sink("missing", pipeline.CollectSink())
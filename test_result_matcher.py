@@ -0,0 +1,104 @@
+# test_result_matcher.py
+# MatchIndex решает, какой результат получит прогноз (и что уйдёт в results
+# и analysis): точная пара важнее похожей, одна точная команда не вытягивает
+# чужую вторую, время начала — жёсткое окно, найденное не выдаётся дважды.
+from datetime import datetime, timedelta
+
+from records import make_result
+from result_matcher import MIN_CONFIDENCE, TIME_WINDOW_HOURS, MatchIndex, name_score, trigrams
+
+KICKOFF = datetime(2025, 8, 24, 18, 0)
+
+
+def _result(home, away, kickoff=KICKOFF):
+    return make_result(home, away, 1, 1, "Завершен", kickoff)
+
+
+def test_exact_pair_beats_reserve_team_listed_first():
+    reserve = _result("Бавария II", "Унион Берлин II")
+    first_team = _result("Бавария", "Унион Берлин")
+    index = MatchIndex([reserve, first_team])
+    assert index.match("Бавария", "Унион Берлин", KICKOFF) == (first_team, 1.0)
+
+
+def test_exact_pair_ignores_case_punctuation_and_yo():
+    result = _result("Сан-Хосе Эртквейкс", "Кёльн")
+    assert MatchIndex([result]).find("сан хосе эртквейкс", "Кельн", KICKOFF) is result
+
+
+def test_similar_names_match_with_confidence_below_one():
+    result = _result("Манчестер Юнайтед ФК", "Ливерпуль")
+    found, confidence = MatchIndex([result]).match("Манчестер Юнайтед", "Ливерпуль", KICKOFF)
+    assert found is result
+    assert MIN_CONFIDENCE <= confidence < 1.0
+
+
+def test_one_exact_team_does_not_carry_an_unrelated_other():
+    index = MatchIndex([_result("Бавария", "Гамбург")])
+    assert index.match("Бавария", "Унион Берлин", KICKOFF) == (None, 0.0)
+
+
+def test_harmonic_mean_punishes_one_weak_side():
+    assert name_score(1.0, 0.2) < (1.0 + 0.2) / 2
+    assert name_score(0.0, 1.0) == 0.0
+
+
+def test_same_pair_outside_time_window_is_not_a_candidate():
+    other_day = _result("Бавария", "Унион Берлин", KICKOFF + timedelta(days=7))
+    assert MatchIndex([other_day]).find("Бавария", "Унион Берлин", KICKOFF) is None
+
+
+def test_closer_kickoff_wins_within_window():
+    late = _result("Бавария", "Унион Берлин", KICKOFF + timedelta(hours=6))
+    on_time = _result("Бавария", "Унион Берлин", KICKOFF + timedelta(minutes=30))
+    found, confidence = MatchIndex([late, on_time]).match("Бавария", "Унион Берлин", KICKOFF)
+    assert found is on_time
+    assert confidence < 1.0
+
+
+def test_window_crosses_time_buckets_and_midnight():
+    # 23:30 и 03:00 следующего дня — разные корзины индекса, но внутри окна
+    kickoff = datetime(2025, 8, 24, 23, 30)
+    result = _result("Манчестер Юнайтед ФК", "Ливерпуль", kickoff + timedelta(hours=3, minutes=30))
+    assert 3.5 < TIME_WINDOW_HOURS
+    assert MatchIndex([result]).find("Манчестер Юнайтед", "Ливерпуль", kickoff) is result
+
+
+def test_unknown_kickoff_matches_by_names_only():
+    result = _result("Бавария", "Унион Берлин", None)
+    assert MatchIndex([result]).match("Бавария", "Унион Берлин", KICKOFF) == (result, 1.0)
+    assert MatchIndex([_result("Бавария", "Унион Берлин")]).find("Бавария", "Унион Берлин") is not None
+
+
+def test_removed_item_is_not_matched_twice():
+    result = _result("Бавария", "Унион Берлин")
+    index = MatchIndex([result])
+    index.remove(result)
+    assert index.find("Бавария", "Унион Берлин", KICKOFF) is None
+    assert index.remaining() == [] and len(index) == 0
+
+
+def test_custom_accessors_index_plain_tuples():
+    predictions = [(1, "Бавария", "Унион Берлин", KICKOFF), (2, "Гамбург", "Кельн", KICKOFF)]
+    index = MatchIndex(predictions, teams=lambda p: (p[1], p[2]), kickoff=lambda p: p[3])
+    assert index.find("Гамбург", "Кельн", KICKOFF)[0] == 2
+
+
+class FakeRegistry:
+    def __init__(self, ids):
+        self.ids = ids
+
+    def resolve_pair(self, home_team, away_team):
+        return self.ids.get(home_team), self.ids.get(away_team)
+
+
+def test_known_teams_match_by_id_despite_spelling():
+    registry = FakeRegistry({"ПСЖ": 1, "Пари Сен-Жермен": 1, "Марсель": 2, "Олимпик Марсель": 2})
+    result = _result("Пари Сен-Жермен", "Олимпик Марсель")
+    index = MatchIndex([result], registry=registry)
+    assert index.match("ПСЖ", "Марсель", KICKOFF) == (result, 1.0)
+
+
+def test_trigrams_follow_pg_trgm_words():
+    assert trigrams("Ёж") == {"  е", " еж", "еж "}
+    assert trigrams("А-Б") == {"  а", " а ", "  б", " б "}
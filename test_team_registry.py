@@ -0,0 +1,116 @@
+# test_team_registry.py
+# Реестр команд пишет алиасы в БД навсегда: по ним следующие запуски
+# сопоставляют матчи по id, без нечёткого сравнения. Проверяем, что
+# уверенная пара не записывает резервный состав или похожий клуб
+# в алиасы чужой команды, и что flush переводит временные id в настоящие.
+import pytest
+
+import team_registry
+from team_registry import TeamRegistry, alias_key
+
+
+@pytest.fixture
+def registry():
+    registry = TeamRegistry()
+    registry.names = {1: "Бавария", 2: "Унион Берлин"}
+    registry.aliases = {alias_key("Бавария"): 1, alias_key("Унион Берлин"): 2}
+    return registry
+
+
+def _pending_names(registry):
+    return {name for _, _, _, name in registry.pending}
+
+
+def test_reserve_team_is_not_an_alias(registry):
+    # Пара уверенная (хозяева 0.73, гости точные → 0.84), но "Бавария II" — другой клуб
+    registry.link("Бавария", "Унион Берлин", "Бавария II", "Унион Берлин", 0.84, "html")
+    assert registry.resolve("Бавария II") is None
+    assert "Бавария II" not in _pending_names(registry)
+
+
+def test_near_name_is_not_an_alias(registry):
+    registry.link("Атлетико", "Унион Берлин", "Атлетик", "Унион Берлин", 0.82, "html")
+    assert registry._lookup("Атлетик") is None
+    assert registry._lookup("Атлетико") is None
+
+
+def test_each_side_is_judged_on_its_own(registry):
+    registry.link("Бавария", "Унион Берлин", "Бавария", "Унион Берлин ФК", 0.9, "html")
+    assert registry.resolve("Унион Берлин ФК") == 2
+    assert _pending_names(registry) == {"Унион Берлин ФК"}
+
+
+def test_spelling_variants_become_aliases(registry):
+    home, away = registry.link("Бавария", "Унион Берлин", "Бавария", "Унион-Берлин", 1.0, "json")
+    assert (home, away) == (1, 2)
+    # Отличается только пунктуацией — тот же ключ, новой записи нет
+    assert registry.pending == []
+
+
+def test_low_confidence_only_looks_up(registry):
+    ids = registry.link("Бавария", "Кёльн", "Бавария", "Кельн", 0.5, "html")
+    assert ids == (1, None)
+    assert registry.pending == [] and registry.new_teams == {}
+
+
+def test_new_teams_get_temporary_ids_until_flush(registry):
+    ids = registry.link("Хьюстон Динамо", "Даллас", "Хьюстон Динамо ФК", "Даллас", 0.95, "html")
+    # В БД команд ещё нет: вызывающий получает None, id проставит flush
+    assert ids == (None, None)
+    assert sorted(registry.new_teams.values()) == ["Даллас", "Хьюстон Динамо"]
+    assert registry._lookup("Хьюстон Динамо ФК") == registry._lookup("Хьюстон Динамо") < 0
+
+
+def test_conflicting_teams_are_left_alone(registry):
+    registry.aliases[alias_key("Бавария Мюнхен")] = 3
+    registry.link("Бавария", "Унион Берлин", "Бавария Мюнхен", "Унион Берлин", 0.95, "html")
+    assert registry.resolve("Бавария Мюнхен") == 3
+    assert registry.pending == []
+
+
+class FakeCursor:
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def cursor(self):
+        return FakeCursor()
+
+
+def test_flush_replaces_temporary_ids(registry, monkeypatch):
+    calls = []
+
+    def execute_values(cur, sql, rows, fetch=False):
+        calls.append((" ".join(sql.split()), rows))
+        if fetch:
+            # INSERT INTO teams ... RETURNING id, name
+            return [(10 + i, name) for i, (name,) in enumerate(rows)]
+        return None
+
+    monkeypatch.setattr(team_registry, "execute_values", execute_values)
+    registry.link("Даллас", "Унион Берлин", "Даллас", "Унион Берлин ФК", 0.95, "html")
+    temporary = registry._lookup("Даллас")
+    assert temporary < 0
+
+    assert registry.flush(FakeConnection()) == 2
+    assert registry.resolve("Даллас") == 10
+    assert registry.names[10] == "Даллас" and temporary not in registry.names
+    assert registry.pending == [] and registry.new_teams == {}
+
+    teams_sql, team_rows = calls[0]
+    assert teams_sql.startswith("INSERT INTO teams") and team_rows == [("Даллас",)]
+    aliases_sql, alias_rows = calls[1]
+    assert aliases_sql.startswith("INSERT INTO team_aliases")
+    assert sorted(alias_rows) == sorted([
+        (alias_key("Даллас"), 10, "html"),
+        (alias_key("Унион Берлин ФК"), 2, "html"),
+    ])
+    # id команд проставляются строкам predictions/results с этими названиями
+    updates = [rows for sql, rows in calls[2:] if sql.startswith("UPDATE")]
+    assert len(updates) == 4
+    assert all(sorted(rows) == [("Даллас", 10), ("Унион Берлин ФК", 2)] for rows in updates)
+
+
+def test_flush_without_changes_skips_the_database(registry):
+    assert registry.flush(conn=None) == 0
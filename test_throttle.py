@@ -0,0 +1,76 @@
+# test_throttle.py
+# Предохранитель хоста в http_client.request: пробный запрос полуоткрытого
+# состояния должен завершаться при любом исходе, иначе хост заблокирован навсегда.
+import time
+
+import pytest
+import requests
+
+import http_client
+import throttle
+
+URL = "https://breaker.test/ru/soccer/2025-08-24"
+
+
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.headers = {}
+
+    def close(self):
+        pass
+
+
+class FakeSession:
+    """Отдаёт заранее заданные исходы: код ответа или исключение"""
+
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+
+    def request(self, method, url, **kwargs):
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return FakeResponse(outcome)
+
+
+@pytest.fixture
+def breaker(monkeypatch):
+    breaker = throttle.CircuitBreaker(failure_threshold=1, cooldown=0.05)
+    monkeypatch.setattr(http_client, "MAX_RETRIES", 0)
+    monkeypatch.setitem(http_client._host_guards, "breaker.test",
+                        (throttle.TokenBucket(1000, 1000), breaker))
+    return breaker
+
+
+def _use_session(monkeypatch, *outcomes):
+    session = FakeSession(outcomes)
+    monkeypatch.setattr(http_client, "get_session", lambda: session)
+    return session
+
+
+def _open(monkeypatch):
+    _use_session(monkeypatch, requests.ConnectionError("down"))
+    with pytest.raises(requests.ConnectionError):
+        http_client.request("GET", URL)
+    with pytest.raises(throttle.CircuitOpenError):
+        http_client.request("GET", URL)
+    time.sleep(0.06)
+
+
+def test_trial_429_does_not_block_host(monkeypatch, breaker):
+    _open(monkeypatch)
+    _use_session(monkeypatch, 429, 200)
+    assert http_client.request("GET", URL).status_code == 429
+    assert not breaker.trial_in_flight
+    assert http_client.request("GET", URL).status_code == 200
+    assert breaker.opened_at is None
+
+
+def test_trial_unexpected_error_does_not_block_host(monkeypatch, breaker):
+    _open(monkeypatch)
+    _use_session(monkeypatch, requests.exceptions.InvalidURL("bad"), 200)
+    with pytest.raises(requests.exceptions.InvalidURL):
+        http_client.request("GET", URL)
+    assert not breaker.trial_in_flight
+    assert http_client.request("GET", URL).status_code == 200
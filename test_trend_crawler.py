@@ -0,0 +1,121 @@
+# test_trend_crawler.py
+# Обход TrendList по курсорам pageInfo: цепочка идёт по endCursor до конца
+# и останавливается на повторённом или пустом курсоре, а не крутится вечно.
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+import graphql_client
+import graphql_stub_server
+import http_client
+import trend_crawler
+
+
+def _edge(slug, odd=1.5):
+    return {
+        "cursor": slug,
+        "node": {
+            "groups": [{"name": "btts", "minOdd": odd, "maxOdd": odd, "count": 1}],
+            "match": {"slug": slug, "matchDate": "2025-08-24 18:00:00",
+                      "teams": [{"name": f"{slug} A"}, {"name": f"{slug} B"}]},
+        },
+    }
+
+
+EDGES = [_edge(f"m{i}") for i in range(7)]
+
+
+class FakeTrendList:
+    """graphql_client.trend_list поверх stub_server.trend_page; pages — готовые ответы"""
+
+    def __init__(self, pages=None):
+        self.pages = list(pages or [])
+        self.calls = []
+
+    def __call__(self, first=None, after=None, **kwargs):
+        self.calls.append(after)
+        if self.pages:
+            return self.pages.pop(0)
+        return graphql_stub_server.trend_page(EDGES, first, after)
+
+
+@pytest.fixture
+def trend_list(monkeypatch):
+    def install(pages=None):
+        fake = FakeTrendList(pages)
+        monkeypatch.setattr(graphql_client, "trend_list", fake)
+        return fake
+    return install
+
+
+def _slugs(edges):
+    return [e["node"]["match"]["slug"] for e in edges]
+
+
+def test_chain_follows_cursors_to_the_last_page(trend_list):
+    fake = trend_list()
+    edges = trend_crawler.crawl_chain(trend_crawler.TrendFilterRule(), page_size=3)
+    assert _slugs(edges) == _slugs(EDGES)
+    assert fake.calls == [None, "stub_3", "stub_6"]
+
+
+def test_chain_continues_after_first_page(trend_list):
+    fake = trend_list()
+    first_page = graphql_stub_server.trend_page(EDGES, 3)
+    edges = trend_crawler.crawl_chain(trend_crawler.TrendFilterRule(),
+                                      first_page=first_page, page_size=3)
+    assert _slugs(edges) == _slugs(EDGES)
+    assert fake.calls == ["stub_3", "stub_6"]
+
+
+def test_chain_stops_on_repeated_cursor(trend_list):
+    page = {"edges": EDGES[:2], "pageInfo": {"hasNextPage": True, "endCursor": "same"}}
+    fake = trend_list([page, page, page])
+    edges = trend_crawler.crawl_chain(trend_crawler.TrendFilterRule(), max_pages=10)
+    assert _slugs(edges) == _slugs(EDGES[:2])
+    assert fake.calls == [None, "same"]
+
+
+def test_chain_stops_on_empty_cursor(trend_list):
+    page = {"edges": EDGES[:2], "pageInfo": {"hasNextPage": True, "endCursor": None}}
+    fake = trend_list([page])
+    edges = trend_crawler.crawl_chain(trend_crawler.TrendFilterRule(), max_pages=10)
+    assert _slugs(edges) == _slugs(EDGES[:2])
+    assert fake.calls == [None]
+
+
+def test_chain_stops_when_every_trend_is_above_max_odd(trend_list):
+    expensive = [_edge(f"x{i}", odd=3.0) for i in range(3)]
+    pages = [
+        {"edges": EDGES[:3], "pageInfo": {"hasNextPage": True, "endCursor": "c1"}},
+        {"edges": expensive, "pageInfo": {"hasNextPage": True, "endCursor": "c2"}},
+    ]
+    fake = trend_list(pages)
+    edges = trend_crawler.crawl_chain(trend_crawler.TrendFilterRule(max_odd=2.0), max_pages=10)
+    assert _slugs(edges) == _slugs(EDGES[:3])
+    assert fake.calls == [None, "c1"]
+
+
+def test_first_page_only_warns_when_crawl_is_off(monkeypatch, capsys):
+    monkeypatch.setattr(trend_crawler, "TREND_CRAWL", False)
+    first_page = graphql_stub_server.trend_page(EDGES, 3)
+    assert _slugs(trend_crawler.continue_trends(first_page)) == _slugs(EDGES[:3])
+    assert "НЕПОЛНЫЙ" in capsys.readouterr().out
+
+
+def test_stub_server_paginates_over_graphql(monkeypatch):
+    graphql_stub_server.StubHandler.operations = {"TrendList": {}}
+    graphql_stub_server.StubHandler.trends = EDGES
+    monkeypatch.setattr(graphql_stub_server.StubHandler, "log_message", lambda *args: None)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), graphql_stub_server.StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        monkeypatch.setattr(graphql_client, "GRAPHQL_URL",
+                            f"http://127.0.0.1:{server.server_address[1]}/graphql")
+        monkeypatch.setattr(http_client, "MAX_RETRIES", 0)
+        edges = trend_crawler.crawl_chain(trend_crawler.TrendFilterRule(), page_size=2)
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert _slugs(edges) == _slugs(EDGES)
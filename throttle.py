@@ -0,0 +1,112 @@
+# throttle.py
+import random
+import threading
+import time
+
+import requests
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """Хост временно отключён предохранителем — запрос даже не отправляем."""
+
+
+class TokenBucket:
+    """
+    Общий на все потоки лимитер запросов (token bucket).
+    Адаптивный: на 429 скорость режется вдвое, на успешных ответах
+    плавно возвращается к max_rate.
+    """
+
+    def __init__(self, rate, burst, min_rate=0.2):
+        self.max_rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        """Ждёт, пока появится токен, и забирает его."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self.blocked_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = max(self.blocked_until - now, (1 - self.tokens) / self.rate)
+            time.sleep(wait)
+
+    def on_throttled(self, retry_after=None):
+        """Сервер ответил 429: замедляемся и, если просили, молчим retry_after секунд."""
+        with self.lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = 0
+            if retry_after:
+                self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+
+    def on_success(self):
+        with self.lock:
+            if self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05)
+
+
+class CircuitBreaker:
+    """
+    Предохранитель на хост: после failure_threshold подряд неудач хост
+    отключается на cooldown секунд, затем пропускается один пробный запрос.
+    """
+
+    def __init__(self, failure_threshold=5, cooldown=30.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self.lock = threading.Lock()
+
+    def before_request(self, host):
+        with self.lock:
+            if self.opened_at is None:
+                return
+            if time.monotonic() - self.opened_at < self.cooldown or self.trial_in_flight:
+                raise CircuitOpenError(f"Хост {host} временно отключён после серии ошибок")
+            # Полуоткрытое состояние: пропускаем один пробный запрос
+            self.trial_in_flight = True
+
+    def on_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_in_flight = False
+
+    def release(self):
+        """Пробный запрос закончился без вердикта (429, неожиданная ошибка): пускаем следующий."""
+        with self.lock:
+            self.trial_in_flight = False
+
+    def on_failure(self):
+        with self.lock:
+            self.failures += 1
+            self.trial_in_flight = False
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+def backoff_delay(attempt, base=0.5, cap=30.0):
+    """Экспоненциальная задержка с полным джиттером для попытки attempt (с нуля)."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def parse_retry_after(value):
+    """Retry-After в секундах (формат даты не поддерживаем — вернём None)."""
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
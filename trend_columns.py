@@ -0,0 +1,170 @@
+# trend_columns.py
+# Колоночное представление TrendList.edges: вместо списка записей со
+# строками — типизированные массивы NumPy. Фильтры, сортировка и
+# ранжирование (например, BTTS с минимальным коэффициентом первыми)
+# считаются векторно, а строки собираются только для ответа API.
+# Лиги и команды закодированы словарём, как dictionary-массивы Arrow:
+# id — индекс в списке имён.
+# numpy — необязательная зависимость: без неё columns_from_edges поднимает
+# ImportError, а scores_api отдаёт матчи по-старому, через records.
+from datetime import datetime, timezone
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+from records import make_prediction
+
+
+class TrendColumns:
+    """
+    Колонки тренда (все одной длины):
+      kickoff   — int64, начало матча в секундах epoch (matchDate как UTC)
+      odds      — float64, minOdd первой группы
+      league_id — int32, индекс в leagues/league_slugs (лига — по leagueSlug:
+                  у австрийской и немецкой Бундеслиги одно название)
+      home_id, away_id — int32, индексы в teams
+    fetched_at — одно время получения на всю пачку.
+    """
+
+    def __init__(self, kickoff, odds, league_id, home_id, away_id, leagues, league_slugs, teams,
+                 fetched_at):
+        self.kickoff = kickoff
+        self.odds = odds
+        self.league_id = league_id
+        self.home_id = home_id
+        self.away_id = away_id
+        self.leagues = leagues
+        self.league_slugs = league_slugs
+        self.teams = teams
+        self.fetched_at = fetched_at
+
+    def __len__(self):
+        return len(self.odds)
+
+    def take(self, index):
+        """Строки по булевой маске или массиву индексов (словари имён общие)"""
+        return TrendColumns(
+            self.kickoff[index], self.odds[index], self.league_id[index],
+            self.home_id[index], self.away_id[index],
+            self.leagues, self.league_slugs, self.teams, self.fetched_at,
+        )
+
+    def select(self, min_odd=None, max_odd=None, kickoff_from=None, kickoff_to=None, league=None):
+        """
+        Фильтр одной маской. kickoff_from/kickoff_to — datetime (наивные
+        считаются UTC) или epoch-секунды; league — название или slug лиги.
+        """
+        mask = np.ones(len(self), dtype=bool)
+        if min_odd is not None:
+            mask &= self.odds >= min_odd
+        if max_odd is not None:
+            mask &= self.odds <= max_odd
+        if kickoff_from is not None:
+            mask &= self.kickoff >= _epoch(kickoff_from)
+        if kickoff_to is not None:
+            mask &= self.kickoff <= _epoch(kickoff_to)
+        if league is not None:
+            league_ids = [
+                i for i, (name, slug) in enumerate(zip(self.leagues, self.league_slugs))
+                if league in (name, slug)
+            ]
+            mask &= np.isin(self.league_id, league_ids)
+        return self.take(mask)
+
+    def by_odds(self, limit=None):
+        """Сначала минимальные коэффициенты; при равных — ранний старт"""
+        order = np.lexsort((self.kickoff, self.odds))
+        return self.take(order[:limit])
+
+    def league_summary(self):
+        """{slug лиги: (название, матчей, средний коэффициент)} через bincount"""
+        counts = np.bincount(self.league_id, minlength=len(self.leagues))
+        sums = np.bincount(self.league_id, weights=self.odds, minlength=len(self.leagues))
+        return {
+            slug: (self.leagues[i], int(counts[i]), float(sums[i] / counts[i]))
+            for i, slug in enumerate(self.league_slugs) if counts[i]
+        }
+
+    def _kickoff_strings(self):
+        return [
+            datetime.fromtimestamp(int(k), timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+            for k in self.kickoff
+        ]
+
+    def to_predictions(self):
+        """Обратно в список ScrapedPrediction (для кода, работающего по строкам)"""
+        return [
+            make_prediction(self.teams[h], self.teams[a], time, self.leagues[l], float(odd),
+                            self.fetched_at)
+            for h, a, time, l, odd in zip(
+                self.home_id, self.away_id, self._kickoff_strings(), self.league_id, self.odds
+            )
+        ]
+
+    def to_api(self):
+        """Список словарей в формате ответа /matches/btts"""
+        return [prediction.to_api() for prediction in self.to_predictions()]
+
+    def to_arrow(self):
+        """pyarrow.Table с dictionary-колонками лиг и команд (нужен pyarrow)"""
+        if pa is None:
+            raise ImportError("Для to_arrow нужен pyarrow")
+        teams = pa.array(self.teams, pa.string())
+        return pa.table({
+            "kickoff": pa.array(self.kickoff.astype("datetime64[s]")),
+            "odds": pa.array(self.odds),
+            "league": pa.DictionaryArray.from_arrays(
+                pa.array(self.league_id), pa.array(self.leagues, pa.string())
+            ),
+            "home_team": pa.DictionaryArray.from_arrays(pa.array(self.home_id), teams),
+            "away_team": pa.DictionaryArray.from_arrays(pa.array(self.away_id), teams),
+        })
+
+
+def _epoch(value):
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return int(value.timestamp())
+    return int(value)
+
+
+def columns_from_edges(edges, fetched_at=None):
+    """TrendList.edges → TrendColumns; матчи без коэффициентов пропускаются"""
+    if np is None:
+        raise ImportError("Для колоночного режима нужен numpy")
+
+    leagues, teams = {}, {}  # slug -> (id, название); название -> id
+    kickoffs, odds, league_ids, home_ids, away_ids = [], [], [], [], []
+    for edge in edges:
+        node = edge["node"]
+        match = node["match"]
+        groups = node.get("groups") or []
+        if not groups or len(match.get("teams") or []) < 2:
+            continue
+        kickoffs.append(match["matchDate"])
+        odds.append(groups[0]["minOdd"])
+        league_name = match.get("uniqueTournamentName") or ""
+        league_slug = match.get("leagueSlug") or league_name
+        league_ids.append(leagues.setdefault(league_slug, (len(leagues), league_name))[0])
+        home_ids.append(teams.setdefault(match["teams"][0]["name"], len(teams)))
+        away_ids.append(teams.setdefault(match["teams"][1]["name"], len(teams)))
+
+    return TrendColumns(
+        np.array(kickoffs, dtype="datetime64[s]").astype(np.int64),
+        np.array(odds, dtype=np.float64),
+        np.array(league_ids, dtype=np.int32),
+        np.array(home_ids, dtype=np.int32),
+        np.array(away_ids, dtype=np.int32),
+        [name for _, name in leagues.values()],
+        list(leagues),
+        list(teams),
+        fetched_at or datetime.now(),
+    )
@@ -0,0 +1,220 @@
+# trend_crawler.py
+# Полный обход TrendList по курсорам pageInfo. Страница трендов (и один
+# запрос TrendList) отдаёт только первую страницу edges, остальное — по
+# курсору after=endCursor. Курсоры непрозрачные ("018_<hash>", порядок по
+# силе тренда), поэтому одна цепочка страниц идёт только последовательно.
+# Параллелим по независимым срезам: каждый день из TrendFilter.days —
+# своя цепочка, цепочки качаются одновременно, затем всё сливается
+# в один список без повторов (по slug матча).
+#
+# Остановка цепочки:
+#   - нет следующей страницы (hasNextPage=False) или курсор повторился;
+#   - задан max_odd и у всех трендов страницы коэффициент выше него;
+#   - достигнут лимит страниц (TREND_MAX_PAGES).
+# Страница без новых трендов (повторы, матчи дальше горизонта) цепочку
+# не останавливает: порядок — по силе тренда, дальше могут быть подходящие.
+# День целиком дальше горизонта не запрашивается вовсе.
+# Дочитывание страниц — только через GraphQL (graphql_client.ENABLED):
+# выключенный GraphQL не должен дёргать угаданный endpoint на каждый запрос.
+# Тогда от страницы сайта остаётся только первая страница трендов, и
+# continue_trends громко предупреждает, что список неполный.
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+
+import requests
+
+import graphql_client
+import http_client
+
+# Дочитывать ли страницы после первой, когда тренды берутся со страницы сайта
+# (только при включённом GraphQL; SCORES24_TREND_CRAWL=0 выключает и тогда)
+TREND_CRAWL = graphql_client.ENABLED and os.getenv("SCORES24_TREND_CRAWL", "1") == "1"
+# Трендов на страницу (None — как отдаёт сервер) и максимум страниц на цепочку
+TREND_PAGE_SIZE = int(os.getenv("SCORES24_TREND_PAGE_SIZE", "0")) or None
+TREND_MAX_PAGES = int(os.getenv("SCORES24_TREND_MAX_PAGES", "20"))
+# Горизонт начала матча в часах и порог коэффициента (пусто — без ограничения)
+TREND_HORIZON_HOURS = float(os.getenv("SCORES24_TREND_HORIZON_HOURS", "0")) or None
+TREND_MAX_ODD = float(os.getenv("SCORES24_TREND_MAX_ODD", "0")) or None
+
+# Дни TrendFilter.days относительно сегодняшнего
+DAY_OFFSETS = {"today": 0, "tomorrow": 1, "aftertomorrow": 2}
+
+
+def _day_start(day, today=None):
+    """Начало дня TrendFilter ('today', 'tomorrow', 'YYYY-MM-DD') или None"""
+    today = today or date.today()
+    if day in DAY_OFFSETS:
+        start = today + timedelta(days=DAY_OFFSETS[day])
+    else:
+        try:
+            start = datetime.strptime(day, "%Y-%m-%d").date()
+        except (TypeError, ValueError):
+            return None
+    return datetime.combine(start, datetime.min.time())
+
+
+def _edge_key(edge):
+    match = edge["node"]["match"]
+    return match.get("slug") or (match["matchDate"], tuple(t["name"] for t in match["teams"]))
+
+
+class TrendFilterRule:
+    """Какие тренды нужны: матч не дальше горизонта и коэффициент не выше порога"""
+
+    def __init__(self, horizon_hours=None, max_odd=None, now=None):
+        self.now = now or datetime.now()
+        self.until = self.now + timedelta(hours=horizon_hours) if horizon_hours else None
+        self.max_odd = max_odd
+
+    def wants_day(self, day):
+        if self.until is None:
+            return True
+        start = _day_start(day, self.now.date())
+        return start is None or start <= self.until
+
+    def within_odds(self, edge):
+        """Коэффициент тренда не выше max_odd (или порога нет)"""
+        if self.max_odd is None:
+            return True
+        groups = edge["node"].get("groups") or []
+        return bool(groups) and groups[0]["minOdd"] <= self.max_odd
+
+    def wants(self, edge):
+        node = edge["node"]
+        if self.until is not None:
+            try:
+                kickoff = datetime.strptime(node["match"]["matchDate"], "%Y-%m-%d %H:%M:%S")
+            except (KeyError, ValueError):
+                kickoff = None
+            if kickoff is not None and kickoff > self.until:
+                return False
+        return self.within_odds(edge)
+
+
+def crawl_chain(rule, market_slug="btts", sport="soccer", day=None, first_page=None,
+                page_size=None, max_pages=None):
+    """
+    Одна цепочка страниц TrendList (один день или без даты).
+    first_page — уже полученная первая страница ({'edges', 'pageInfo'}),
+    тогда обход продолжается с её endCursor.
+    Возвращает подходящие edges в порядке страниц (без повторов внутри цепочки).
+    """
+    max_pages = max_pages or TREND_MAX_PAGES
+    seen, edges, cursors = set(), [], set()
+    page = first_page
+    pages = 0
+    after = None
+
+    while pages < max_pages:
+        if page is None:
+            page = graphql_client.trend_list(
+                market_slug=market_slug, sport=sport, date=day,
+                first=page_size or TREND_PAGE_SIZE, after=after,
+            ) or {}
+        pages += 1
+
+        page_edges = page.get("edges") or []
+        for edge in page_edges:
+            key = _edge_key(edge)
+            if key in seen or not rule.wants(edge):
+                continue
+            seen.add(key)
+            edges.append(edge)
+
+        page_info = page.get("pageInfo") or {}
+        after = page_info.get("endCursor")
+        if not page_info.get("hasNextPage") or not after or after in cursors:
+            break
+        if rule.max_odd is not None and page_edges and not any(map(rule.within_odds, page_edges)):
+            break
+        cursors.add(after)
+        page = None
+
+    print(f"📄 TrendList {day or 'все дни'}: {pages} стр., {len(edges)} трендов")
+    return edges
+
+
+def crawl_trends(market_slug="btts", sport="soccer", first_page=None, horizon_hours=None,
+                 max_odd=None, page_size=None, max_pages=None, workers=None):
+    """
+    Все страницы TrendList рынка: дни из TrendFilter качаются параллельно,
+    каждый — по своей цепочке курсоров. first_page — первая страница
+    (например, из URQL-кэша страницы трендов): её тренды идут первыми.
+    Если фильтр дней недоступен, обходится одна цепочка без даты.
+    Возвращает edges без повторов.
+    """
+    rule = TrendFilterRule(
+        horizon_hours if horizon_hours is not None else TREND_HORIZON_HOURS,
+        max_odd if max_odd is not None else TREND_MAX_ODD,
+    )
+
+    try:
+        days = (graphql_client.trend_filter(market_slug=market_slug, sport=sport) or {}).get("days")
+    except requests.RequestException as e:
+        print(f"⚠️  TrendFilter недоступен ({e}), обходим тренды одной цепочкой")
+        days = None
+
+    def _chain(day):
+        try:
+            return crawl_chain(rule, market_slug, sport, day, None, page_size, max_pages)
+        except requests.RequestException as e:
+            print(f"❌ TrendList {day or 'все дни'}: {e}")
+            return []
+
+    chains = []
+    if first_page is not None:
+        chains.append([e for e in first_page.get("edges") or [] if rule.wants(e)])
+
+    if days:
+        days = [day for day in days if rule.wants_day(day)]
+        if days:
+            pool_size = max(1, min(workers or http_client.FETCH_CONCURRENCY, len(days)))
+            with ThreadPoolExecutor(max_workers=pool_size) as pool:
+                chains.extend(pool.map(_chain, days))
+    elif first_page is not None:
+        # Без разбивки по дням продолжаем курсор первой страницы
+        try:
+            chains.append(crawl_chain(rule, market_slug, sport, None, first_page,
+                                      page_size, max_pages))
+        except requests.RequestException as e:
+            print(f"❌ TrendList: {e}")
+    else:
+        chains.append(_chain(None))
+
+    return merge_edges(chains)
+
+
+def continue_trends(first_page, max_odd=None, horizon_hours=None):
+    """
+    Edges TrendList, начиная с первой страницы со страницы сайта: если есть
+    следующие страницы и дочитывание разрешено — весь обход (crawl_trends),
+    иначе только первая страница с предупреждением, что трендов больше.
+    """
+    edges = first_page.get("edges") or []
+    if not (first_page.get("pageInfo") or {}).get("hasNextPage"):
+        return edges
+    if TREND_CRAWL and not http_client.REPLAY:
+        return crawl_trends(first_page=first_page, max_odd=max_odd, horizon_hours=horizon_hours)
+
+    if http_client.REPLAY:
+        reason = "в режиме --replay сеть не используется"
+    elif not graphql_client.ENABLED:
+        reason = "дочитывание идёт только через GraphQL (SCORES24_USE_GRAPHQL=1)"
+    else:
+        reason = "дочитывание выключено (SCORES24_TREND_CRAWL=0)"
+    print(f"⚠️  TrendList: у сервера есть ещё страницы, но {reason}. "
+          f"Взята только первая — {len(edges)} трендов, список НЕПОЛНЫЙ")
+    return edges
+
+
+def merge_edges(chains):
+    """Сливает списки edges в один, повторный матч (по slug) пропускается"""
+    seen, merged = set(), []
+    for chain in chains:
+        for edge in chain:
+            key = _edge_key(edge)
+            if key not in seen:
+                seen.add(key)
+                merged.append(edge)
+    return merged
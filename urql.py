@@ -0,0 +1,114 @@
+# urql.py
+# Поиск window.URQL_DATA=JSON.parse("...") в сырых байтах страницы
+# и выборочное декодирование записей URQL-кэша
+import json
+import re
+
+URQL_MARKER = b'window.URQL_DATA=JSON.parse("'
+_LITERAL_END = b'")'
+
+
+def find_literal_end(data, pos):
+    """
+    Индекс закрывающей кавычки JS-строки, начиная с pos, или -1.
+    Кавычка считается закрывающей, если перед ней чётное число обратных слэшей.
+    """
+    while True:
+        end = data.find(_LITERAL_END, pos)
+        if end < 0:
+            return -1
+        slashes = 0
+        i = end - 1
+        while i >= 0 and data[i] == 0x5C:  # '\\'
+            slashes += 1
+            i -= 1
+        if slashes % 2 == 0:
+            return end
+        pos = end + 1
+
+
+def extract_payload(data):
+    """
+    Возвращает содержимое JSON.parse("...") (bytes, ещё JS-экранированное) или None.
+    Работает по сырым байтам страницы (str кодируется в utf-8), без DOM.
+    """
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    start = data.find(URQL_MARKER)
+    if start < 0:
+        return None
+    start += len(URQL_MARKER)
+    end = find_literal_end(data, start)
+    if end < 0:
+        return None
+    return bytes(data[start:end])
+
+
+# Первый ключ в data записи кэша — имя операции: {"TrendList":{...}}
+# (обычно единственный; остальные ищет OperationIndex.find)
+_OPERATION_RE = re.compile(r'\s*\{\s*"([^"]+)"')
+
+
+def decode_literal(payload):
+    """
+    Раскрывает JS-строку из JSON.parse("...") за один проход.
+    В отличие от .decode('unicode_escape') не портит кириллицу в UTF-8.
+    """
+    if isinstance(payload, str):
+        payload = payload.encode("utf-8")
+    return json.loads(b'"' + payload + b'"')
+
+
+class OperationIndex(dict):
+    """
+    {имя операции: сырая JSON-строка data}. Быстрый индекс — по первому ключу
+    data; в одной записи бывает несколько операций ({"bookmakerRating":...,
+    "bookmakerPromotions":...}), такие находит find, разбирая только записи,
+    где имя операции вообще встречается.
+    """
+
+    def __init__(self, entries=()):
+        super().__init__()
+        self.entries = []
+        for data in entries:
+            self.entries.append(data)
+            match = _OPERATION_RE.match(data)
+            if match:
+                self.setdefault(match.group(1), data)
+
+    def find(self, name):
+        """Сырая data записи, где name — ключ верхнего уровня, или None"""
+        if name in self:
+            return self[name]
+        needle = f'"{name}"'
+        for data in self.entries:
+            if needle in data and name in json.loads(data):
+                self[name] = data
+                return data
+        return None
+
+
+def index_operations(payload):
+    """
+    OperationIndex по всем записям кэша.
+    Сами data не парсятся — только определяется, какой запрос в них лежит.
+    """
+    cache = json.loads(decode_literal(payload))
+    return OperationIndex(
+        entry["data"] for entry in cache.values()
+        if isinstance(entry, dict) and isinstance(entry.get("data"), str)
+    )
+
+
+def decode_operations(payload, operations):
+    """
+    Полностью парсит только нужные операции (TrendList, TrendFilter, ...).
+    Возвращает {имя операции: данные}; отсутствующих операций в ответе нет.
+    """
+    index = index_operations(payload)
+    decoded = {}
+    for name in operations:
+        raw = index.find(name)
+        if raw is not None:
+            decoded[name] = json.loads(raw)[name]
+    return decoded
@@ -1,10 +1,12 @@
 # working_parser.py
 import requests
+import http_client
 from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
 import time
 import re
 from database import get_db_connection
+from records import make_result
 
 def parse_results_for_date(date_str):
     """
@@ -15,7 +17,7 @@ def parse_results_for_date(date_str):
     print(f"🕸️  Парсим URL: {url}")
     
     try:
-        response = requests.get(url, headers={
+        response = http_client.get(url, headers={
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
         response.raise_for_status()
@@ -68,16 +70,13 @@ def parse_results_for_date(date_str):
             time_elem = container.find('div', class_='dt')
             match_time_str = time_elem.get_text(strip=True) if time_elem else ''
             
-            result = {
-                'home_team': home_team.strip(),
-                'away_team': away_team.strip(),
-                'score': score_text,
-                'home_score': home_score,
-                'away_score': away_score,
-                'status': status,
-                'time': match_time_str,
-                'date': date_str
-            }
+            try:
+                match_time = datetime.strptime(f"{date_str} {match_time_str}", "%Y-%m-%d %H:%M")
+            except ValueError:
+                match_time = None
+
+            result = make_result(home_team, away_team, home_score, away_score, status,
+                                 match_time=match_time)
             
             results.append(result)
             print(f"   ⚽ {home_team} {score_text} {away_team} ({status})")
@@ -185,13 +184,13 @@ def main():
         # Ищем в спарсенных результатах
         for result in all_parsed_results:
             # Простое сравнение названий команд
-            if (result['home_team'].lower() == home_team.lower() and 
-                result['away_team'].lower() == away_team.lower()):
+            if (result.home_team.lower() == home_team.lower() and 
+                result.away_team.lower() == away_team.lower()):
                 
                 if save_result_to_db(
                     home_team, away_team, match_time,
-                    result['home_score'], result['away_score'],
-                    result['status']
+                    result.home_score, result.away_score,
+                    result.status
                 ):
                     saved_count += 1
                 break
@@ -202,4 +201,5 @@ def main():
     print("🔚 Парсинг завершен.")
 
 if __name__ == '__main__':
+    http_client.enable_replay_from_argv()
     main()
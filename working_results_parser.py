@@ -1,96 +1,107 @@
 # working_results_parser.py
 import requests
-from bs4 import BeautifulSoup
+from datetime import datetime, timedelta
+import http_client
+import extraction
+from records import make_result
+from result_matcher import MatchIndex
+from team_registry import get_registry
 from database import get_db_connection
 
 FINISHED_KEYWORDS = ("закончен", "заверш")
 
-def parse_results(date: str = "yesterday"):
+def iter_results(date: str = "yesterday", backend: str = None):
     """
-    Парсим результаты матчей по дате (или вчерашние).
+    Парсим результаты матчей по дате (или вчерашние) потоково: страница
+    разбирается по мере загрузки, и каждый завершённый матч отдаётся сразу,
+    не дожидаясь конца страницы. Память не растёт с размером страницы.
     date: "yesterday" или "YYYY-MM-DD"
+    backend: "sax", "lxml" или "bs4" (см. extraction.ExtractionPlan.iter_stream),
+    по умолчанию — sax.
     Берём ТОЛЬКО итоговый счёт: первый div.sc-pvs6fr-0 внутри контейнера div.sc-4g7sie-0.
     """
     url = f"https://scores24.live/ru/soccer/{date}"
     print(f"🕸️  Парсим URL: {url}")
-
+    # Дата страницы — для времени начала матчей (карточка знает только HH:MM)
+    page_day = date
+    if date == "yesterday":
+        page_day = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
+
+    chunks = http_client.stream_page(
+        url,
+        headers={
+            "User-Agent": (
+                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+                "AppleWebKit/537.36 (KHTML, like Gecko) "
+                "Chrome/120.0.0.0 Safari/537.36"
+            )
+        },
+        timeout=20,
+    )
+    found = 0
+
+    # Каждый матч — корневой блок; поля карточки берём за один проход (extraction)
     try:
-        response = requests.get(
-            url,
-            headers={
-                "User-Agent": (
-                    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                    "AppleWebKit/537.36 (KHTML, like Gecko) "
-                    "Chrome/120.0.0.0 Safari/537.36"
-                )
-            },
-            timeout=20,
-        )
-        response.raise_for_status()
+        for record in extraction.get_plan().iter_stream(chunks, backend):
+            match_data = _record_to_match(record, page_day)
+            if match_data:
+                found += 1
+                yield match_data
     except requests.RequestException as e:
         print(f"❌ Ошибка при запросе: {e}")
-        return []
 
-    soup = BeautifulSoup(response.text, "html.parser")
-    matches = []
+    print(f"📊 Найдено завершённых матчей: {found}")
 
-    # Каждый матч — корневой блок
-    for match in soup.select("div.sc-17qxh4e-0"):
-        try:
-            # 1) Названия команд
-            team_nodes = match.select("div.sc-17qxh4e-10")
-            if len(team_nodes) < 2:
-                continue
-            home_team = team_nodes[0].get_text(strip=True)
-            away_team = team_nodes[1].get_text(strip=True)
-
-            # 2) Статус матча — обрабатываем только завершённые
-            status_elem = match.select_one("div.sc-1p31vt4-0")
-            status = status_elem.get_text(strip=True) if status_elem else ""
-            if status and not any(k in status.lower() for k in FINISHED_KEYWORDS):
-                # Если матч не завершён — пропускаем
-                continue
-            if not status:
-                status = "Завершен"
 
-            # 3) Контейнер со счетами и ВЗЯТЬ ПЕРВЫЙ блок как итог
-            scores_container = match.select_one("div.sc-4g7sie-0")
-            if not scores_container:
-                continue
+def parse_results(date: str = "yesterday", backend: str = None):
+    """То же, что iter_results, но списком."""
+    return list(iter_results(date, backend))
 
-            final_score_block = scores_container.select_one("div.sc-pvs6fr-0")
-            if not final_score_block:
-                continue
 
-            # Внутри финального блока два числа: хозяева и гости
-            score_cells = final_score_block.select("div.sc-pvs6fr-1")
-            if len(score_cells) < 2:
-                continue
+def _record_to_match(record, page_day=None):
+    """
+    Карточка из extraction → ScrapedResult или None для незавершённых.
+    page_day (YYYY-MM-DD) — дата страницы; с ней заполняется время начала.
+    """
+    try:
+        # 1) Названия команд
+        if len(record["teams"]) < 2:
+            return None
+        home_team, away_team = record["teams"][:2]
+
+        # 2) Статус матча — обрабатываем только завершённые
+        status = record["status"] or ""
+        if status and not any(k in status.lower() for k in FINISHED_KEYWORDS):
+            # Если матч не завершён — пропускаем
+            return None
+        if not status:
+            status = "Завершен"
+
+        # 3) Итоговый счёт: первый блок в контейнере счетов, в нём два числа
+        score_cells = record["score"]
+        if len(score_cells) < 2:
+            return None
+
+        try:
+            home_goals = int(score_cells[0])
+            away_goals = int(score_cells[1])
+        except ValueError:
+            return None
 
+        match_time = None
+        if record["kickoff"] and page_day:
             try:
-                home_goals = int(score_cells[0].get_text(strip=True))
-                away_goals = int(score_cells[1].get_text(strip=True))
+                match_time = datetime.strptime(f"{page_day} {record['kickoff']}", "%Y-%m-%d %H:%M")
             except ValueError:
-                continue
-
-            match_data = {
-                "home_team": home_team,
-                "away_team": away_team,
-                "home_score": home_goals,
-                "away_score": away_goals,
-                "score": f"{home_goals}:{away_goals}",
-                "status": status,
-                "both_to_score": home_goals > 0 and away_goals > 0,
-            }
-            matches.append(match_data)
-            print(f"   ⚽ {home_team} {home_goals}:{away_goals} {away_team} ({status})")
+                pass
 
-        except Exception as e:
-            print(f"❌ Ошибка при парсинге матча: {e}")
-            continue
+        match_data = make_result(home_team, away_team, home_goals, away_goals, status, match_time)
+        print(f"   ⚽ {home_team} {home_goals}:{away_goals} {away_team} ({status})")
+        return match_data
 
-    print(f"📊 Найдено завершённых матчей: {len(matches)}")
-    return matches
+    except Exception as e:
+        print(f"❌ Ошибка при парсинге матча: {e}")
+        return None
 
 
 def get_matches_without_results():
@@ -118,10 +129,12 @@ def get_matches_without_results():
     return rows
 
 
-def upsert_result_to_db(home_team, away_team, match_time, home_score, away_score, status):
+def upsert_result_to_db(home_team, away_team, match_time, home_score, away_score, status,
+                        home_team_id=None, away_team_id=None):
     """
     Обновляет результат, если запись уже есть (по home+away+match_time),
-    иначе — вставляет новую. Возвращает 'inserted' | 'updated' | 'skipped'.
+    иначе — вставляет новую. id команд пишутся, если известны.
+    Возвращает 'inserted' | 'updated' | 'skipped'.
     """
     conn = get_db_connection()
     cur = conn.cursor()
@@ -133,12 +146,15 @@ def upsert_result_to_db(home_team, away_team, match_time, home_score, away_score
                SET home_score = %s,
                    away_score = %s,
                    status = %s,
+                   home_team_id = COALESCE(%s, home_team_id),
+                   away_team_id = COALESCE(%s, away_team_id),
                    updated_at = NOW()
              WHERE home_team = %s
                AND away_team = %s
                AND match_time = %s
             """,
-            (home_score, away_score, status, home_team, away_team, match_time),
+            (home_score, away_score, status, home_team_id, away_team_id,
+             home_team, away_team, match_time),
         )
         if cur.rowcount > 0:
             conn.commit()
@@ -148,10 +164,12 @@ def upsert_result_to_db(home_team, away_team, match_time, home_score, away_score
         # Если не обновили — вставляем новую
         cur.execute(
             """
-            INSERT INTO results (home_team, away_team, match_time, home_score, away_score, status, updated_at)
-            VALUES (%s, %s, %s, %s, %s, %s, NOW())
+            INSERT INTO results (home_team, away_team, home_team_id, away_team_id, match_time,
+                                 home_score, away_score, status, updated_at)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, NOW())
             """,
-            (home_team, away_team, match_time, home_score, away_score, status),
+            (home_team, away_team, home_team_id, away_team_id, match_time,
+             home_score, away_score, status),
         )
         conn.commit()
         print(f"✅ Вставлено: {home_team} {home_score}:{away_score} {away_team}")
@@ -173,15 +191,6 @@ def main():
     # Даты для парсинга — подставь свои
     dates_to_parse = ["2025-08-23", "2025-08-22", "yesterday"]
 
-    all_results = []
-    for date in dates_to_parse:
-        print(f"\n📅 Парсим дату: {date}")
-        results = parse_results(date)
-        all_results.extend(results)
-
-    print(f"\n📊 Всего найдено завершённых результатов: {len(all_results)}")
-
-    # Матчи из БД, у которых ещё нет результата
     matches = get_matches_without_results()
     print(f"🗄️  В БД без результата: {len(matches)}")
 
@@ -191,35 +200,55 @@ def main():
         for i, m in enumerate(matches, 1):
             print(f"   {i:2d}. {m[1]} vs {m[2]}  @ {m[3]}")
 
-    # Индексируем результаты для быстрого сопоставления по именам
-    saved_inserted = saved_updated = 0
+    saved_inserted = saved_updated = total_results = 0
 
-    def norm(s: str) -> str:
-        return s.lower().replace("ё", "е").strip()
-
-    for pid, p_home, p_away, p_time in matches:
-        print(f"\n🔍 Ищем результат: {p_home} vs {p_away} @ {p_time}")
-        found = False
-
-        for r in all_results:
-            # Гибкое сравнение: подстрочное совпадение в обе стороны
-            if (norm(r["home_team"]) in norm(p_home) or norm(p_home) in norm(r["home_team"])) \
-               and (norm(r["away_team"]) in norm(p_away) or norm(p_away) in norm(r["away_team"])):
-
-                found = True
-                action = upsert_result_to_db(
-                    p_home, p_away, p_time, r["home_score"], r["away_score"], r["status"]
-                )
-                if action == "inserted":
-                    saved_inserted += 1
-                elif action == "updated":
-                    saved_updated += 1
-                break
+    # Страница дня разбирается потоково, а сопоставляем, когда собран весь день:
+    # каждый прогноз ищет лучший результат среди всех матчей дня. Жадный захват
+    # "первый пришедший результат забирает прогноз" отдал бы прогноз на основу
+    # дублю, если тот стоит на странице раньше.
+    # Гибкое сравнение: сходство по триграммам с уверенностью (result_matcher),
+    # команды, уже известные реестру, сопоставляются по id
+    registry = get_registry()
+    pending = list(matches)
+    for date in dates_to_parse:
+        print(f"\n📅 Парсим дату: {date}")
+        day_results = list(iter_results(date))
+        total_results += len(day_results)
+        results_index = MatchIndex(day_results, registry=registry)
+
+        still_pending = []
+        for m in pending:
+            pid, p_home, p_away, p_time = m
+            r, confidence = results_index.match(p_home, p_away, p_time)
+            if r is None:
+                still_pending.append(m)
+                continue
 
-        if not found:
-            print("   ❌ Результат не найден в распарсенных данных")
+            print(f"\n🔍 Найден результат: {p_home} vs {p_away} @ {p_time} "
+                  f"(уверенность {confidence:.2f})")
+            home_team_id, away_team_id = registry.link(
+                p_home, p_away, r.home_team, r.away_team, confidence, r.source
+            )
+            action = upsert_result_to_db(
+                p_home, p_away, p_time, r.home_score, r.away_score, r.status,
+                home_team_id, away_team_id,
+            )
+            if action == "inserted":
+                saved_inserted += 1
+            elif action == "updated":
+                saved_updated += 1
+            else:
+                # Не сохранилось (ошибка БД): прогноз остаётся в поиске и в отчёте
+                still_pending.append(m)
+        pending = still_pending
+
+    registry.flush()
+    print(f"\n📊 Всего найдено завершённых результатов: {total_results}")
+    for pid, p_home, p_away, p_time in pending:
+        print(f"   ❌ Результат не найден в распарсенных данных: {p_home} vs {p_away} @ {p_time}")
 
     print(f"\n🎯 ИТОГ: вставлено {saved_inserted}, обновлено {saved_updated}")
 
 if __name__ == "__main__":
+    http_client.enable_replay_from_argv()
     main()